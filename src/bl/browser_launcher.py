@@ -0,0 +1,108 @@
+import threading
+import time
+
+
+class BrowserLauncher:
+    """
+    購入用ブラウザをバックグラウンドスレッドで起動して top_url へ遷移させ、準備状態を管理する。
+
+    状態:
+        launching : 起動・遷移中
+        ready     : 操作可能 (未ログイン)
+        logged_in : 操作可能 (ログイン済み)
+        dead      : 未起動 または 終了を検知
+
+    状態が変わるたびに on_change(state) を呼ぶ (起動スレッドから呼ばれる場合がある)。
+    selenium を含む購入ロジックは起動スレッドで初めて読み込まれるため、Tk スレッドを止めない。
+    """
+    LAUNCHING = "launching"
+    READY = "ready"
+    LOGGED_IN = "logged_in"
+    DEAD = "dead"
+
+    def __init__(self, get_logic, on_change=None, log=print):
+        """
+        Args:
+            get_logic (callable): 現在のモードの PurchaseLogic を返す関数
+        """
+        self.get_logic = get_logic
+        self.on_change = on_change
+        self.log = log
+        self.state = self.DEAD
+        self.launch_ms = None
+        self._lock = threading.Lock()
+        self._generation = 0  # 古い起動スレッドの結果を捨てるための世代番号
+        self._closed = False
+
+    def is_usable(self):
+        return self.state in (self.READY, self.LOGGED_IN)
+
+    def _set_state(self, state, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            changed, self.state = self.state != state, state
+        if changed and self.on_change:
+            self.on_change(state)
+
+    def launch(self, url):
+        """ブラウザの起動 (起動済みなら再利用) と url への遷移をバックグラウンドで開始する"""
+        with self._lock:
+            if self._closed: return
+            self._generation += 1
+            generation = self._generation
+        self._set_state(self.LAUNCHING)
+        threading.Thread(target=self._launch_task, args=(url, generation), daemon=True).start()
+
+    def _launch_task(self, url, generation):
+        from component.chrome_driver_manager import ChromeDriverManager
+        try:
+            logic = self.get_logic()
+            start = time.monotonic()
+            logic.get_driver()
+            launched = time.monotonic()
+            logic.navigate_to(url)
+            done = time.monotonic()
+            self.launch_ms = (done - start) * 1000
+            self.log(f"[BROWSER] 準備完了 {self.launch_ms:.0f}ms "
+                     f"(起動 {(launched - start) * 1000:.0f}ms / 遷移 {(done - launched) * 1000:.0f}ms)")
+            if self._closed:
+                # 起動中にアプリが終了した場合はブラウザを残さない
+                ChromeDriverManager.quit_driver(role=ChromeDriverManager.ROLE_PURCHASE, is_debug_mode=logic.debug_mode)
+                return
+            self._set_state(self.LOGGED_IN if logic.is_logged_in(max_age=0) else self.READY, generation)
+        except Exception as e:
+            self.log(f"[BROWSER] 起動失敗: {e}")
+            self._set_state(self.DEAD, generation)
+
+    def set_logged_in(self, logged_in):
+        """ログイン操作の結果を反映する"""
+        if self.state in (self.READY, self.LOGGED_IN):
+            self._set_state(self.LOGGED_IN if logged_in else self.READY)
+
+    def refresh(self):
+        """
+        ブラウザの生存を確認して状態を更新する (起動中は何もしない)。
+
+        Returns:
+            str: 更新後の状態
+        """
+        if self.state == self.LAUNCHING:
+            return self.state
+        from component.chrome_driver_manager import ChromeDriverManager
+        driver = ChromeDriverManager.peek_driver(self.get_logic().debug_mode)
+        try:
+            alive = driver is not None and bool(driver.window_handles)
+        except Exception:
+            alive = False
+        if not alive:
+            self._set_state(self.DEAD)
+        elif self.state == self.DEAD:
+            self._set_state(self.READY)
+        return self.state
+
+    def close(self):
+        """以後の起動を行わず、起動中のブラウザは完了後に終了させる"""
+        with self._lock:
+            self._closed = True
+            self._generation += 1
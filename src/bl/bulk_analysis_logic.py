@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bl.item_analysis_logic import ItemAnalysisLogic
+from component.analysis_cache import AnalysisCache
+from component.chrome_driver_manager import ChromeDriverManager
+
+
+class BulkAnalysisLogic:
+    """
+    複数の商品URLを上限付きのワーカープールで並列に解析する。
+
+    各ワーカーは専用の ItemAnalysisLogic を持ち、ブラウザ解析が必要な場合も
+    ワーカーごとに別の解析用ブラウザ (role = analysis_N) を使うため互いに干渉しない。
+    結果は完了した順に on_result コールバックへ渡される (ワーカースレッドから呼ばれる点に注意)。
+    """
+    DEFAULT_WORKERS = 4
+    MAX_WORKERS = 8
+
+    def __init__(self, debug_mode=True, max_workers=DEFAULT_WORKERS):
+        self.debug_mode = debug_mode
+        self.max_workers = max(1, min(int(max_workers), self.MAX_WORKERS))
+        self._local = threading.local()
+        self._logics = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def unique_urls(urls):
+        """空行と、正規化後に重複するURLを除いた一覧を返す (入力順を維持)"""
+        seen = set()
+        result = []
+        for url in urls:
+            url = (url or "").strip()
+            if not url: continue
+            key = AnalysisCache.normalize_url(url)
+            if key in seen: continue
+            seen.add(key)
+            result.append(url)
+        return result
+
+    def _get_logic(self):
+        logic = getattr(self._local, "logic", None)
+        if logic is None:
+            with self._lock:
+                role = f"{ChromeDriverManager.ROLE_ANALYSIS}_{len(self._logics)}"
+                logic = ItemAnalysisLogic(debug_mode=self.debug_mode, role=role)
+                self._logics.append(logic)
+            self._local.logic = logic
+        return logic
+
+    def _analyze(self, index, url, on_result, stop_event):
+        result = {"index": index, "url": url, "data": None, "error": None, "source": None, "elapsed_ms": 0.0}
+        if stop_event is not None and stop_event.is_set():
+            result["error"] = "cancelled"
+            return result
+
+        start = time.monotonic()
+        try:
+            data = self._get_logic().fetch_item_variants(url)
+            result["data"] = data
+            result["source"] = data.get("debug", {}).get("source")
+        except Exception as e:
+            result["error"] = str(e) or e.__class__.__name__
+        result["elapsed_ms"] = (time.monotonic() - start) * 1000
+
+        if on_result is not None:
+            try:
+                on_result(result)
+            except Exception as e:
+                print(f"[BULK] on_result 例外: {e}")
+        return result
+
+    def run(self, urls, on_result=None, stop_event=None):
+        """
+        URL 一覧を解析する。すべて完了するまでブロックする。
+
+        Returns:
+            list: 入力順の結果 dict リスト
+                {"index", "url", "data", "error", "source", "elapsed_ms"}
+        """
+        urls = self.unique_urls(urls)
+        start = time.monotonic()
+        print(f"[BULK] {len(urls)} 件の一括解析を開始 (並列数 {self.max_workers})")
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bulk_analysis") as ex:
+                futures = [ex.submit(self._analyze, i, url, on_result, stop_event) for i, url in enumerate(urls)]
+                results = [f.result() for f in futures]
+        finally:
+            self.close()
+        ok = sum(1 for r in results if r["error"] is None)
+        print(f"[BULK] 完了: 成功 {ok} / {len(results)} 件 ({(time.monotonic() - start):.1f}s)")
+        return results
+
+    def close(self):
+        """ワーカーが起動した解析用ブラウザをすべて終了する"""
+        with self._lock:
+            logics, self._logics = self._logics, []
+        for logic in logics:
+            logic.close()
+        self._local = threading.local()
@@ -5,16 +5,139 @@ import time
 import re
 from selenium.webdriver.support.ui import WebDriverWait
 from component.chrome_driver_manager import ChromeDriverManager
+from component.http_client_manager import HttpClientManager
+from component.item_page_parser import ItemPageParser
+from component.analysis_cache import AnalysisCache
+from component.cart_line import CartLine
+from component.sku_index import SkuIndex
 
 
 class ItemAnalysisLogic:
-    def __init__(self, debug_mode=True):
+    # 静的取得時の既定 User-Agent (ブラウザ未起動で Cookie 取り込み前の場合に使用)
+    DEFAULT_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                          "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+    def __init__(self, debug_mode=True, use_static=True, role=ChromeDriverManager.ROLE_ANALYSIS):
         self.debug_mode = debug_mode
+        self.use_static = use_static
+        # ブラウザ解析時に使用するドライバープールの用途名 (並列解析時はワーカーごとに分ける)
+        self.role = role
+        self.cache = AnalysisCache.get_instance()
 
     def fetch_item_variants(self, url):
-        # 【修正】is_headless=True を指定して取得（マネージャー側で再起動が走る）
+        """
+        商品ページを解析する。まず静的HTMLを直接取得して解析し、
+        必要な構造が揃っていない場合のみヘッドレスブラウザで再解析する。
+        解析結果は AnalysisCache に保存する。
+        """
+        data = None
+        if self.use_static:
+            data = self.fetch_item_variants_static(url)
+            if data is not None and ItemPageParser.is_complete(data):
+                if self.debug_mode:
+                    self._print_detailed_log(data)
+            else:
+                print("[ANALYSIS] 静的HTMLでは解析できないため、ブラウザで再解析します")
+                data = None
+        if data is None:
+            data = self.fetch_item_variants_browser(url)
+
+        debug = data.get("debug", {})
+        self.cache.put(url, data, debug.get("etag"), debug.get("last_modified"))
+        return data
+
+    def get_cached(self, url):
+        """
+        キャッシュ済みの解析結果を返す。
+
+        Returns:
+            tuple: (解析結果 または None, TTL 内か)
+        """
+        entry = self.cache.get(url)
+        if not entry:
+            return None, False
+        return entry["data"], self.cache.is_fresh(entry)
+
+    def revalidate(self, url):
+        """
+        キャッシュ済みの結果を再検証し、最新の解析結果を返す。
+        ETag / Last-Modified があれば条件付きリクエストで確認し、304 なら再解析しない。
+
+        Returns:
+            tuple: (解析結果, キャッシュから変更があったか)
+        """
+        entry = self.cache.get(url)
+        if entry and self.use_static and (entry.get("etag") or entry.get("last_modified")):
+            try:
+                html, headers = self.fetch_item_html(url, entry.get("etag"), entry.get("last_modified"))
+                if html is None:
+                    self.cache.touch(url)
+                    print(f"[CACHE] 変更なし (304): {url}")
+                    return entry["data"], False
+                data = ItemPageParser.parse(html)
+                if ItemPageParser.is_complete(data):
+                    data["debug"]["source"] = "static"
+                    self.cache.put(url, data, headers.get("ETag"), headers.get("Last-Modified"))
+                    return data, not self._same_result(entry["data"], data)
+            except Exception as e:
+                print(f"[CACHE] 再検証失敗: {e}")
+
+        data = self.fetch_item_variants(url)
+        return data, entry is None or not self._same_result(entry["data"], data)
+
+    def _same_result(self, a, b):
+        keys = ("groups", "common")
+        return all(a.get(k) == b.get(k) for k in keys)
+
+    def fetch_item_html(self, url, etag=None, last_modified=None):
+        """
+        商品ページのHTMLを共有コネクションプールで取得する。
+
+        Returns:
+            tuple: (HTML文字列, レスポンスヘッダー)。条件付きリクエストで 304 の場合 HTML は None
+        """
+        headers = HttpClientManager.build_headers(url, {"Accept-Language": "ja,en;q=0.8"})
+        headers.setdefault("User-Agent", self.DEFAULT_USER_AGENT)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        res = HttpClientManager.get_pool().request("GET", url, headers=headers)
+        if res.status == 304:
+            return None, res.headers
+        if res.status >= 400:
+            raise RuntimeError(f"HTTP {res.status}")
+        return self._decode_html(res.data, res.headers.get("Content-Type", "")), res.headers
+
+    def _decode_html(self, raw, content_type):
+        m = re.search(r"charset=([\w-]+)", content_type, re.I)
+        if not m:
+            m = re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", raw[:4096], re.I)
+        charset = m.group(1) if m else "utf-8"
+        if isinstance(charset, bytes):
+            charset = charset.decode("ascii")
+        try:
+            return raw.decode(charset, errors="replace")
+        except LookupError:
+            return raw.decode("utf-8", errors="replace")
+
+    def fetch_item_variants_static(self, url):
+        """ブラウザを使わずに解析する。取得・解析に失敗した場合は None"""
+        try:
+            html, headers = self.fetch_item_html(url)
+            data = ItemPageParser.parse(html)
+            data["debug"].update({"source": "static", "etag": headers.get("ETag"),
+                                  "last_modified": headers.get("Last-Modified")})
+            return data
+        except Exception as e:
+            print(f"[ANALYSIS] 静的解析失敗: {e}")
+            return None
+
+    def fetch_item_variants_browser(self, url):
+        # 解析用ブラウザ (購入用とは別プロファイル) をヘッドレスで取得
         # ※デバッグモード設定も引き継ぐ
-        driver = ChromeDriverManager.get_driver(is_debug_mode=self.debug_mode, is_headless=True)
+        driver = ChromeDriverManager.get_driver(is_debug_mode=self.debug_mode, is_headless=True,
+                                                role=self.role)
         driver.get(url)
 
         try:
@@ -25,9 +148,9 @@ class ItemAnalysisLogic:
         except:
             pass
 
-        # --- JavaScript 解析ロジック (完全維持) ---
+        # --- JavaScript 解析ロジック (グループ・選択肢・プレフィックスのみ返す) ---
         script = """
-        var res = { groups: [], skuMap: {}, common: {}, debug: { log: [] } };
+        var res = { groups: [], common: {}, debug: { log: [] } };
         function addLog(msg) { res.debug.log.push(msg); }
 
         try {
@@ -42,19 +165,30 @@ class ItemAnalysisLogic:
                 res.common.shopid = (d.shopId || "").toString();
             }
 
-            var htmlSnippet = document.body.innerHTML;
-            var m = htmlSnippet.match(/compass_sku_(\\d+)_/);
+            // プレフィックスはまず属性値から探し、見つからない場合のみ body 全体の HTML を検索する
             var skuPrefix = "";
-
-            if (m) {
-                addLog("Match Found in HTML: " + m[0]);
-                skuPrefix = m[0];
+            var skuEl = document.body.querySelector('[value*="compass_sku_"], [id*="compass_sku_"], [class*="compass_sku_"], [name*="compass_sku_"], [href*="compass_sku_"], [src*="compass_sku_"]');
+            if (skuEl) {
+                for (var a = 0; a < skuEl.attributes.length && !skuPrefix; a++) {
+                    var mAttr = skuEl.attributes[a].value.match(/compass_sku_(\\d+)_/);
+                    if (mAttr) skuPrefix = mAttr[0];
+                }
+            }
+            if (skuPrefix) {
+                addLog("Match Found in attribute: " + skuPrefix);
             } else {
-                addLog("No 'compass_sku_' found. Fallback to 13-digit search.");
-                var mDigit = htmlSnippet.match(/\\d{13}/);
-                if (mDigit) {
-                    addLog("Found 13-digit string: " + mDigit[0]);
-                    skuPrefix = mDigit[0];
+                var htmlSnippet = document.body.innerHTML;
+                var m = htmlSnippet.match(/compass_sku_(\\d+)_/);
+                if (m) {
+                    addLog("Match Found in HTML: " + m[0]);
+                    skuPrefix = m[0];
+                } else {
+                    addLog("No 'compass_sku_' found. Fallback to 13-digit search.");
+                    var mDigit = htmlSnippet.match(/\\d{13}/);
+                    if (mDigit) {
+                        addLog("Found 13-digit string: " + mDigit[0]);
+                        skuPrefix = mDigit[0];
+                    }
                 }
             }
             res.common.base_variant_id = skuPrefix;
@@ -76,23 +210,17 @@ class ItemAnalysisLogic:
                     res.groups.push({ id: gIdx++, name: label, options: opts, type: 'choice' });
                 }
             });
-
-            var skuGroups = res.groups.filter(g => g.type === 'sku');
-            if (skuGroups.length > 0 && skuPrefix !== "") {
-                function combine(list, n, result, current) {
-                    if (n === list.length) { result.push(current.join(',')); return; }
-                    for (var j = 0; j < list[n].options.length; j++) { combine(list, n + 1, result, current.concat([list[n].options[j]])); }
-                }
-                var combs = [];
-                combine(skuGroups, 0, combs, []);
-                combs.forEach((c, i) => { res.skuMap[c] = skuPrefix + (i + 1); });
-                res.common.vid = res.skuMap[combs[0]];
-                addLog("Final VID Example: " + res.common.vid);
-            }
         } catch (e) { res.debug.js_crash = e.message; }
         return res;
         """
         data = driver.execute_script(script)
+        data.setdefault("debug", {})["source"] = "browser"
+        # 組み合わせは転送せず、代表の variant ID のみ静的解析と同じ方法で算出する
+        index = SkuIndex.from_data(data)
+        vid = index.first_vid() if index is not None else None
+        if vid:
+            data.setdefault("common", {})["vid"] = vid
+            data["debug"].setdefault("log", []).append("Final VID Example: " + vid)
 
         if self.debug_mode:
             self._print_detailed_log(data)
@@ -110,16 +238,9 @@ class ItemAnalysisLogic:
         sys.stdout.flush()
 
     def generate_post_payload(self, saved_action_data):
-        parts = saved_action_data.split('|')
-        payload = {
-            "itemid": parts[-2], "shopid": parts[-1], "units": "1", "device": "pc",
-            "userid": "itempage", "response_encode": "utf8", "choice[]": [p for p in parts if ":" in p]
-        }
-        if parts[0].startswith('compass_sku_'):
-            payload["variant_id"] = parts[0]
-        return payload
+        variant_id, choices, item_id, shop_id = CartLine.parse_post_data(saved_action_data)
+        return CartLine.build_payload(1, variant_id, choices, item_id, shop_id)
 
     def close(self):
-        # 【修正】マネージャーの正しい quit_driver を呼び出す
-        # マネージャー内で _instance = None まで完結しているため、これだけでOK
-        ChromeDriverManager.quit_driver()
\ No newline at end of file
+        # 解析用ブラウザのみ終了する (購入用ブラウザとログイン状態は維持)
+        ChromeDriverManager.quit_driver(role=self.role, is_debug_mode=self.debug_mode)
\ No newline at end of file
@@ -2,81 +2,204 @@ import os
 import time
 import json
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 
 from component.chrome_driver_manager import ChromeDriverManager
 from component.user_manager import UserManager
-from component.item_manager import ItemManager
+from component.config_store import ConfigStore
+from component.http_client_manager import HttpClientManager
+from component.cart_line import CartLine
+from component.trace import Tracer
+from component.script_registry import ScriptRegistry
 
 class PurchaseLogic:
     _instance = None
-    _active_script_id = None
+
+    # カート追加POSTの送信経路
+    TRANSPORT_SELENIUM = "selenium"  # ブラウザ内 fetch (no-cors)
+    TRANSPORT_HTTP = "http"  # Cookie を引き継いだ Python からの直送
+
+    # カート追加APIの応答本文 (JSON) の resultCode
+    CART_RESULT_SUCCESS = "success"
+    CART_RESULT_LOGIN_CODES = ("not_login",)  # セッション切れ・未ログイン (ブラウザ経由で送り直す)
+
+    PAGE_TRACE_KEY = "__rakuten_bot_trace"  # 連鎖クリックスクリプトがページ側の計測を残す localStorage キー
+
+    # 連鎖クリックスクリプトの登録名と有効期限 (秒)
+    CHECKOUT_SCRIPT = "checkout_chain"
+    CHECKOUT_SCRIPT_TTL = 300  # 事前登録から実行されないまま残さない
+    CHECKOUT_CHAIN_TTL = 90  # 買い物かごへ遷移してから連鎖が終わるまで (スクリプト側の打ち切りは60秒)
+    DEFAULT_CART_URL = "https://basket.step.rakuten.co.jp/rms/mall/bs/cartall/"
+
+    # ログイン状態の判定 (common.login_cookies / login_indicator / login_timeout_sec で上書き可)
+    LOGIN_INDICATOR = "[class*='log-out'], [href*='log-out'], [class*='my-rakuten'], [href*='my-rakuten']"
+    LOGIN_STATE_TTL = 2.0  # 判定結果を使い回す秒数
+    LOGIN_TIMEOUT_SEC = 300
+    LOGIN_POLL_SEC = 0.5
 
     @classmethod
     def get_instance(cls, debug_mode=True):
         if cls._instance is None:
             cls._instance = cls(debug_mode)
-        else:
-            cls._instance.debug_mode = debug_mode
-            cls._instance._load_config()
+        elif cls._instance.debug_mode != debug_mode:
+            cls._instance.set_debug_mode(debug_mode)
         return cls._instance
 
-    def __init__(self, debug_mode=True):
+    def __init__(self, debug_mode=True, transport=None, headless=False):
         self.debug_mode = debug_mode
+        # 購入用ブラウザをヘッドレスで起動する (CLI からの実行用)
+        self.headless = headless
+        # None の場合は設定ファイル common.cart_transport (既定: selenium) に従う
+        self.transport = transport
+        self._post_executor = None
+        self._http_session = None  # HTTP直送に使う取り込み済みセッション (ドライバーの session_id)
+        self._pinned = None
+        self._store = None
+        self._credentials = None
+        self._login_state = None  # (判定時刻 monotonic, 結果)
         self._load_config()
 
     def _load_config(self):
-        i_mgr = ItemManager(debug_mode=self.debug_mode)
-        conf = i_mgr.load() or {}
-        self.common = conf.get("common") or {}
+        """モードに対応する ConfigStore を購読し、最新の設定を反映する"""
+        if self._store is not None:
+            self._store.unsubscribe(self._on_config_changed)
+        self._store = ConfigStore.get_instance(self.debug_mode)
+        self._store.subscribe(self._on_config_changed)
+        if self._pinned is None:
+            self._apply_snapshot(self._store.snapshot())
+        print(f"[CONFIG] {'DEBUG' if self.debug_mode else 'PRODUCTION'} 設定をロード完了")
+
+    def _apply_snapshot(self, snapshot):
+        self.config = snapshot
+        self.common = snapshot.common
         # itemsの0番目は念のため保持
-        items = conf.get("items", [{}])
+        items = snapshot.items
         self.item = items[0] if items else {}
-        print(f"[CONFIG] {'DEBUG' if self.debug_mode else 'PRODUCTION'} 設定をロード完了")
+
+    def _on_config_changed(self, diff, snapshot):
+        # 予約実行中は固定したスナップショットを使い続ける
+        if self._pinned is None:
+            self._apply_snapshot(snapshot)
+
+    def set_debug_mode(self, debug_mode):
+        self.debug_mode = debug_mode
+        self._load_config()
+
+    def pin_config(self, snapshot=None):
+        """
+        設定を固定する。unpin_config まではファイルが更新されても反映しない。
+
+        Returns:
+            ConfigSnapshot: 固定したスナップショット
+        """
+        if snapshot is None:
+            snapshot = self._store.snapshot()
+        self._pinned = snapshot
+        self._apply_snapshot(snapshot)
+        return snapshot
+
+    def unpin_config(self):
+        self._pinned = None
+        self._apply_snapshot(self._store.snapshot())
+
+    def get_driver(self):
+        """購入用ブラウザを取得する (未起動なら起動する)"""
+        return ChromeDriverManager.get_driver(self.debug_mode, is_headless=self.headless)
 
     def _cleanup_script(self):
-        if PurchaseLogic._active_script_id:
-            try:
-                driver = ChromeDriverManager.get_driver(self.debug_mode)
-                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
-                                       {"identifier": PurchaseLogic._active_script_id})
-                print(f"[CLEANUP] CDP Script Removed: {PurchaseLogic._active_script_id}")
-                PurchaseLogic._active_script_id = None
-            except Exception as e:
-                print(f"[WARN] Failed to remove CDP script: {e}")
+        # 解除のためだけにブラウザを起動しない
+        ScriptRegistry.unregister_all(ChromeDriverManager.peek_driver(self.debug_mode))
 
     def navigate_to(self, url):
         self._cleanup_script()
-        driver = ChromeDriverManager.get_driver(self.debug_mode)
-        driver.get(url)
+        driver = self.get_driver()
+        self._invalidate_login_state()
+        with Tracer.span("navigate", url=url):
+            driver.get(url)
+
+    def _invalidate_login_state(self):
+        self._login_state = None
+
+    def _probe_login(self, driver):
+        """
+        ログイン状態を1回だけ判定する。
+        common.login_cookies (Cookie 名のリスト) があれば Cookie の有無で、
+        無ければ common.login_indicator (CSS セレクタ) の要素の有無で判定する。
+        """
+        cookie_names = self.common.get("login_cookies") or []
+        if cookie_names:
+            names = {c.get("name") for c in driver.get_cookies()}
+            return any(n in names for n in cookie_names)
+        selector = self.common.get("login_indicator") or self.LOGIN_INDICATOR
+        return bool(driver.find_elements(By.CSS_SELECTOR, selector))
+
+    def is_logged_in(self, max_age=LOGIN_STATE_TTL):
+        """
+        ログイン済みかを返す。max_age 秒以内の判定結果があればそれを使う (0 で必ず再判定)。
+        ページ遷移・ログイン操作をしたときは結果を破棄する。
+        """
+        state = self._login_state
+        if state is not None and time.monotonic() - state[0] < max_age:
+            return state[1]
+        try:
+            driver = self.get_driver()
+            result = self._probe_login(driver)
+        except Exception:
+            result = False
+        self._login_state = (time.monotonic(), result)
+        return result
+
+    def wait_for_login(self, timeout=None):
+        """
+        ログイン完了 (TOP への遷移 または ログイン状態の検出) を待つ。
+
+        Args:
+            timeout (float): 待機秒数。None は common.login_timeout_sec (既定: LOGIN_TIMEOUT_SEC)
 
-    def is_logged_in(self):
+        Returns:
+            bool: 時間内に完了したか
+        """
+        if timeout is None:
+            timeout = float(self.common.get("login_timeout_sec") or self.LOGIN_TIMEOUT_SEC)
+        driver = self.get_driver()
+        top_url = self.common.get("top_url") or "https://www.rakuten.co.jp/"
         try:
-            driver = ChromeDriverManager.get_driver(self.debug_mode)
-            source = driver.page_source
-            return "log-out" in source or "my-rakuten" in source
-        except:
+            WebDriverWait(driver, timeout, poll_frequency=self.LOGIN_POLL_SEC).until(
+                lambda d: top_url in d.current_url or self._probe_login(d))
+        except TimeoutException:
+            self._login_state = (time.monotonic(), False)
             return False
+        self._login_state = (time.monotonic(), True)
+        return True
 
     def execute_login(self):
+        with Tracer.span("login") as attrs:
+            attrs["ok"] = self._execute_login()
+            return attrs["ok"]
+
+    def _execute_login(self):
         self._cleanup_script()
-        driver = ChromeDriverManager.get_driver(self.debug_mode)
+        driver = self.get_driver()
         top_url = self.common.get("top_url") or "https://www.rakuten.co.jp/"
         login_url = self.common.get("login_url")
 
         print(f"[LOGIN] ログイン状態確認中... (Mode: {self.debug_mode})")
+        self._invalidate_login_state()
         driver.get(top_url)
 
-        if self.is_logged_in():
+        if self.is_logged_in(max_age=0):
             print("[LOGIN] プロファイルによる自動ログイン成功")
             return True
 
         if login_url:
+            self._invalidate_login_state()
             driver.get(login_url)
 
-        user = UserManager().load()
+        user = self._credentials or UserManager().load()
         user_id = user.get("rakuten_id")
         user_pw = user.get("rakuten_pw")
 
@@ -87,134 +210,470 @@ class PurchaseLogic:
             driver.find_element(By.ID, "loginInner_p").send_keys(user_pw)
             driver.find_element(By.NAME, "submit").click()
 
-            for _ in range(300):
-                if top_url in driver.current_url or self.is_logged_in():
-                    print("[LOGIN] 成功。")
-                    time.sleep(2)
-                    return True
-                time.sleep(1)
+            self._invalidate_login_state()
+            if self.wait_for_login():
+                print("[LOGIN] 成功。")
+                time.sleep(2)
+                return True
+            print("[LOGIN] ログイン完了を確認できませんでした (タイムアウト)")
             return False
         except Exception as e:
             print(f"[ERROR] ログイン失敗: {e}")
             return False
 
-    def execute_cart_post(self, kw_string):
-        """5秒間 全力リトライPOST"""
-        self._cleanup_script()
+    def arm_credentials(self):
+        """
+        ログイン情報を復号して保持する (予約時に一度だけ)。
+        以降の execute_login は設定ファイルの読み込み・復号を行わない。
+        """
+        user = UserManager().load()
+        self._credentials = dict(user) if user.get("is_valid") else None
+        return self._credentials is not None
+
+    def clear_credentials(self):
+        self._credentials = None
+
+    @staticmethod
+    def _to_cart_line(line):
+        """CartLine はそのまま、RAW文字列は CartLine にパースして返す (不正なら ValueError)"""
+        return line if isinstance(line, CartLine) else CartLine.parse(line)
+
+    def _get_cart_transport(self):
+        return self.transport or self.common.get("cart_transport") or self.TRANSPORT_SELENIUM
+
+    def prepare_http_transport(self, warm=True):
+        """
+        ブラウザの Cookie を取り込み、post_url へのコネクションを事前確立する。
+        取り込んだセッションは release_http_transport までの HTTP直送で使用する。
+
+        Returns:
+            bool: Cookie を1件以上取り込めた場合 True
+        """
+        self._http_session = None
         try:
-            driver = ChromeDriverManager.get_driver(self.debug_mode)
-            parts = kw_string.split("###")
-            if len(parts) < 3: return False
-            qty, data_part = parts[0], parts[2]
-            elements = [e.strip() for e in data_part.split("|")]
-            shopid, itemid, vid = elements[-1], elements[-2], elements[0]
-            choice_list = [c.strip() for c in "|".join(elements[1:-2]).split("||") if c.strip()]
+            driver = self.get_driver()
+            if not HttpClientManager.sync_from_driver(driver):
+                print("[WARN] ブラウザの Cookie が 0 件のため、HTTP直送には使用しません")
+                return False
+            self._http_session = driver.session_id
             post_url = self.common.get("post_url")
+            if warm and post_url:
+                HttpClientManager.warm(post_url, session=self._http_session)
+            return True
+        except Exception as e:
+            print(f"[WARN] HTTP transport の準備に失敗: {e}")
+            return False
 
-            payload = {"choice[]": choice_list, "units": qty, "itemid": itemid, "shopid": shopid,
-                       "device": "pc", "userid": "itempage", "response_encode": "utf8"}
-            if vid: payload["variant_id"] = vid
-
-            script = """
-            const postUrl = arguments[0];
-            const payload = arguments[1];
-            const callback = arguments[arguments.length - 1];
-            const startTime = Date.now();
-            const timeout = 5000; 
-
-            const sendRequest = () => {
-                const formData = new URLSearchParams();
-                for (const key in payload) {
-                    if (Array.isArray(payload[key])) {
-                        payload[key].forEach(val => formData.append(key, val));
-                    } else {
-                        formData.append(key, payload[key]);
-                    }
+    def release_http_transport(self):
+        """取り込んだセッションを破棄する (次の実行では取り込み直す)。予約実行の終了時に呼ぶ"""
+        session, self._http_session = self._http_session, None
+        if session is not None:
+            HttpClientManager.reset(session)
+
+    def _current_http_session(self):
+        """
+        HTTP直送に使うセッションを返す。未取り込み、または取り込み元のブラウザが再起動されていれば取り込み直す。
+        取り込めない場合は None
+        """
+        driver = ChromeDriverManager.peek_driver(self.debug_mode)
+        if self._http_session is None or driver is None or driver.session_id != self._http_session:
+            self.release_http_transport()
+            self.prepare_http_transport(warm=False)
+        return self._http_session
+
+    @staticmethod
+    def _parse_result_code(data):
+        """応答本文 (JSON) の resultCode。JSON でない、または含まない場合は None"""
+        try:
+            res = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+        except (ValueError, TypeError):
+            return None
+        return res.get("resultCode") if isinstance(res, dict) else None
+
+    @classmethod
+    def _judge_cart_response(cls, status, data):
+        """
+        HTTP直送の応答 (5xx 以外) を判定する。
+        2xx でも本文の resultCode が success 以外ならカートに入っていないため失敗とし、
+        未ログインのコードはリダイレクトと同じく経路の障害として扱う。resultCode の無い本文はステータスだけで判定する。
+
+        Returns:
+            tuple: (成否, エラー内容, 経路の障害か)
+        """
+        if 300 <= status < 400:
+            return False, f"HTTP {status}", True
+        if status >= 400:
+            return False, f"HTTP {status}", False
+        code = cls._parse_result_code(data)
+        if code is None or code == cls.CART_RESULT_SUCCESS:
+            return True, None, False
+        return False, f"resultCode {code}", code in cls.CART_RESULT_LOGIN_CODES
+
+    def _post_via_http(self, post_url, body, item_id=None, session=None):
+        """
+        5秒間 全力リトライPOST (HTTP直送)。接続エラーと 5xx をリトライ対象とする。
+        3xx はリダイレクトを追わず失敗とする (セッション切れでログインページへ飛ばされた場合など)。
+        2xx の場合も応答本文の resultCode を確認する (_judge_cart_response)。
+
+        Returns:
+            dict: {"ok": bool, "attempts": int, "status": int|None, "elapsed_ms": float, "error": str|None,
+                   "transport_failed": bool}
+            transport_failed は応答が一度も得られなかった、リダイレクトされた、または未ログインと判定された場合に True
+            (HTTP直送の経路自体が使えないため、呼び出し側で Selenium 経由に切り替える)
+        """
+        start = time.monotonic()
+        attempts = 0
+        status = None
+        last_error = None
+        while True:
+            attempts += 1
+            try:
+                with Tracer.span("cart_post.attempt", transport=self.TRANSPORT_HTTP, item_id=item_id) as attrs:
+                    status, data = HttpClientManager.post_body(post_url, body, session)
+                    attrs["status"] = status
+                    if status < 500:
+                        ok, error, transport_failed = self._judge_cart_response(status, data)
+                        attrs["ok"] = ok
+                if status < 500:
+                    return {"ok": ok, "attempts": attempts, "status": status,
+                            "elapsed_ms": (time.monotonic() - start) * 1000, "error": error,
+                            "transport_failed": transport_failed}
+                last_error = f"HTTP {status}"
+            except Exception as e:
+                last_error = str(e)
+            if time.monotonic() - start >= 5.0:
+                return {"ok": False, "attempts": attempts, "status": status,
+                        "elapsed_ms": (time.monotonic() - start) * 1000, "error": last_error,
+                        "transport_failed": status is None}
+            time.sleep(0.25)
+
+    # 1行～複数行の POST を1回の execute_async_script でまとめて送信する
+    # 各行が独立した5秒間のリトライ窓を持ち、行ごとの結果を配列で返す
+    _BATCH_POST_SCRIPT = """
+    const postUrl = arguments[0];
+    const payloads = arguments[1];
+    const callback = arguments[arguments.length - 1];
+    const timeout = 5000;
+
+    const toForm = (payload) => {
+        const formData = new URLSearchParams();
+        for (const key in payload) {
+            if (Array.isArray(payload[key])) {
+                payload[key].forEach(val => formData.append(key, val));
+            } else {
+                formData.append(key, payload[key]);
+            }
+        }
+        return formData;
+    };
+
+    const batchStart = performance.now();
+    const postOne = (payload) => new Promise(resolve => {
+        const startTime = performance.now();
+        const tries = [];  // 試行ごとの [開始, 終了, エラー] (batchStart からの ms)
+        let attempts = 0;
+        const sendRequest = () => {
+            attempts++;
+            const tryStart = performance.now() - batchStart;
+            const record = (err) => tries.push([tryStart, performance.now() - batchStart, err]);
+            fetch(postUrl, {
+                method: "POST",
+                body: toForm(payload),
+                mode: "no-cors",
+                credentials: "include",
+                headers: {"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"}
+            })
+            .then(() => {
+                record(null);
+                resolve({ok: true, attempts: attempts, elapsed_ms: performance.now() - startTime, error: null, tries: tries});
+            })
+            .catch((e) => {
+                record(String(e));
+                if (performance.now() - startTime < timeout) {
+                    setTimeout(sendRequest, 250);
+                } else {
+                    resolve({ok: false, attempts: attempts, elapsed_ms: performance.now() - startTime, error: String(e), tries: tries});
                 }
-                fetch(postUrl, {
-                    method: "POST",
-                    body: formData,
-                    mode: "no-cors",
-                    credentials: "include",
-                    headers: {"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"}
-                })
-                .then(() => callback(true))
-                .catch(() => {
-                    if (Date.now() - startTime < timeout) {
-                        setTimeout(sendRequest, 250); 
-                    } else {
-                        callback(false); 
-                    }
-                });
-            };
-            sendRequest();
-            """
+            });
+        };
+        sendRequest();
+    });
+
+    Promise.all(payloads.map(postOne)).then(callback);
+    """
+
+    def _get_post_executor(self):
+        if self._post_executor is None:
+            self._post_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="cart_post")
+        return self._post_executor
+
+    def execute_cart_post_batch(self, lines):
+        """
+        複数のカート行を同時にPOSTし、行ごとの結果を返す。
+
+        Args:
+            lines (list): CartLine (または qty###name###vid|choices|itemid|shopid 形式の文字列) のリスト
+
+        Returns:
+            list: 入力と同じ順序の dict リスト
+                {"line", "ok", "attempts", "status", "elapsed_ms", "error", "transport"}
+        """
+        # ※ ページ遷移を伴わないため、事前登録済みの連鎖クリックスクリプトは解除しない
+        results = [None] * len(lines)
+        targets = []
+        for i, line in enumerate(lines):
+            try:
+                targets.append((i, self._to_cart_line(line)))
+            except ValueError as e:
+                results[i] = {"line": line, "ok": False, "attempts": 0, "status": None, "elapsed_ms": 0.0,
+                              "error": str(e), "transport": None}
+        if not targets:
+            return results
+
+        with Tracer.span("cart_post.batch", lines=len(targets)) as attrs:
+            results = self._post_targets(targets, results)
+            attrs["ok"] = sum(1 for r in results if r["ok"])
+        return results
+
+    def _post_targets(self, targets, results):
+        post_url = self.common.get("post_url")
+        transport = self._get_cart_transport()
+
+        if transport == self.TRANSPORT_HTTP:
+            # 経路の障害 (接続不可・タイムアウト・リダイレクト・未ログイン) で失敗した行だけを Selenium 経由で送り直す
+            fallback = []
+            try:
+                session = self._current_http_session()
+                if session is None:
+                    raise RuntimeError("ブラウザのセッションを取り込めません")
+                executor = self._get_post_executor()
+                post = Tracer.wrap(self._post_via_http)
+                futures = [(i, line, executor.submit(post, post_url, line.body, line.item_id, session))
+                           for i, line in targets]
+                for i, line, f in futures:
+                    res = f.result()
+                    if res.pop("transport_failed"):
+                        print(f"[WARN] HTTP POST 失敗 ({res['error']})。Selenium 経由で再送します: {line.item_id}")
+                        fallback.append((i, line))
+                        continue
+                    res.update({"line": line, "transport": transport})
+                    results[i] = res
+            except Exception as e:
+                print(f"[WARN] HTTP POST 失敗。Selenium 経由にフォールバックします: {e}")
+                fallback = [(i, line) for i, line in targets if results[i] is None]
+            if not fallback:
+                return results
+            targets = fallback
+
+        try:
+            driver = self.get_driver()
             driver.set_script_timeout(10)
-            return driver.execute_async_script(script, post_url, payload)
+            call_start = time.monotonic()
+            js_results = driver.execute_async_script(self._BATCH_POST_SCRIPT, post_url,
+                                                     [line.payload for _, line in targets])
+            for (i, line), res in zip(targets, js_results):
+                # ページ内の試行時刻はスクリプト開始からの相対値のため、呼び出し時刻を起点に換算する
+                for t_start, t_end, err in res.pop("tries", None) or []:
+                    Tracer.add_span("cart_post.attempt", call_start + t_start / 1000, call_start + t_end / 1000,
+                                    error=err, transport=self.TRANSPORT_SELENIUM, item_id=line.item_id)
+                res.update({"line": line, "status": None, "transport": self.TRANSPORT_SELENIUM})
+                results[i] = res
         except Exception as e:
-            print(f"[ERROR] execute_cart_post 失敗: {e}")
-            return False
+            print(f"[ERROR] execute_cart_post_batch 失敗: {e}")
+            for i, line in targets:
+                results[i] = {"line": line, "ok": False, "attempts": 0, "status": None, "elapsed_ms": 0.0,
+                              "error": str(e), "transport": self.TRANSPORT_SELENIUM}
+        return results
 
-    def go_to_checkout(self):
-        """混雑検知リロード ＋ 自動連鎖クリック"""
-        driver = ChromeDriverManager.get_driver(self.debug_mode)
-        target_url = self.common.get("cart_url") or "https://basket.step.rakuten.co.jp/rms/mall/bs/cartall/"
+    def execute_cart_post(self, line):
+        """5秒間 全力リトライPOST"""
+        res = self.execute_cart_post_batch([line])[0]
+        if not res["ok"] and res["error"]:
+            print(f"[ERROR] execute_cart_post 失敗: {res['error']}")
+        return res["ok"]
 
-        targets = ["ご購入手続き", "購入手続き"]
+    # 連鎖クリックの対象になり得る要素 (セレクタは事前に1つにまとめておく)
+    CLICKABLE_SELECTOR = 'button, a, input[type="submit"], input[type="button"], div[role="button"]'
+    CONGESTION_KEYWORDS = ["混み合って", "アクセスが集中", "システムエラー", "時間をおいて"]
+
+    def _build_checkout_script(self):
+        """
+        購入手続きボタン等を検知してクリックする連鎖スクリプトを生成する。
+
+        一定間隔で DOM 全体を走査するのではなく、MutationObserver で追加・変更された
+        ノードだけを調べるため、ボタンが描画された時点で即座にクリックできる。
+        クリック後も要素が残っている場合 (ハンドラ未登録・無効化中など) は一定間隔で押し直す。
+        連鎖の進み具合は段階 (購入手続き → 注文確定) の番号で管理し、押した要素がページに残ったまま
+        次の段階のボタンが現れた場合 (全体を再読み込みせずに内容を差し替えるページ) もそちらへ進む。
+        対象URL・トップフレームの判定は ScriptRegistry の登録時に付与する。
+        """
+        # 連鎖の段階ごとのボタン文言 (前の段階へは戻らない)
+        steps = [["ご購入手続き", "購入手続き"]]
         if not self.debug_mode:
-            targets.extend(["注文を確定する", "注文を確定"])
-            print("[PYTHON] 本番モード：注文確定まで連鎖します。")
-        else:
-            print("[PYTHON] デバッグモード：注文確定は押しません。")
+            steps.append(["注文を確定する", "注文を確定"])
 
-        targets_json = json.dumps(targets, ensure_ascii=False)
-        fast_chain_script = """
+        return """
         (function() {
             const start = Date.now();
-            const targets = """ + targets_json + """;
-            const errKws = ["混み合って", "アクセスが集中", "システムエラー", "時間をおいて"];
+            const steps = """ + json.dumps(steps, ensure_ascii=False) + """;
+            const errKws = """ + json.dumps(self.CONGESTION_KEYWORDS, ensure_ascii=False) + """;
+            const selector = """ + json.dumps(self.CLICKABLE_SELECTOR) + """;
+            const TIMEOUT_MS = 60000, RECLICK_MS = 250;
+
+            // 計測用: ページ表示・クリック時刻を localStorage に残し、Python 側で回収する
+            const traceKey = """ + json.dumps(self.PAGE_TRACE_KEY) + """;
+            const report = (name, attrs) => {
+                try {
+                    const log = JSON.parse(localStorage.getItem(traceKey) || "[]");
+                    log.push(Object.assign({name: name, t: Date.now(), url: location.href}, attrs || {}));
+                    localStorage.setItem(traceKey, JSON.stringify(log));
+                } catch (e) {}
+            };
+            report("page.load");
+
+            let observer = null, clicked = null, clickedStep = -1, stopped = false;
+            const stop = () => {
+                stopped = true;
+                if (observer) observer.disconnect();
+            };
 
-            const interval = setInterval(() => {
-                if (window.self !== window.top) return;
+            // textContent はレイアウトを発生させないため innerText の代わりに使う
+            const labelOf = (el) => {
+                const t = (el.tagName === "INPUT" ? el.value : el.textContent) || el.getAttribute("aria-label") || "";
+                return t.replace(/\\s/g, "");
+            };
+            // 一致した [段階, 文言]。後の段階を優先する (一致しなければ null)
+            const matchStep = (el) => {
+                const t = labelOf(el);
+                if (!t) return null;
+                for (let i = steps.length - 1; i >= 0; i--) {
+                    const label = steps[i].find(k => t.includes(k));
+                    if (label) return [i, label];
+                }
+                return null;
+            };
 
-                const txt = document.body.innerText || "";
+            const isCongested = () => {
+                const txt = (document.body && document.body.textContent) || "";
+                return errKws.filter(k => txt.includes(k)).length >= 2;
+            };
+            const checkCongestion = () => {
                 // 混雑検知（2つ以上キーワードがヒットしたらリロード）
-                if (errKws.filter(k => txt.includes(k)).length >= 2) {
-                    console.log("[JS] 混雑検知 -> 自動リロード");
-                    location.reload();
+                if (stopped || !isCongested()) return false;
+                console.log("[JS] 混雑検知 -> 自動リロード");
+                report("page.congestion_reload");
+                stop();
+                location.reload();
+                return true;
+            };
+
+            const click = (el, step, label) => {
+                if (stopped) return;
+                if (!el.isConnected) {
+                    // 再描画で差し替えられた場合は探し直す
+                    if (clicked === el) { clicked = null; inspect(document.documentElement); }
                     return;
                 }
+                if (clicked !== el) {
+                    clicked = el;
+                    clickedStep = step;
+                    console.log("[JS] Target found:", el);
+                    report("page.click", {label: label, step: step, after_ms: Date.now() - start});
+                }
+                el.click();
+                el.dispatchEvent(new MouseEvent('click', {bubbles: true, view: window}));
+                // 遷移しないまま要素が残っていれば押し直す (次の段階へ進んだら止める)
+                setTimeout(() => { if (clicked === el) click(el, step, label); }, RECLICK_MS);
+            };
 
-                const elements = Array.from(document.querySelectorAll('button, a, input, div[role="button"]'));
-                const target = elements.find(el => {
-                    const t = (el.innerText || el.value || el.getAttribute('aria-label') || "").replace(/\\s/g, "");
-                    return targets.some(k => t.includes(k));
-                });
-
-                if (target) {
-                    console.log("[JS] Target found:", target);
-                    target.click();
-                    target.dispatchEvent(new MouseEvent('click', {bubbles: true, view: window}));
+            const inspect = (node) => {
+                if (stopped) return;
+                // 押した要素が残っている間は次の段階のボタンだけを探す。
+                // 差し替えで消えた場合は同じ段階の新しいボタンも対象にする
+                const minStep = clicked && clicked.isConnected ? clickedStep + 1 : Math.max(clickedStep, 0);
+                if (minStep >= steps.length) return;
+                if (node.nodeType === Node.TEXT_NODE) node = node.parentElement;
+                if (!node || node.nodeType !== Node.ELEMENT_NODE) return;
+                const candidates = node.closest(selector) ? [node.closest(selector)] : node.querySelectorAll(selector);
+                let best = null;
+                for (const el of candidates) {
+                    const m = el === clicked ? null : matchStep(el);
+                    if (m && m[0] >= minStep && (!best || m[0] > best[1])) {
+                        best = [el, m[0], m[1]];
+                        if (m[0] === steps.length - 1) break;
+                    }
                 }
+                if (best) click(best[0], best[1], best[2]);
+            };
 
-                if (Date.now() - start > 60000) clearInterval(interval);
-            }, 100);
+            observer = new MutationObserver((mutations) => {
+                for (const m of mutations) {
+                    if (m.type === "childList") {
+                        for (const node of m.addedNodes) {
+                            // 混雑文言を含むノードが追加された場合のみページ全体を確認する
+                            const txt = node.textContent || "";
+                            if (errKws.some(k => txt.includes(k)) && checkCongestion()) return;
+                            inspect(node);
+                        }
+                    } else {
+                        inspect(m.target);
+                    }
+                }
+                if (Date.now() - start > TIMEOUT_MS) stop();
+            });
+            observer.observe(document, {childList: true, subtree: true, characterData: true,
+                                        attributes: true, attributeFilter: ["value", "aria-label", "disabled"]});
+            // 取りこぼし防止: 解析完了時点で一度だけ全体を確認する
+            document.addEventListener("DOMContentLoaded", () => {
+                if (!checkCongestion()) inspect(document.documentElement);
+            });
+            setTimeout(stop, TIMEOUT_MS);
         })();
         """
 
+    def _checkout_url_patterns(self):
+        """
+        連鎖クリックを有効にするURLの正規表現。
+        買い物かごと同じオリジン配下に加え、common.checkout_url_patterns で追加できる。
+        """
+        patterns = [ScriptRegistry.url_pattern_for(self.common.get("cart_url") or self.DEFAULT_CART_URL)]
+        patterns.extend(self.common.get("checkout_url_patterns") or [])
+        return [p for p in patterns if p]
+
+    def prepare_checkout(self):
+        """連鎖クリックスクリプトを事前登録する (次のページ遷移から、対象URLのトップフレームでのみ有効)"""
+        driver = self.get_driver()
         try:
-            self._cleanup_script()
-            res = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": fast_chain_script})
-            PurchaseLogic._active_script_id = res.get("identifier")
-            print(f"[REGISTER] CDP Script ID: {PurchaseLogic._active_script_id}")
+            with Tracer.span("cdp.register"):
+                ScriptRegistry.register(driver, self.CHECKOUT_SCRIPT, self._build_checkout_script(),
+                                        url_patterns=self._checkout_url_patterns(), ttl=self.CHECKOUT_SCRIPT_TTL)
+            return True
         except Exception as e:
             print(f"[WARN] CDP injection failed: {e}")
+            return False
+
+    def go_to_checkout(self):
+        """混雑検知リロード ＋ 自動連鎖クリック"""
+        driver = self.get_driver()
+        target_url = self.common.get("cart_url") or self.DEFAULT_CART_URL
+
+        if not self.debug_mode:
+            print("[PYTHON] 本番モード：注文確定まで連鎖します。")
+        else:
+            print("[PYTHON] デバッグモード：注文確定は押しません。")
+
+        # ウォームアップで同じ内容が登録済みならそのまま使う
+        if not ScriptRegistry.is_registered(driver, self.CHECKOUT_SCRIPT, self._build_checkout_script()):
+            self.prepare_checkout()
+        # 連鎖が終わる頃に自動で解除する
+        ScriptRegistry.extend(driver, self.CHECKOUT_SCRIPT, self.CHECKOUT_CHAIN_TTL)
 
         # --- 移動リトライ処理 (502等対策) ---
         print(f"[PYTHON] 買い物かごへ移動します: {target_url}")
         for i in range(5):
             try:
-                driver.get(target_url)
+                with Tracer.span("checkout.navigate", attempt=i + 1):
+                    driver.get(target_url)
                 break
             except Exception as e:
                 print(f"[RETRY] ページ移動失敗 ({i+1}/5): {e}")
@@ -222,9 +681,118 @@ class PurchaseLogic:
 
         return True
 
+    def collect_page_trace(self):
+        """
+        連鎖クリックスクリプトが localStorage に残した記録を回収し、トレースに追加する。
+        localStorage はオリジン単位のため、現在表示中のページと同一オリジンの記録のみ取得できる。
+        """
+        driver = ChromeDriverManager.peek_driver(self.debug_mode)
+        if driver is None: return 0
+        try:
+            raw = driver.execute_script(
+                "const k = arguments[0]; const v = localStorage.getItem(k); localStorage.removeItem(k); return v;",
+                self.PAGE_TRACE_KEY)
+            entries = json.loads(raw) if raw else []
+        except Exception as e:
+            print(f"[TRACE] ページ側の記録の回収に失敗: {e}")
+            return 0
+        for entry in entries:
+            t = entry.pop("t", None)
+            name = entry.pop("name", "page")
+            if t is not None:
+                Tracer.event(name, at=Tracer.wall_to_monotonic(t), **entry)
+        return len(entries)
+
+    def finish_trace(self, settle_sec=3.0, on_done=None, wait=False):
+        """
+        このスレッドで実行中のトレースを切り離し、連鎖クリックの完了を settle_sec 秒待ってから
+        ページ側の記録を回収して書き出す。待機は別スレッドで行い、呼び出し元は待たせない。
+
+        Args:
+            on_done (callable): 書き出し後に on_done(トレースファイルのパス, Tracer.summarize の結果) を呼ぶ
+            wait (bool): 書き出しが終わるまで待つ (直後にブラウザを終了する CLI 用)
+
+        Returns:
+            bool: 実行中のトレースがあったか
+        """
+        run = Tracer.detach()
+        if run is None:
+            return False
+
+        def finish():
+            with Tracer.bind(run):
+                self.collect_page_trace()
+            path, summary = Tracer.end_run(run)
+            if on_done:
+                try:
+                    on_done(path, summary)
+                except Exception as e:
+                    print(f"[TRACE] 集計の通知で例外: {e}")
+
+        timer = threading.Timer(settle_sec, finish)
+        timer.daemon = True
+        timer.start()
+        if wait:
+            timer.join()
+        return True
+
+    # --- ウォームアップ用 (WarmupPipeline から呼ばれる) ---
+    def verify_login(self):
+        """ログイン状態を再確認し、切れていれば再ログインする"""
+        return self.execute_login()
+
+    def preconnect(self):
+        """カートページへ事前遷移し、cart_url / post_url への DNS・TLS 接続を温める"""
+        driver = self.get_driver()
+        cart_url = self.common.get("cart_url")
+        post_url = self.common.get("post_url")
+        if cart_url:
+            self.navigate_to(cart_url)
+        if post_url:
+            try:
+                driver.execute_script("""
+                    const link = document.createElement('link');
+                    link.rel = 'preconnect';
+                    link.href = new URL(arguments[0]).origin;
+                    link.crossOrigin = 'use-credentials';
+                    document.head.appendChild(link);
+                """, post_url)
+            except Exception as e:
+                print(f"[WARN] preconnect 挿入失敗: {e}")
+            if self._get_cart_transport() == self.TRANSPORT_HTTP:
+                # Cookie を取り込めなければ段階を失敗として記録する (発火時に取り込み直す)
+                return self.prepare_http_transport()
+        return True
+
+    def prepare_cart_lines(self, lines):
+        """
+        カート行を CartLine (構築済みペイロード付き) に揃えて検証する。
+        不正な行は除外し、トリガー時に使用する CartLine のリストを返す。
+        """
+        prepared = []
+        for line in lines:
+            try:
+                prepared.append(self._to_cart_line(line))
+            except ValueError as e:
+                print(f"[WARN] 不正なカート行を除外: {e}")
+        return prepared
+
+    def close(self):
+        """
+        設定の購読・POST 用スレッドプール・HTTP直送用のセッションを解放する (ブラウザは終了しない)。
+        予約実行用に作った PurchaseLogic は使い終わったら呼ぶこと。
+        """
+        if self._store is not None:
+            self._store.unsubscribe(self._on_config_changed)
+        if self._post_executor is not None:
+            self._post_executor.shutdown(wait=False)
+            self._post_executor = None
+        self.release_http_transport()
+        self.clear_credentials()
+
     def quit_browser(self):
-        """ブラウザを終了してマネージャーをリセット"""
+        """購入用ブラウザを終了してマネージャーをリセット"""
         self._cleanup_script()
-        from component.chrome_driver_manager import ChromeDriverManager
-        ChromeDriverManager.quit_driver()
+        self.release_http_transport()
+        ChromeDriverManager.quit_driver(role=ChromeDriverManager.ROLE_PURCHASE, is_debug_mode=self.debug_mode)
         print("[BROWSER] Driver closed.")
\ No newline at end of file
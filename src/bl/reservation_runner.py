@@ -0,0 +1,128 @@
+from component.trace import Tracer
+
+
+class ReservationRunner:
+    """
+    予約実行の一連の流れ (設定固定 → 時計補正 → ウォームアップ → 発火 → カート追加 → 購入手続き) を行う。
+    画面 (ProductController) と CLI の双方から使うため、tkinter には依存しない。
+
+    logger は info / warning / error を持つもの (LogWindowParts や logging.Logger)。
+    on_event を指定すると、進捗を on_event(名前, 詳細の辞書) でも通知する。
+    トレースの集計は発火の数秒後に別スレッドから通知する (wait_trace=True なら書き出しまで待つ)。
+    """
+
+    def __init__(self, logic, logger, on_event=None, wait_trace=False):
+        self.logic = logic
+        self.logger = logger
+        self.on_event = on_event
+        self.wait_trace = wait_trace
+
+    def _emit(self, name, **detail):
+        if self.on_event:
+            self.on_event(name, detail)
+
+    def run(self, target_time, lines, stop_event, snapshot):
+        """
+        target_time まで待機して実行する (呼び出したスレッドで待機する)。
+
+        Returns:
+            list: 行ごとのカート追加POSTの結果 (execute_cart_post_batch の戻り値)。キャンセル時は None
+        """
+        # 予約時点の設定に固定し、待機中に設定が保存されても実行内容を変えない
+        self.logic.pin_config(snapshot)
+        # ログイン情報もここで復号しておき、ウォームアップ中のログインでは復号しない
+        if not self.logic.arm_credentials():
+            self.logger.warning("[SCHEDULE] ログイン情報を復号できませんでした")
+        Tracer.start_run("scheduled", lines=len(lines), debug_mode=self.logic.debug_mode,
+                         target=target_time.strftime("%Y-%m-%d %H:%M:%S"))
+        try:
+            from component.trigger_scheduler import TriggerScheduler
+            from bl.warmup_pipeline import WarmupPipeline
+            scheduler = TriggerScheduler()
+            top_url = snapshot.common.get("top_url")
+            if top_url and scheduler.calibrate(top_url) is not None:
+                self.logger.info(f"[CLOCK] サーバー時計差 {scheduler.clock_offset * 1000:+.1f}ms を補正します")
+                self._emit("clock", offset_ms=round(scheduler.clock_offset * 1000, 3))
+            deadline = scheduler.to_deadline(target_time)
+
+            pipeline = WarmupPipeline(self.logic, lines, log=self.logger.info)
+            timings = pipeline.run(scheduler, deadline, stop_event)
+            if timings is None: return None
+            for name, elapsed, ok in timings:
+                self._emit("warmup", stage=name, elapsed_ms=round(elapsed, 1), ok=ok)
+            lines = pipeline.lines
+
+            error_ms = scheduler.wait_until(deadline, stop_event)
+            if error_ms is None: return None
+            Tracer.event("trigger", error_ms=error_ms)
+            results = self.post_lines(lines)
+            try:
+                self.logic.go_to_checkout()
+            finally:
+                self.report_posts(lines, results)
+            self.logger.info(f"[TRIGGER] 発火誤差 {error_ms:+.3f}ms")
+            self._emit("trigger", error_ms=round(error_ms, 3))
+            self.report_trace()
+            return results
+        finally:
+            if Tracer.is_active(): Tracer.end_run()
+            self.logic.unpin_config()
+            self.logic.clear_credentials()
+            # HTTP直送のセッションは実行ごとに取り込み直す
+            self.logic.release_http_transport()
+
+    def run_now(self, lines):
+        """
+        待機せずに即時実行する。
+
+        Returns:
+            list: 行ごとのカート追加POSTの結果
+        """
+        Tracer.start_run("instant", lines=len(lines), debug_mode=self.logic.debug_mode)
+        Tracer.event("trigger")
+        try:
+            results = self.post_lines(lines)
+        finally:
+            self.logic.release_http_transport()
+        try:
+            self.logic.go_to_checkout()
+        finally:
+            self.report_posts(lines, results)
+        self._emit("trigger", error_ms=None)
+        self.report_trace()
+        return results
+
+    def post_lines(self, lines):
+        """
+        選択行を一括POSTし、行ごとの結果を返す。
+        発火から購入手続きへの遷移までの間にログ・標準出力へ書き込まないよう、結果の出力は report_posts で行う。
+        """
+        if not lines: return []
+        return self.logic.execute_cart_post_batch(lines)
+
+    def report_posts(self, lines, results):
+        """post_lines の結果を行ごとにログ出力し、post イベントで通知する (購入手続きへの遷移後に呼ぶ)"""
+        for line, res in zip(lines, results):
+            detail = f"{line.product_name} (試行{res['attempts']}回 / {res['elapsed_ms']:.0f}ms)"
+            if res["ok"]: self.logger.info(f"POST成功: {detail}")
+            else: self.logger.error(f"POST失敗: {detail} {res['error'] or ''}")
+            self._emit("post", line=line.id, item=line.product_name, ok=res["ok"],
+                       attempts=res["attempts"], status=res["status"], transport=res["transport"],
+                       elapsed_ms=round(res["elapsed_ms"], 1), error=res["error"])
+
+    @staticmethod
+    def all_ok(results):
+        """すべての行のPOSTが成功したか (キャンセル時の None は失敗扱い)"""
+        return results is not None and all(r["ok"] for r in results)
+
+    def report_trace(self):
+        """実行トレースの書き出しを依頼する (集計は書き出し後に _report_summary でログに表示する)"""
+        self.logic.finish_trace(on_done=self._report_summary, wait=self.wait_trace)
+
+    def _report_summary(self, path, summary):
+        if not summary: return
+        self.logger.info("[TRACE] 段階別所要時間 (T は発火からの経過)")
+        for line in Tracer.format_summary(summary):
+            self.logger.info(f"[TRACE]   {line}")
+        if path: self.logger.info(f"[TRACE] {path}")
+        self._emit("trace", path=path, phases=summary)
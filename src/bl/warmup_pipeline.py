@@ -0,0 +1,72 @@
+import time
+
+from component.trace import Tracer
+
+
+class WarmupPipeline:
+    """
+    予約実行前のウォームアップ段階を、目標時刻からの相対秒で順に実行する。
+
+    既定の段階:
+        verify_login (T-120s) : ログイン状態の再確認
+        preconnect   (T-30s)  : cart_url へ事前遷移し、post_url への接続を温める
+        prepare      (T-5s)   : カート行のPOSTペイロード構築と連鎖クリックスクリプトの事前登録
+
+    段階ごとの秒数は item_info の common.warmup_stages ({"verify_login": 120, ...}) で上書きでき、
+    0 または null を指定した段階は実行しない。
+    """
+    DEFAULT_STAGES = {"verify_login": 120, "preconnect": 30, "prepare": 5}
+
+    def __init__(self, logic, lines, stages=None, log=print):
+        self.logic = logic
+        self.lines = list(lines)
+        self.log = log
+        conf = dict(self.DEFAULT_STAGES)
+        conf.update(stages if stages is not None else (logic.common.get("warmup_stages") or {}))
+        # 目標時刻から遠い順に並べる
+        self.stages = sorted(((name, sec) for name, sec in conf.items() if sec),
+                             key=lambda x: -x[1])
+        self.timings = []
+
+    def _run_stage(self, name):
+        if name == "verify_login":
+            return self.logic.verify_login()
+        if name == "preconnect":
+            return self.logic.preconnect()
+        if name == "prepare":
+            # 検証済みの CartLine に揃え、トリガー時はパース不要の状態にする
+            self.lines = self.logic.prepare_cart_lines(self.lines)
+            return self.logic.prepare_checkout()
+        raise ValueError(f"未知のウォームアップ段階: {name}")
+
+    def run(self, scheduler, deadline, stop_event=None):
+        """
+        各段階の開始時刻まで待機しながら順に実行する。
+
+        Args:
+            scheduler (TriggerScheduler): 待機に使用するスケジューラー
+            deadline (float): 目標時刻の time.monotonic() 期限
+
+        Returns:
+            list: [(段階名, 所要ms, 成否), ...]。キャンセル時は None
+        """
+        self.timings = []
+        for name, sec in self.stages:
+            if deadline - time.monotonic() <= 0:
+                self.log(f"[WARMUP] 目標時刻に達したため {name} 以降を省略します")
+                break
+            if scheduler.wait_until(deadline - sec, stop_event) is None:
+                return None
+
+            start = time.monotonic()
+            try:
+                with Tracer.span(f"warmup.{name}") as attrs:
+                    ok = attrs["ok"] = bool(self._run_stage(name))
+            except Exception as e:
+                print(f"[WARN] ウォームアップ {name} 失敗: {e}")
+                ok = False
+            elapsed = (time.monotonic() - start) * 1000
+            self.timings.append((name, elapsed, ok))
+            left = deadline - time.monotonic()
+            self.log(f"[WARMUP] T-{sec}s {name} {'完了' if ok else '失敗'} ({elapsed:.1f}ms, 残り {left:.1f}s)")
+        return self.timings
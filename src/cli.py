@@ -0,0 +1,196 @@
+"""
+画面 (tkinter) を使わずに予約実行を行うコマンドライン / 常駐用エントリポイント。
+
+    cd src
+    python -m cli job.json            # ジョブ定義に従って実行
+    python -m cli job.json --check    # ジョブ定義と設定の検証のみ
+    cat job.json | python -m cli -    # 標準入力から読み込む
+
+ジョブ定義 (JSON):
+    {
+        "mode": "debug",                    # debug (既定) / production
+        "at": "2026-01-01 10:00:00",        # 実行時刻。省略時は即時実行
+        "lines": ["item_0_k0"],             # 対象の行ID。省略時は有効な全行
+        "headless": true,                   # 購入用ブラウザをヘッドレスで起動 (既定: true)
+        "login": true,                      # 実行前にログインする (既定: true)
+        "transport": "http"                 # カート追加POSTの送信経路 (省略時は設定ファイルに従う)
+    }
+
+進捗は1行1イベントの JSON ({"ts", "event", ...}) として標準出力へ、
+各コンポーネントのログは標準エラーへ出力する。
+カート追加の結果は購入手続きへの遷移を始めた後に、行ごとの post イベント ({"line", "ok", "attempts", "status", "error", ...}) で出力し、
+最後の done イベントに失敗した行IDの一覧 (failed) を含める。
+終了コード: 0 完了 / 1 実行失敗 (POSTに失敗した行がある場合を含む) / 2 ジョブ・設定の不備 / 130 中断
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from component.config_store import ConfigStore
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INVALID = 2
+EXIT_CANCELLED = 130
+
+
+class Progress:
+    """進捗イベントを JSON Lines で書き出す (複数スレッドから呼ばれる)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def emit(self, event, detail=None):
+        record = {"ts": datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3], "event": event}
+        record.update(detail or {})
+        with self._lock:
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self.stream.flush()
+
+
+def load_job(path):
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve_job(job, snapshot):
+    """
+    ジョブ定義を検証し、実行時刻と CartLine のリストに解決する。
+
+    Returns:
+        tuple: (実行時刻 datetime または None, [CartLine])
+
+    Raises:
+        ValueError: ジョブ定義・設定に不備がある場合
+    """
+    target_time = None
+    if job.get("at"):
+        try:
+            target_time = datetime.strptime(job["at"], "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            raise ValueError(f"at の形式が不正です (YYYY-MM-DD HH:MM:SS): {job['at']}")
+        if target_time <= datetime.now():
+            raise ValueError(f"過去の時刻は指定できません: {job['at']}")
+
+    line_ids = job.get("lines")
+    if line_ids is None:
+        lines = list(snapshot.cart_lines.values())
+    else:
+        unknown = [i for i in line_ids if i not in snapshot.cart_lines]
+        if unknown:
+            raise ValueError(f"設定に存在しない (または不正な) 行IDです: {', '.join(unknown)}")
+        lines = [snapshot.cart_lines[i] for i in line_ids]
+    if not lines:
+        raise ValueError("購入対象の行がありません")
+    if not snapshot.common.get("top_url"):
+        raise ValueError("top_url が設定されていません")
+    return target_time, lines
+
+
+def _build_logger():
+    logger = logging.getLogger("rakuten_bot.cli")
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def run(job, progress, logger, stop_event, check_only=False):
+    debug_mode = job.get("mode", "debug") != "production"
+    snapshot = ConfigStore.get_instance(debug_mode).snapshot()
+    try:
+        target_time, lines = resolve_job(job, snapshot)
+    except ValueError as e:
+        progress.emit("invalid", {"error": str(e)})
+        return EXIT_INVALID
+
+    from component.user_manager import UserManager
+    if job.get("login", True) and not UserManager().is_valid():
+        progress.emit("invalid", {"error": "ユーザー情報が未設定、または復号できません"})
+        return EXIT_INVALID
+
+    progress.emit("job", {"mode": "debug" if debug_mode else "production", "config": snapshot.file_path,
+                          "at": target_time, "lines": [line.id for line in lines]})
+    if check_only:
+        return EXIT_OK
+
+    from bl.purchase_logic import PurchaseLogic
+    from bl.reservation_runner import ReservationRunner
+    from component.chrome_driver_manager import ChromeDriverManager
+
+    logic = PurchaseLogic(debug_mode=debug_mode, transport=job.get("transport"), headless=job.get("headless", True))
+    logic.pin_config(snapshot)
+    try:
+        start = time.monotonic()
+        logic.navigate_to(snapshot.common["top_url"])
+        progress.emit("browser", {"launch_ms": round((time.monotonic() - start) * 1000, 1),
+                                  "headless": logic.headless})
+
+        if job.get("login", True):
+            ok = logic.execute_login()
+            progress.emit("login", {"ok": ok})
+            if not ok:
+                return EXIT_FAILED
+
+        runner = ReservationRunner(logic, logger, on_event=progress.emit, wait_trace=True)
+        if target_time is None:
+            results = runner.run_now(lines)
+        else:
+            progress.emit("waiting", {"at": target_time})
+            results = runner.run(target_time, lines, stop_event, snapshot)
+            if results is None:
+                progress.emit("cancelled")
+                return EXIT_CANCELLED
+        failed = [r["line"].id for r in results if not r["ok"]]
+        progress.emit("done", {"ok": not failed, "posted": len(results) - len(failed), "failed": failed})
+        return EXIT_FAILED if failed else EXIT_OK
+    except Exception as e:
+        logger.exception("実行中に例外が発生しました")
+        progress.emit("error", {"error": str(e) or e.__class__.__name__})
+        return EXIT_FAILED
+    finally:
+        logic.unpin_config()
+        logic.close()
+        ChromeDriverManager.quit_driver(role=ChromeDriverManager.ROLE_PURCHASE, is_debug_mode=debug_mode)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cli", description="画面を使わずに予約実行を行う")
+    parser.add_argument("job", help="ジョブ定義 (JSON) のパス。- で標準入力")
+    parser.add_argument("--check", action="store_true", help="ジョブ定義と設定の検証のみ行う")
+    args = parser.parse_args(argv)
+
+    # 進捗 JSON を汚さないよう、各コンポーネントの print は標準エラーへ回す
+    progress = Progress(sys.stdout)
+    sys.stdout = sys.stderr
+    logger = _build_logger()
+
+    try:
+        job = load_job(args.job)
+    except (OSError, ValueError) as e:
+        progress.emit("invalid", {"error": f"ジョブ定義を読み込めません: {e}"})
+        return EXIT_INVALID
+
+    # スーパーバイザーからの停止要求 (SIGTERM) と Ctrl+C で待機を中断する
+    stop_event = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: stop_event.set())
+
+    code = run(job, progress, logger, stop_event, check_only=args.check)
+    progress.emit("exit", {"code": code})
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, urlunparse
+
+
+class AnalysisCache:
+    """
+    商品解析結果 (fetch_item_variants の戻り値) のディスクキャッシュ。
+
+    正規化した商品URLをキーに、TTL と件数上限付きの LRU で保持する。
+    ETag / Last-Modified を併せて保存し、条件付きリクエストによる再検証に使用する。
+    """
+    DEFAULT_TTL = 60 * 60  # 秒
+    DEFAULT_MAX_ENTRIES = 300
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, cache_path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        if cache_path is None:
+            current_file = os.path.abspath(__file__)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+            cache_path = os.path.join(project_root, "conf", "cache", "item_analysis.json")
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 古い順 (末尾が直近に使用)
+        self._lock = threading.RLock()
+        self._load()
+
+    @staticmethod
+    def normalize_url(url):
+        """スキーム・ホストを小文字化し、クエリ (?s-id 等) とフラグメントを除いてキーにする"""
+        u = urlparse((url or "").strip())
+        path = u.path or "/"
+        if not path.endswith("/"):
+            path += "/"
+        return urlunparse((u.scheme.lower(), u.netloc.lower(), path, "", "", ""))
+
+    def _load(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries = OrderedDict(data.get("entries", []))
+        except Exception as e:
+            print(f"[CACHE] 解析キャッシュの読み込みに失敗: {e}")
+            self._entries = OrderedDict()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"entries": list(self._entries.items())}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"[CACHE] 解析キャッシュの保存に失敗: {e}")
+
+    def get(self, url):
+        """
+        キャッシュエントリを返す (TTL 切れも返す)。無ければ None。
+
+        Returns:
+            dict: {"data", "fetched_at", "etag", "last_modified"}
+        """
+        key = self.normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry):
+        return entry is not None and (time.time() - entry.get("fetched_at", 0)) < self.ttl
+
+    def put(self, url, data, etag=None, last_modified=None):
+        key = self.normalize_url(url)
+        with self._lock:
+            self._entries[key] = {"data": data, "fetched_at": time.time(),
+                                  "etag": etag, "last_modified": last_modified}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def touch(self, url):
+        """再検証で変更なし (304) だった場合に取得時刻を更新する"""
+        key = self.normalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["fetched_at"] = time.time()
+                self._entries.move_to_end(key)
+                self._save()
+
+    def invalidate(self, url=None):
+        """url のエントリ、または省略時は全エントリを破棄する"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.normalize_url(url), None)
+            self._save()
@@ -0,0 +1,112 @@
+from urllib.parse import urlencode
+
+
+class CartLine:
+    """
+    購入対象1行 (qty###商品名(バリエーション)###vid|choices|itemid|shopid) の型付きモデル。
+
+    設定読み込み時に一度だけパース・検証し、送信用のPOSTペイロードと
+    エンコード済みのフォーム本文まで保持する。トリガー時の処理はこれを参照するだけで、
+    文字列のパースは行わない。
+
+    データ部は ItemConfigDialog が f"{vid}|{choice1||choice2}|{itemid}|{shopid}" で生成するため、
+    末尾が shop_id、その一つ前が item_id となる。
+    """
+    __slots__ = ("id", "quantity", "product_name", "variation_labels", "variant_id", "choices",
+                 "item_id", "shop_id", "raw", "payload", "body")
+
+    def __init__(self, quantity, product_name, variation_labels, variant_id, choices, item_id, shop_id,
+                 raw="", line_id=None):
+        self.id = line_id
+        self.quantity = quantity
+        self.product_name = product_name
+        self.variation_labels = variation_labels
+        self.variant_id = variant_id
+        self.choices = choices
+        self.item_id = item_id
+        self.shop_id = shop_id
+        self.raw = raw
+        self.payload = self.build_payload(quantity, variant_id, choices, item_id, shop_id)
+        # HTTP 直送用に、フォーム本文もあらかじめエンコードしておく
+        self.body = urlencode(self.payload, doseq=True)
+
+    @staticmethod
+    def build_payload(quantity, variant_id, choices, item_id, shop_id):
+        payload = {"choice[]": list(choices), "units": str(quantity), "itemid": item_id, "shopid": shop_id,
+                   "device": "pc", "userid": "itempage", "response_encode": "utf8"}
+        if variant_id: payload["variant_id"] = variant_id
+        return payload
+
+    @staticmethod
+    def parse_post_data(post_data):
+        """
+        データ部 (vid|choices|itemid|shopid) を分解する。
+
+        Returns:
+            tuple: (variant_id, choices, item_id, shop_id)
+        """
+        elements = [e.strip() for e in post_data.split("|")]
+        if len(elements) < 3:
+            raise ValueError(f"POSTデータの項目数が不足しています: {post_data!r}")
+        variant_id, item_id, shop_id = elements[0], elements[-2], elements[-1]
+        # 確認事項は「||」区切りのため、一度戻してから分割する
+        choices = [c.strip(" |") for c in "|".join(elements[1:-2]).split("||") if c.strip(" |")]
+        return variant_id, choices, item_id, shop_id
+
+    @staticmethod
+    def parse_display_name(display):
+        """「商品名 (バリ1 ・ バリ2)」を (商品名, [バリ1, バリ2]) に分解する"""
+        product_name = display
+        variation_labels = []
+        if "(" in display and display.endswith(")"):
+            n_parts = display.rsplit("(", 1)
+            product_name = n_parts[0].strip()
+            var_content = n_parts[1].rstrip(")")
+            variation_labels = [v.strip() for v in var_content.split(" ・ ") if v.strip()]
+        return product_name, variation_labels
+
+    @classmethod
+    def parse(cls, raw, line_id=None):
+        """
+        RAW文字列をパースして検証する。
+
+        Raises:
+            ValueError: 形式・数量・ID が不正な場合
+        """
+        try:
+            qty_str, rest = raw.split("###", 1)
+            display, post_data = rest.rsplit("###", 1)
+        except ValueError:
+            raise ValueError(f"「###」区切りの形式ではありません: {raw!r}")
+
+        try:
+            quantity = int(qty_str.strip())
+        except ValueError:
+            raise ValueError(f"数量が数値ではありません: {qty_str!r}")
+        if quantity < 1:
+            raise ValueError(f"数量は1以上を指定してください: {quantity}")
+
+        variant_id, choices, item_id, shop_id = cls.parse_post_data(post_data)
+        if not item_id.isdigit() or not shop_id.isdigit():
+            raise ValueError(f"商品ID/店舗IDが不正です: itemid={item_id!r} shopid={shop_id!r}")
+
+        product_name, variation_labels = cls.parse_display_name(display)
+        return cls(quantity, product_name, variation_labels, variant_id, choices, item_id, shop_id,
+                   raw=raw, line_id=line_id)
+
+    def to_dict(self):
+        """ItemManager.parse_sku_string 互換の辞書に変換する"""
+        return {
+            "id": self.id,
+            "quantity": str(self.quantity),
+            "product_name": self.product_name,
+            "variation_labels": list(self.variation_labels),
+            "sku_id": self.variant_id,
+            "choices": list(self.choices),
+            "shop_id": self.shop_id,
+            "item_id": self.item_id,
+            "raw": self.raw
+        }
+
+    def __repr__(self):
+        return f"CartLine(id={self.id!r}, item={self.item_id}/{self.shop_id}, vid={self.variant_id!r}, qty={self.quantity})"
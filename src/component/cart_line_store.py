@@ -0,0 +1,91 @@
+class CartLineStore:
+    """
+    商品行 (ConfigSnapshot.rows / cart_lines) を行ID で引ける形で保持し、
+    表示順と絞り込み結果を管理する。画面の一覧はここから表示範囲の行だけを取り出して描画する。
+
+    apply_diff は変更のあった行だけを差し替える。絞り込み文字列は空白区切りの AND 検索で、
+    RAW文字列 (商品名・バリエーション・SKU・商品ID をすべて含む) に対して大文字小文字を区別せず照合する。
+    """
+
+    def __init__(self):
+        self.rows = {}  # 行ID -> 表示用の辞書 (parse_sku_string の結果)
+        self.cart_lines = {}  # 行ID -> CartLine (検証済みのみ)
+        self._order = []  # 全行の表示順
+        self._position = {}  # 行ID -> _order 内の位置
+        self._search_keys = {}  # 行ID -> 照合用の小文字文字列
+        self._terms = []
+        self._visible = []  # 絞り込み後の表示順
+
+    def load(self, snapshot):
+        """スナップショットの内容ですべて置き換える"""
+        self.rows = dict(snapshot.rows)
+        self.cart_lines = snapshot.cart_lines
+        self._search_keys = {iid: self._search_key(row) for iid, row in self.rows.items()}
+        self._reorder(snapshot)
+
+    def apply_diff(self, diff, snapshot):
+        """ConfigStore の diff に含まれる行だけを反映する"""
+        for iid in diff["removed"]:
+            self.rows.pop(iid, None)
+            self._search_keys.pop(iid, None)
+        for iid in diff["updated"] + diff["added"]:
+            row = snapshot.rows[iid]
+            self.rows[iid] = row
+            self._search_keys[iid] = self._search_key(row)
+        self.cart_lines = snapshot.cart_lines
+        if diff["added"] or diff["removed"] or list(snapshot.rows) != self._order:
+            self._reorder(snapshot)
+        elif self._terms and diff["updated"]:
+            self._refilter()
+
+    def _reorder(self, snapshot):
+        self._order = list(snapshot.rows)
+        self._position = {iid: i for i, iid in enumerate(self._order)}
+        self._refilter()
+
+    @staticmethod
+    def _search_key(row):
+        return " ".join([row.get("raw", ""), row.get("product_name", "")] + list(row.get("variation_labels", []))).lower()
+
+    def set_filter(self, text):
+        """
+        絞り込み条件を設定する。
+
+        Returns:
+            bool: 表示対象が変わったか
+        """
+        terms = (text or "").lower().split()
+        if terms == self._terms:
+            return False
+        self._terms = terms
+        before = self._visible
+        self._refilter()
+        return before != self._visible
+
+    def _refilter(self):
+        if not self._terms:
+            self._visible = list(self._order)
+            return
+        keys = self._search_keys
+        self._visible = [iid for iid in self._order if all(t in keys[iid] for t in self._terms)]
+
+    @property
+    def filter_active(self):
+        return bool(self._terms)
+
+    def visible_ids(self):
+        """絞り込み後の行ID (表示順)"""
+        return self._visible
+
+    def get(self, iid):
+        return self.rows.get(iid)
+
+    def line(self, iid):
+        return self.cart_lines.get(iid)
+
+    def sort_by_position(self, ids):
+        """行ID を表示順に並べ替える (存在しない行は除く)"""
+        return sorted((iid for iid in ids if iid in self._position), key=self._position.__getitem__)
+
+    def __len__(self):
+        return len(self._order)
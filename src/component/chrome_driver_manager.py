@@ -1,55 +1,201 @@
 import os
+import json
+import threading
 from selenium import webdriver
 from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+
+from component.script_registry import ScriptRegistry
 
 
 class ChromeDriverManager:
-    _instance = None
-    _current_mode = None  # デバッグ(True) / 本番(False)
-    _current_headless = None  # ヘッドレス(True) / 通常(False)
+    """
+    Chrome ドライバーを (モード, ヘッドレス, 用途) をキーにしてプールする。
+
+    購入用ブラウザ (ROLE_PURCHASE) を起動したまま、解析用ブラウザ (ROLE_ANALYSIS) を
+    別プロファイルで起動・終了できる。デバッグ/本番のプロファイルも同時に保持できる。
+    同一プロファイルディレクトリは Chrome の仕様上同時に使えないため、
+    プロファイルが衝突するキーを要求された場合のみ既存ブラウザを再起動する。
+    """
+    ROLE_PURCHASE = "purchase"
+    ROLE_ANALYSIS = "analysis"
+
+    # 用途ごとの読み込みプロファイル
+    #   page_load_strategy : normal (load まで待つ) / eager (DOMContentLoaded まで) / none
+    #   blocked_urls       : Network.setBlockedURLs に渡す URL パターン (* ワイルドカード)
+    #   blocked_types      : RESOURCE_TYPE_PATTERNS の種別名 (拡張子パターンに展開してブロック)
+    #   block_images       : 画像の読み込みを無効化する
+    # conf/browser_profiles.json ({"purchase": {...}, "analysis": {...}}) で上書きできる
+    # 解析ワーカー (analysis_0 など) は "_" より前の用途名のプロファイルを使う
+    DEFAULT_PROFILE = {"page_load_strategy": "normal", "blocked_urls": [], "blocked_types": [], "block_images": False}
+    AD_TRACKER_PATTERNS = [
+        "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*", "*google-analytics.com*",
+        "*criteo.*", "*facebook.net*", "*rat.rakuten.co.jp*", "*ias.rakuten.co.jp*",
+    ]
+    ROLE_PROFILES = {
+        ROLE_PURCHASE: {"page_load_strategy": "eager", "blocked_urls": AD_TRACKER_PATTERNS,
+                        "blocked_types": ["font", "media"], "block_images": False},
+        ROLE_ANALYSIS: {"page_load_strategy": "eager", "blocked_urls": AD_TRACKER_PATTERNS,
+                        "blocked_types": ["font", "media", "image"], "block_images": True},
+    }
+    RESOURCE_TYPE_PATTERNS = {
+        "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+        "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+        "media": ["*.mp4", "*.webm", "*.mp3", "*.m3u8"],
+    }
+
+    _profile_overrides = {}  # set_role_profile で一時的に差し替えたプロファイル
+    _profile_conf = {}  # conf/browser_profiles.json の内容 (_load_profile_conf でキャッシュ)
+    _profile_conf_stamp = False  # 初回は必ず読み込む
+    _instances = {}  # (is_debug_mode, is_headless, role) -> driver
+    _key_locks = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_key_lock(cls, key):
+        with cls._lock:
+            if key not in cls._key_locks:
+                cls._key_locks[key] = threading.Lock()
+            return cls._key_locks[key]
 
     @classmethod
-    def get_driver(cls, is_debug_mode=True, is_headless=False):
+    def get_driver(cls, is_debug_mode=True, is_headless=False, role=ROLE_PURCHASE):
         """
-        ドライバーを取得する。
-        モード（デバッグ/本番）または表示設定（通常/ヘッドレス）が変更された場合は再起動する。
+        ドライバーを取得する。キーに対応するブラウザが無い、または終了していれば起動する。
         """
-        if cls._instance:
-            try:
-                # ブラウザの生存確認
-                _ = cls._instance.window_handles
-
-                # モード変更、またはヘッドレス設定の変更を検知したら再起動
-                change_mode = cls._current_mode != is_debug_mode
-                change_headless = cls._current_headless != is_headless
-
-                if change_mode or change_headless:
-                    reason = "モード変更" if change_mode else "ヘッドレス切替"
-                    print(f"[CHANGE] {reason}を検知。ブラウザを再起動します。")
-                    cls.quit_driver()
-                else:
-                    return cls._instance
-            except:
-                cls._instance = None
+        key = (is_debug_mode, is_headless, role)
+        with cls._get_key_lock(key):
+            driver = cls._instances.get(key)
+            if driver is not None:
+                try:
+                    # ブラウザの生存確認
+                    _ = driver.window_handles
+                    return driver
+                except:
+                    cls._quit_key(key)
+
+            # 同じプロファイルを使用中のブラウザ (ヘッドレス切替など) があれば終了する
+            profile_path = cls._get_profile_path(is_debug_mode, role)
+            for other in list(cls._instances):
+                if other != key and cls._get_profile_path(other[0], other[2]) == profile_path:
+                    print(f"[CHANGE] プロファイル競合 ({other} -> {key}) を検知。ブラウザを再起動します。")
+                    cls._quit_key(other)
+
+            driver = cls._create_driver(is_debug_mode, is_headless, role)
+            with cls._lock:
+                cls._instances[key] = driver
+            return driver
 
-        if cls._instance is None:
-            cls._current_mode = is_debug_mode
-            cls._current_headless = is_headless
-            cls._instance = cls._create_driver(is_debug_mode, is_headless)
-        return cls._instance
+    @classmethod
+    def peek_driver(cls, is_debug_mode=True, role=ROLE_PURCHASE):
+        """起動済みのドライバーを返す (起動はしない)。無ければ None"""
+        with cls._lock:
+            for (mode, _, r), driver in cls._instances.items():
+                if mode == is_debug_mode and r == role:
+                    return driver
+        return None
 
     @classmethod
-    def _create_driver(cls, is_debug_mode, is_headless):
+    def _get_profile_path(cls, is_debug_mode, role):
         # --- ディレクトリ構造の解析 ---
         current_file = os.path.abspath(__file__)
         comp_dir = os.path.dirname(current_file)
         src_dir = os.path.dirname(comp_dir)
         project_root = os.path.dirname(src_dir)
 
-        driver_path = os.path.join(project_root, "bin", "chromedriver.exe")
         base_dir = os.path.join(project_root, "conf", "user_profiles")
-        folder = "debug_user" if is_debug_mode else "production_user"
-        profile_path = os.path.join(base_dir, folder)
+        mode = "debug" if is_debug_mode else "production"
+        # 購入用は従来のプロファイル名を維持 (ログイン状態を引き継ぐため)
+        folder = f"{mode}_user" if role == cls.ROLE_PURCHASE else f"{mode}_{role}"
+        return os.path.join(base_dir, folder)
+
+    @classmethod
+    def set_role_profile(cls, role, profile=None):
+        """
+        用途の読み込みプロファイルを差し替える (次に起動するブラウザから有効)。
+        profile=None で差し替えを解除する。
+        """
+        with cls._lock:
+            if profile is None:
+                cls._profile_overrides.pop(role, None)
+            else:
+                cls._profile_overrides[role] = dict(profile)
+
+    @classmethod
+    def _profile_conf_path(cls):
+        current_file = os.path.abspath(__file__)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+        return os.path.join(project_root, "conf", "browser_profiles.json")
+
+    @classmethod
+    def _load_profile_conf(cls):
+        """
+        conf/browser_profiles.json の内容を返す。ファイルの更新 (mtime・サイズ) があった時だけ読み直す。
+        読み込みに失敗した場合は更新ごとに1回だけ警告し、直前に読み込めた内容を使い続ける。
+        """
+        path = cls._profile_conf_path()
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        with cls._lock:
+            if stamp == cls._profile_conf_stamp:
+                return cls._profile_conf
+            cls._profile_conf_stamp = stamp
+            if stamp is None:
+                cls._profile_conf = {}
+                return cls._profile_conf
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    conf = json.load(f)
+                if not isinstance(conf, dict):
+                    raise ValueError("用途名をキーにしたオブジェクトではありません")
+                cls._profile_conf = conf
+            except Exception as e:
+                print(f"[WARN] browser_profiles.json の読み込みに失敗 (直前の設定を使用します): {e}")
+            return cls._profile_conf
+
+    @classmethod
+    def get_role_profile(cls, role):
+        """既定値・conf/browser_profiles.json・set_role_profile の順に重ねたプロファイルを返す"""
+        base_role = role.split("_")[0]
+        profile = dict(cls.DEFAULT_PROFILE)
+        profile.update(cls.ROLE_PROFILES.get(role) or cls.ROLE_PROFILES.get(base_role) or {})
+
+        conf = cls._load_profile_conf()
+        profile.update(conf.get(role) or conf.get(base_role) or {})
+
+        with cls._lock:
+            profile.update(cls._profile_overrides.get(role) or {})
+        return profile
+
+    @classmethod
+    def _blocked_url_patterns(cls, profile):
+        patterns = list(profile.get("blocked_urls") or [])
+        for resource_type in profile.get("blocked_types") or []:
+            patterns.extend(cls.RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        return patterns
+
+    @classmethod
+    def _apply_network_profile(cls, driver, profile):
+        """CDP でリクエストのブロックを設定する (ブラウザ起動直後に1回)"""
+        patterns = cls._blocked_url_patterns(profile)
+        if not patterns:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            print(f"[WARN] URL ブロックの設定に失敗: {e}")
+
+    @classmethod
+    def _create_driver(cls, is_debug_mode, is_headless, role=ROLE_PURCHASE):
+        current_file = os.path.abspath(__file__)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+        # Windows 以外 (CLI で動かす Linux ホストなど) は拡張子なしのバイナリを使う
+        driver_path = os.path.join(project_root, "bin", "chromedriver.exe" if os.name == "nt" else "chromedriver")
+        profile_path = cls._get_profile_path(is_debug_mode, role)
 
         if not os.path.exists(profile_path):
             os.makedirs(profile_path)
@@ -72,27 +218,50 @@ class ChromeDriverManager:
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
 
+        # 用途別の読み込みプロファイル
+        load_profile = cls.get_role_profile(role)
+        if load_profile.get("block_images"):
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        # Selenium 3.141.0 では pageLoadStrategy を desired_capabilities で渡す
+        capabilities = DesiredCapabilities.CHROME.copy()
+        capabilities["pageLoadStrategy"] = load_profile.get("page_load_strategy") or "normal"
+
         print(f"--- BROWSER LAUNCH ---")
+        print(f"ROLE    : {role}")
         print(f"HEADLESS: {is_headless}")
         print(f"MODE    : {'DEBUG' if is_debug_mode else 'PRODUCTION'}")
         print(f"PROFILE : {profile_path}")
+        print(f"LOADING : {capabilities['pageLoadStrategy']} / images={'off' if load_profile.get('block_images') else 'on'}"
+              f" / blocked={len(cls._blocked_url_patterns(load_profile))}")
 
         # Selenium 3.141.0 では executable_path が必須
-        driver = webdriver.Chrome(executable_path=driver_path, options=options)
+        driver = webdriver.Chrome(executable_path=driver_path, options=options, desired_capabilities=capabilities)
 
         # navigator.webdriver 回避
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        cls._apply_network_profile(driver, load_profile)
 
         return driver
 
     @classmethod
-    def quit_driver(cls):
-        """ブラウザを終了し、インスタンスを破棄する"""
-        if cls._instance:
+    def _quit_key(cls, key):
+        with cls._lock:
+            driver = cls._instances.pop(key, None)
+        if driver:
+            ScriptRegistry.forget_session(driver.session_id)
             try:
-                cls._instance.quit()
+                driver.quit()
             except:
                 pass
-            cls._instance = None
-            cls._current_mode = None
-            cls._current_headless = None
\ No newline at end of file
+
+    @classmethod
+    def quit_driver(cls, role=None, is_debug_mode=None):
+        """
+        ブラウザを終了し、インスタンスを破棄する。
+        role / is_debug_mode を省略した場合はすべてが対象。
+        """
+        with cls._lock:
+            keys = [k for k in cls._instances
+                    if (role is None or k[2] == role) and (is_debug_mode is None or k[0] == is_debug_mode)]
+        for key in keys:
+            cls._quit_key(key)
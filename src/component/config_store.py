@@ -0,0 +1,164 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from component.item_manager import ItemManager
+
+
+class ConfigSnapshot:
+    """
+    ある時点の商品設定 (item_info*.json) を固定したもの。
+    ストアは再読み込み時にオブジェクトを差し替えるだけで中身を書き換えないため、
+    予約実行中はスナップショットを保持しておけば設定の途中変更の影響を受けない。
+    """
+    __slots__ = ("file_path", "version", "data", "rows", "cart_lines")
+
+    def __init__(self, file_path, version, data, rows, cart_lines):
+        self.file_path = file_path
+        self.version = version
+        self.data = data
+        self.rows = rows  # {行ID: parse_sku_string の辞書} (表示用、不正行を含む)
+        self.cart_lines = cart_lines  # {行ID: CartLine} (検証済みのみ)
+
+    @property
+    def common(self):
+        return self.data.get("common") or {}
+
+    @property
+    def items(self):
+        return self.data.get("items") or []
+
+    def parsed_items(self):
+        return list(self.rows.values())
+
+
+class ConfigStore:
+    """
+    モードごとに1つの商品設定キャッシュ。
+
+    ファイルの更新時刻とサイズが変わったときだけ再パースし、変更のあった行だけを
+    購読者へ通知する。各所で JSON を読み直す代わりにこのストアを参照すること。
+
+    購読者は callback(diff, snapshot) の形で呼ばれる (refresh を呼んだスレッドで実行される)。
+        diff: {"added": [行ID], "updated": [行ID], "removed": [行ID], "common_changed": bool}
+    バウンドメソッドの購読は弱参照で保持する (unsubscribe し忘れたオブジェクトも解放され、通知されなくなる)。
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, debug_mode=True):
+        key = bool(debug_mode)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(debug_mode=key)
+            return cls._instances[key]
+
+    def __init__(self, debug_mode=True):
+        self.debug_mode = debug_mode
+        self.manager = ItemManager(debug_mode=debug_mode)
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._stamp = False  # 初回は必ず読み込む
+        self._snapshot = ConfigSnapshot(self.file_path, 0, self.manager.item_data, OrderedDict(), {})
+        self.refresh()
+
+    @property
+    def file_path(self):
+        return self.manager.file_path
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.manager.file_path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _diff(old, new):
+        added = [k for k in new.rows if k not in old.rows]
+        removed = [k for k in old.rows if k not in new.rows]
+        updated = [k for k in new.rows if k in old.rows and new.rows[k]["raw"] != old.rows[k]["raw"]]
+        return {"added": added, "updated": updated, "removed": removed,
+                "common_changed": old.common != new.common}
+
+    def refresh(self, force=False):
+        """
+        ファイルが変更されていれば読み直して購読者に通知する。
+
+        Returns:
+            dict: 変更があった場合の diff。変更なしは None
+        """
+        with self._lock:
+            stamp = self._file_stamp()
+            if not force and stamp == self._stamp:
+                return None
+            self._stamp = stamp
+
+            old = self._snapshot
+            data = self.manager.load()
+            rows = OrderedDict((d["id"], d) for d in self.manager.get_parsed_items(data))
+            new = ConfigSnapshot(self.file_path, old.version + 1, data, rows, self.manager.get_cart_lines(data))
+            diff = self._diff(old, new)
+            self._snapshot = new
+            subscribers = self._live_subscribers()
+
+        if old.version == 0 or not (diff["added"] or diff["updated"] or diff["removed"] or diff["common_changed"]):
+            return None
+        print(f"[CONFIG] {os.path.basename(self.file_path)} を再読み込み "
+              f"(追加{len(diff['added'])} / 変更{len(diff['updated'])} / 削除{len(diff['removed'])}"
+              f"{' / 共通設定変更' if diff['common_changed'] else ''})")
+        for callback in subscribers:
+            try:
+                callback(diff, new)
+            except Exception as e:
+                print(f"[CONFIG] 購読者の通知で例外: {e}")
+        return diff
+
+    def snapshot(self):
+        """最新の設定を固定したスナップショットを返す"""
+        self.refresh()
+        return self._snapshot
+
+    @staticmethod
+    def _ref(callback):
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            return weakref.WeakMethod(callback)
+        return lambda: callback
+
+    def _live_subscribers(self):
+        """解放済みの購読者を除きつつ、通知先のリストを返す (ロック内で呼ぶ)"""
+        live = []
+        for ref in list(self._subscribers):
+            callback = ref()
+            if callback is None:
+                self._subscribers.remove(ref)
+            else:
+                live.append(callback)
+        return live
+
+    def _find(self, callback):
+        return next((ref for ref in self._subscribers if ref() == callback), None)
+
+    def subscribe(self, callback):
+        with self._lock:
+            if self._find(callback) is None:
+                self._subscribers.append(self._ref(callback))
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            ref = self._find(callback)
+            if ref is not None:
+                self._subscribers.remove(ref)
+
+    def save(self, data):
+        """保存後すぐに読み直し、購読者へ反映する"""
+        with self._lock:
+            ok = self.manager.save(data)
+        if ok:
+            self.refresh(force=True)
+        return ok
+
+    def is_valid(self):
+        return self.manager.is_valid(self.snapshot().data)
@@ -0,0 +1,151 @@
+import threading
+import time
+from urllib.parse import urlparse, urlencode
+
+import urllib3
+
+
+class HttpClientManager:
+    """
+    ブラウザのログインセッションを引き継いだ keep-alive HTTP コネクションプールを管理する。
+
+    ChromeDriverManager のドライバーから Cookie と User-Agent をコピーし、
+    WebDriver を経由せずに Python から直接リクエストを送るために使用する。
+    ※ urllib3 は Selenium の依存パッケージとして導入済み
+
+    コネクションプールは共有するが、取り込んだセッション (Cookie / UA / Referer) は
+    ドライバーの session_id ごとに分けて保持する。デバッグ用と本番用のブラウザが同時に動いていても、
+    リクエストには session で指定したブラウザのセッションだけが付く (session=None なら何も付けない)。
+    """
+    _pool = None
+    _sessions = {}  # {driver.session_id: {"cookies": [...], "user_agent": str, "referer": str}}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_pool(cls):
+        if cls._pool is None:
+            with cls._lock:
+                if cls._pool is None:
+                    cls._pool = urllib3.PoolManager(
+                        num_pools=10,
+                        maxsize=16,
+                        retries=False,  # リダイレクトも追わない (3xx は呼び出し側で失敗として扱う)
+                        timeout=urllib3.Timeout(connect=3.0, read=10.0)
+                    )
+        return cls._pool
+
+    @classmethod
+    def sync_from_driver(cls, driver):
+        """
+        ドライバーの Cookie / User-Agent / 現在URL を取り込み、driver.session_id に紐付けて保持する。
+        同じドライバーから取り込み直した場合は前回の内容を置き換える。
+
+        Returns:
+            int: 取り込んだ Cookie の件数
+        """
+        cookies = driver.get_cookies() or []
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent")
+        except Exception:
+            user_agent = None
+        try:
+            referer = driver.current_url
+        except Exception:
+            referer = None
+        with cls._lock:
+            cls._sessions[driver.session_id] = {"cookies": cookies, "user_agent": user_agent, "referer": referer}
+        print(f"[HTTP] ブラウザから Cookie を {len(cookies)} 件取り込みました")
+        return len(cookies)
+
+    @classmethod
+    def _get_session(cls, session):
+        if session is None:
+            return {}
+        with cls._lock:
+            return cls._sessions.get(session) or {}
+
+    @classmethod
+    def cookie_header(cls, url, session=None):
+        """URL に送信すべき Cookie を Cookie ヘッダー文字列にする"""
+        u = urlparse(url)
+        host = u.hostname or ""
+        path = u.path or "/"
+        pairs = []
+        for c in cls._get_session(session).get("cookies", []):
+            domain = (c.get("domain") or "").lstrip(".")
+            if domain and not (host == domain or host.endswith("." + domain)):
+                continue
+            if not path.startswith(c.get("path") or "/"):
+                continue
+            if c.get("secure") and u.scheme != "https":
+                continue
+            pairs.append(f"{c.get('name')}={c.get('value')}")
+        return "; ".join(pairs)
+
+    @classmethod
+    def build_headers(cls, url, extra=None, session=None):
+        headers = {"Connection": "keep-alive"}
+        cookie = cls.cookie_header(url, session)
+        if cookie:
+            headers["Cookie"] = cookie
+        state = cls._get_session(session)
+        if state.get("user_agent"):
+            headers["User-Agent"] = state["user_agent"]
+        if state.get("referer"):
+            headers["Referer"] = state["referer"]
+            r = urlparse(state["referer"])
+            headers["Origin"] = f"{r.scheme}://{r.netloc}"
+        headers.update(extra or {})
+        return headers
+
+    @classmethod
+    def warm(cls, url, session=None):
+        """
+        対象ホストへのコネクション (DNS/TCP/TLS) を事前に確立し、プールに保持させる。
+
+        Returns:
+            float: 所要時間(ms)。失敗時は None
+        """
+        u = urlparse(url)
+        origin = f"{u.scheme}://{u.netloc}/"
+        start = time.monotonic()
+        try:
+            cls.get_pool().request("HEAD", origin, headers=cls.build_headers(origin, session=session))
+            elapsed = (time.monotonic() - start) * 1000
+            print(f"[HTTP] コネクション確立: {u.netloc} ({elapsed:.1f}ms)")
+            return elapsed
+        except Exception as e:
+            print(f"[WARN] コネクション確立失敗: {u.netloc} ({e})")
+            return None
+
+    @classmethod
+    def post_form(cls, url, payload, session=None):
+        """
+        フォーム形式で POST し、(ステータスコード, 本文) を返す。
+        値がリストのキー (choice[] 等) は同名キーを繰り返して送信する。
+        """
+        body = urlencode(payload, doseq=True)
+        return cls.post_body(url, body, session)
+
+    @classmethod
+    def post_body(cls, url, body, session=None):
+        """エンコード済みのフォーム本文を POST する"""
+        headers = cls.build_headers(url, {"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"},
+                                    session)
+        res = cls.get_pool().request("POST", url, body=body, headers=headers)
+        return res.status, res.data
+
+    @classmethod
+    def reset(cls, session=None):
+        """
+        取り込み済みセッションを破棄する。
+        session を指定した場合はそのセッションだけを破棄し、プールは残す (他のモードが使用中のため)。
+        """
+        with cls._lock:
+            if session is not None:
+                cls._sessions.pop(session, None)
+                return
+            if cls._pool is not None:
+                cls._pool.clear()
+            cls._pool = None
+            cls._sessions = {}
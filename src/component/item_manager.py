@@ -1,6 +1,8 @@
 import json
 import os
 
+from component.cart_line import CartLine
+
 
 class ItemManager:
     def __init__(self, debug_mode=True):
@@ -52,8 +54,9 @@ class ItemManager:
         except:
             return False
 
-    def is_valid(self):
-        data = self.load()
+    def is_valid(self, data=None):
+        if data is None:
+            data = self.load()
         c = data.get("common", {})
         items = data.get("items", [])
         i = items[0] if items else {}
@@ -70,6 +73,7 @@ class ItemManager:
     def parse_sku_string(self, raw_val):
         """
         巨大なフルフル文字列を分解し、プログラムが直接利用可能なオブジェクトに変換する。
+        ※ パース処理は CartLine に一本化している
 
         Args:
             raw_val (str): パース対象のRAW文字列
@@ -81,67 +85,15 @@ class ItemManager:
                 "variation_labels": list, # バリエーション名の配列 (「 ・ 」で分割)
                 "sku_id": str,            # SKU管理番号 (存在しない場合は空文字)
                 "choices": list,          # 選択事項の配列 (承諾事項:回答)
-                "shop_id": str,           # 店舗ID (後ろから2番目)
-                "item_id": str,           # 商品ID (最後尾)
+                "shop_id": str,           # 店舗ID (最後尾)
+                "item_id": str,           # 商品ID (後ろから2番目)
                 "raw": str                # オリジナル文字列
             }
         """
         try:
-            # 1. ### で3分割 (数量 / 商品名(バリエ) / その他ID群)
-            parts_hash = raw_val.split("###")
-            quantity = parts_hash[0]
-            full_name_var = parts_hash[1]
-            remains = parts_hash[2]
-
-            # 2. 商品名(バリエーション) のパース
-            product_name = full_name_var
-            variation_labels = []
-            if "(" in full_name_var and full_name_var.endswith(")"):
-                # 最後の ( で分割
-                n_parts = full_name_var.rsplit("(", 1)
-                product_name = n_parts[0].strip()
-                # カッコ内の「 ・ 」区切りの文字列を配列にする
-                var_content = n_parts[1].rstrip(")")
-                variation_labels = [v.strip() for v in var_content.split(" ・ ") if v.strip()]
-
-            # 3. ID・Choice群のパース (後ろから逆算)
-            # パイプ「|」で分割
-            parts_pipe = remains.split("|")
-
-            # 確実にある後ろの2つを取得
-            item_id = parts_pipe[-1]
-            shop_id = parts_pipe[-2]
-
-            # 4. sku_id と choices の切り分け
-            # 前から見て最初の要素が sku_id 候補だが、承諾事項（:を含む）なら sku_id は空
-            sku_id = ""
-            choices = []
-
-            # 残りの要素（前後を除いた中間部分）をループ
-            middle_parts = parts_pipe[:-2]
-            for i, p in enumerate(middle_parts):
-                p = p.replace("||", "").strip()
-                if not p: continue
-
-                if i == 0 and "compass_sku" in p:
-                    sku_id = p
-                elif ":" in p:
-                    choices.append(p)
-                else:
-                    # sku_id 形式ではないが最初の要素だった場合、一応保持
-                    if i == 0 and not sku_id:
-                        sku_id = p
-
-            return {
-                "quantity": quantity,
-                "product_name": product_name,
-                "variation_labels": variation_labels,
-                "sku_id": sku_id,
-                "choices": choices,
-                "shop_id": shop_id,
-                "item_id": item_id,
-                "raw": raw_val
-            }
+            res = CartLine.parse(raw_val).to_dict()
+            del res["id"]
+            return res
         except Exception:
             # 失敗時は最低限表示が壊れない辞書を返す
             return {
@@ -155,11 +107,12 @@ class ItemManager:
                 "raw": raw_val
             }
 
-    def get_parsed_items(self):
+    def get_parsed_items(self, data=None):
         """
         JSONの全商品をパース済みオブジェクトのリストとして返す
         """
-        data = self.load()
+        if data is None:
+            data = self.load()
         parsed_list = []
         for idx, item in enumerate(data.get("items", [])):
             keywords = item.get("required_keywords", [])
@@ -167,4 +120,23 @@ class ItemManager:
                 res = self.parse_sku_string(k)
                 res["id"] = f"item_{idx}_k{k_idx}"
                 parsed_list.append(res)
-        return parsed_list
\ No newline at end of file
+        return parsed_list
+
+    def get_cart_lines(self, data=None):
+        """
+        JSONの全商品を検証済みの CartLine として返す。不正な行は警告を出して除外する。
+
+        Returns:
+            dict: {行ID: CartLine} (行IDは get_parsed_items と同じ)
+        """
+        if data is None:
+            data = self.load()
+        lines = {}
+        for idx, item in enumerate(data.get("items", [])):
+            for k_idx, k in enumerate(item.get("required_keywords", [])):
+                line_id = f"item_{idx}_k{k_idx}"
+                try:
+                    lines[line_id] = CartLine.parse(k, line_id=line_id)
+                except ValueError as e:
+                    print(f"[CONFIG] 購入対象 {line_id} を除外しました: {e}")
+        return lines
@@ -0,0 +1,186 @@
+import json
+import re
+from html.parser import HTMLParser
+
+from component.sku_index import SkuIndex
+
+
+# 子要素を持たない (終了タグの無い) 要素
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+              "param", "source", "track", "wbr"}
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "classes", "children", "parent")
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = set((attrs.get("class") or "").split())
+        self.children = []
+        self.parent = parent
+
+    def iter(self):
+        """自身を除く子孫要素を文書順に返す"""
+        for c in self.children:
+            if isinstance(c, _Node):
+                yield c
+                yield from c.iter()
+
+    def text(self):
+        """innerText 相当 (空白を1つに詰めたテキスト)"""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in ("script", "style"):
+                stack.extend(reversed(node.children))
+        return re.sub(r"\s+", " ", "".join(parts)).strip()
+
+    def matches(self, tag=None, cls=None):
+        return (tag is None or self.tag == tag) and (cls is None or cls in self.classes)
+
+    def find(self, tag=None, cls=None):
+        return next((n for n in self.iter() if n.matches(tag, cls)), None)
+
+    def find_all(self, tag=None, cls=None):
+        return [n for n in self.iter() if n.matches(tag, cls)]
+
+
+class _DomBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = _Node("#document", {}, None)
+        self._cur = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = _Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self._cur)
+        self._cur.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._cur = node
+
+    def handle_startendtag(self, tag, attrs):
+        self._cur.children.append(_Node(tag, {k: (v if v is not None else "") for k, v in attrs}, self._cur))
+
+    def handle_endtag(self, tag):
+        # 閉じ忘れのタグがあっても対応する開始タグまで遡る
+        node = self._cur
+        while node is not None and node.tag != tag:
+            node = node.parent
+        if node is not None and node.parent is not None:
+            self._cur = node.parent
+
+    def handle_data(self, data):
+        self._cur.children.append(data)
+
+
+class ItemPageParser:
+    """
+    商品ページの静的HTMLから、ItemAnalysisLogic の解析スクリプトと同じ構造
+    ({groups, common, debug}) を組み立てる。
+
+    ブラウザを起動せずに data-item-data / compass_sku_ プレフィックス /
+    SKUボタン・セレクトのグループを取得するためのもの。
+    """
+    SKU_CONTAINER_CLS = "padding-bottom-small--Ql3Ez"
+    SKU_BUTTON_CLS = "type-sku-button--1i7g2"
+    SKU_LABEL_CLS = "layout-inline--QSCjX"
+    CHOICE_CONTAINER_CLS = "container--3ZLr9"
+    CHOICE_SELECT_CLS = "select--3Nrso"
+    CHOICE_LABEL_CLS = "text-container--3DrET"
+
+    @classmethod
+    def parse(cls, html):
+        res = {"groups": [], "common": {}, "debug": {"log": []}}
+        log = res["debug"]["log"]
+
+        builder = _DomBuilder()
+        builder.feed(html)
+        builder.close()
+        root = builder.root
+
+        # --- 商品名 (span.normal_reserve_item_name, h2.item_name, h1, h2 の文書順で最初のもの) ---
+        title_el = next((n for n in root.iter()
+                         if n.matches("span", "normal_reserve_item_name") or n.matches("h2", "item_name")
+                         or n.tag in ("h1", "h2")), None)
+        if title_el is not None:
+            res["common"]["title"] = title_el.text()
+        else:
+            t = root.find("title")
+            res["common"]["title"] = t.text() if t is not None else ""
+
+        # --- itemId / shopId ---
+        target = next((n for n in root.iter()
+                       if "data-item-data" in n.attrs or "data-item-to-compare-data" in n.attrs), None)
+        if target is not None:
+            raw = target.attrs.get("data-item-data") or target.attrs.get("data-item-to-compare-data")
+            try:
+                d = json.loads(raw)
+                d = d[0] if isinstance(d, list) else d
+                res["common"]["itemid"] = str(d.get("itemId") or "")
+                res["common"]["shopid"] = str(d.get("shopId") or "")
+            except Exception as e:
+                log.append(f"data-item-data parse error: {e}")
+
+        # --- SKU プレフィックス (body 内の HTML から検索) ---
+        body_pos = html.find("<body")
+        body_html = html[body_pos:] if body_pos >= 0 else html
+        sku_prefix = ""
+        m = re.search(r"compass_sku_(\d+)_", body_html)
+        if m:
+            log.append("Match Found in HTML: " + m.group(0))
+            sku_prefix = m.group(0)
+        else:
+            log.append("No 'compass_sku_' found. Fallback to 13-digit search.")
+            m_digit = re.search(r"\d{13}", body_html)
+            if m_digit:
+                log.append("Found 13-digit string: " + m_digit.group(0))
+                sku_prefix = m_digit.group(0)
+        res["common"]["base_variant_id"] = sku_prefix
+
+        # --- SKU グループ ---
+        g_idx = 0
+        for container in root.find_all(cls=cls.SKU_CONTAINER_CLS):
+            btns = container.find_all(cls=cls.SKU_BUTTON_CLS)
+            if btns:
+                label_box = container.find(cls=cls.SKU_LABEL_CLS)
+                label_el = label_box.find("span") if label_box is not None else None
+                label = label_el.text() if label_el is not None else ""
+                label = label or f"項目{g_idx + 1}"
+                res["groups"].append({"id": g_idx, "name": re.sub(r"[：:]", "", label),
+                                      "options": [b.text() for b in btns], "type": "sku"})
+                g_idx += 1
+
+        # --- 確認事項 (セレクト) ---
+        for container in root.find_all(cls=cls.CHOICE_CONTAINER_CLS):
+            select = container.find("select", cls.CHOICE_SELECT_CLS)
+            if select is not None:
+                label_el = container.find(cls=cls.CHOICE_LABEL_CLS)
+                label = (label_el.text() if label_el is not None else "") or "確認事項"
+                opts = [o.text() for o in select.find_all("option")
+                        if o.attrs.get("value", o.text()) != ""]
+                res["groups"].append({"id": g_idx, "name": label, "options": opts, "type": "choice"})
+                g_idx += 1
+
+        # --- 代表の variant ID (組み合わせは列挙せず、必要な時に SkuIndex で算出する) ---
+        index = SkuIndex.from_data(res)
+        vid = index.first_vid() if index is not None else None
+        if vid:
+            res["common"]["vid"] = vid
+            log.append("Final VID Example: " + vid)
+
+        return res
+
+    @classmethod
+    def is_complete(cls, data):
+        """静的HTMLだけで解析が完結したか (不足ならブラウザで再解析が必要)"""
+        common = data.get("common", {})
+        if not common.get("itemid"):
+            return False
+        # SKU プレフィックスがあるのにボタンが取れていない場合は JS 描画とみなす
+        has_sku_group = any(g.get("type") == "sku" for g in data.get("groups", []))
+        if "compass_sku_" in common.get("base_variant_id", "") and not has_sku_group:
+            return False
+        return True
@@ -0,0 +1,263 @@
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class JobScheduler:
+    """
+    複数の予約ジョブを実行時刻の優先度付きキューで保持し、1本のタイマースレッドで待機する。
+
+    ジョブは実行時刻の lead_sec 秒前 (ウォームアップの開始より前) に起床して execute へ渡す。
+    execute(job, context, stop_event) は実行スレッドで呼ばれ、精密な待機・発火は execute 側で行う。
+    実行スレッドはモード (購入用ブラウザ) ごとに1本で、テスト・本番のジョブは並行して実行する。
+    同じモードのジョブは同じブラウザを使うため、実行期間 (起床から発火後 BUSY_AFTER_SEC 秒まで) が
+    重なるものは登録時に拒否する (ValueError)。
+
+    ジョブは conf/jobs.json に保存し、再起動時に未実行のものを再登録する。
+    停止中に実行時刻を過ぎたジョブは missed として扱い、実行しない。
+
+    ジョブ (辞書):
+        id, target ("YYYY-MM-DD HH:MM:SS"), debug_mode, lines ([{"id", "raw"}]), status, created_at
+    status: pending / running / done / failed / cancelled / missed
+    """
+    LEAD_SEC = 150  # WarmupPipeline の最初の段階 (T-120s) より前に起床する
+    MAX_SLEEP_SEC = 60  # 時計の変更に追従するため、最長でもこの間隔で起床時刻を確認し直す
+    BUSY_AFTER_SEC = 60  # 発火後も購入手続きの連鎖クリック (最長60秒) がブラウザを使い続ける
+    DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    MISSED = "missed"
+    ACTIVE = (PENDING, RUNNING)
+
+    def __init__(self, execute, file_path=None, lead_sec=LEAD_SEC, on_change=None):
+        if file_path is None:
+            current_file = os.path.abspath(__file__)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+            file_path = os.path.join(project_root, "conf", "jobs.json")
+        self.file_path = file_path
+        self.execute = execute
+        self.lead_sec = lead_sec
+        self.on_change = on_change
+
+        self._cond = threading.Condition()
+        self._jobs = {}  # id -> job
+        self._contexts = {}  # id -> execute に渡すオブジェクト (保存しない)
+        self._stop_events = {}  # id -> threading.Event
+        self._heap = []  # (起床時刻 epoch秒, 連番, id)
+        self._seq = itertools.count()
+        self._executors = {}  # モード (debug_mode) -> 実行スレッド1本の ThreadPoolExecutor
+        self._thread = None
+        self._stopped = False
+
+    # --- 登録・取消 ---
+    def start(self):
+        """保存済みのジョブを読み込み、タイマースレッドを開始する"""
+        with self._cond:
+            self._load()
+            self._thread = threading.Thread(target=self._timer_loop, name="JobScheduler", daemon=True)
+            self._thread.start()
+        self._notify()
+
+    def add(self, target_time, lines, debug_mode, context=None):
+        """
+        ジョブを登録する。
+
+        Args:
+            target_time (datetime): 実行時刻
+            lines (list): CartLine のリスト
+            context: execute に渡すオブジェクト (設定のスナップショットなど)。再起動後は None
+
+        Returns:
+            dict: 登録したジョブ
+
+        Raises:
+            ValueError: 同じモードの登録済みジョブと実行期間が重なる場合
+        """
+        job = {"id": uuid.uuid4().hex[:8], "target": target_time.strftime(self.DATETIME_FORMAT),
+               "debug_mode": bool(debug_mode), "lines": [{"id": line.id, "raw": line.raw} for line in lines],
+               "status": self.PENDING, "created_at": datetime.now().strftime(self.DATETIME_FORMAT)}
+        with self._cond:
+            conflict = self._find_conflict(job)
+            if conflict is not None:
+                raise ValueError(f"同じモードの予約 {conflict['target']} ({conflict['id']}) と実行時刻が近すぎます。"
+                                 f"{self.min_gap_sec():.0f}秒以上空けてください")
+            self._jobs[job["id"]] = job
+            if context is not None:
+                self._contexts[job["id"]] = context
+            self._push(job)
+            self._save()
+            self._cond.notify()
+        self._notify()
+        return dict(job)
+
+    def cancel(self, job_id):
+        """待機中のジョブを取り消す。実行中のものは停止を要求する"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in self.ACTIVE:
+                return False
+            if job["status"] == self.RUNNING:
+                self._stop_events[job_id].set()
+            else:
+                # キューからは起床時に読み飛ばす
+                job["status"] = self.CANCELLED
+                self._contexts.pop(job_id, None)
+                self._save()
+                self._cond.notify()
+        self._notify()
+        return True
+
+    def jobs(self):
+        """全ジョブの写しを実行時刻順に返す"""
+        with self._cond:
+            return sorted((dict(j) for j in self._jobs.values()), key=lambda j: j["target"])
+
+    def clear_finished(self):
+        """終了したジョブを一覧から除く"""
+        with self._cond:
+            for job_id in [k for k, j in self._jobs.items() if j["status"] not in self.ACTIVE]:
+                del self._jobs[job_id]
+        self._notify()
+
+    def stop(self):
+        """
+        タイマーを止め、実行中のジョブに停止を要求する。
+        保存済みの未実行ジョブはそのまま残り、次回の start で再登録される。
+        """
+        with self._cond:
+            self._stopped = True
+            for event in self._stop_events.values():
+                event.set()
+            self._cond.notify()
+            executors = list(self._executors.values())
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+    # --- 実行期間の重なり ---
+    def min_gap_sec(self):
+        """同じモードのジョブ同士に必要な実行時刻の間隔 (秒)"""
+        return self.lead_sec + self.BUSY_AFTER_SEC
+
+    def _find_conflict(self, job):
+        """job と同じモードで実行期間が重なる未実行・実行中のジョブ (無ければ None)"""
+        target = self._target_epoch(job)
+        for other in self._jobs.values():
+            if (other["id"] != job["id"] and other["status"] in self.ACTIVE
+                    and other["debug_mode"] == job["debug_mode"]
+                    and abs(self._target_epoch(other) - target) < self.min_gap_sec()):
+                return other
+        return None
+
+    def _executor_for(self, job):
+        key = job["debug_mode"]
+        if key not in self._executors:
+            mode = "debug" if key else "production"
+            self._executors[key] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"job_{mode}")
+        return self._executors[key]
+
+    # --- タイマー ---
+    def _target_epoch(self, job):
+        return time.mktime(datetime.strptime(job["target"], self.DATETIME_FORMAT).timetuple())
+
+    def _wake_at(self, job):
+        return self._target_epoch(job) - self.lead_sec
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (self._wake_at(job), next(self._seq), job["id"]))
+
+    def _timer_loop(self):
+        with self._cond:
+            while not self._stopped:
+                # 取り消し済みのジョブを先頭から捨てる
+                while self._heap and self._jobs.get(self._heap[0][2], {}).get("status") != self.PENDING:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._cond.wait(min(delay, self.MAX_SLEEP_SEC))
+                    continue
+                job = self._jobs[heapq.heappop(self._heap)[2]]
+                busy = next((j for j in self._jobs.values()
+                             if j["status"] == self.RUNNING and j["debug_mode"] == job["debug_mode"]), None)
+                if busy is not None:
+                    # 登録時に重なりは拒否しているが、以前の版で保存されたジョブは前のジョブの終了を待つことになる
+                    print(f"[SCHEDULE] 予約 {job['id']} は同じモードの予約 {busy['id']} の実行中のため、"
+                          f"終了後に開始します (ウォームアップが省略される場合があります)")
+                job["status"] = self.RUNNING
+                self._stop_events[job["id"]] = threading.Event()
+                self._save()
+                self._executor_for(job).submit(self._run_job, job)
+        self._notify()
+
+    def _run_job(self, job):
+        job_id = job["id"]
+        stop_event = self._stop_events[job_id]
+        self._notify()
+        try:
+            ok = False if stop_event.is_set() else self.execute(dict(job), self._contexts.get(job_id), stop_event)
+            status = self.DONE if ok else (self.CANCELLED if stop_event.is_set() else self.FAILED)
+        except Exception as e:
+            print(f"[SCHEDULE] ジョブ {job_id} の実行で例外: {e}")
+            status = self.FAILED
+        with self._cond:
+            self._stop_events.pop(job_id, None)
+            self._contexts.pop(job_id, None)
+            # 終了処理による停止は取り消しではないため、running のまま残して次回起動時に判断する
+            if not self._stopped:
+                job["status"] = status
+                self._save()
+        self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[SCHEDULE] 変更通知で例外: {e}")
+
+    # --- 永続化 ---
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except Exception as e:
+            print(f"[SCHEDULE] {self.file_path} の読み込みに失敗: {e}")
+            return
+        now = datetime.now()
+        for job in saved.get("jobs", []):
+            if job.get("status") not in self.ACTIVE:
+                continue
+            if datetime.strptime(job["target"], self.DATETIME_FORMAT) <= now:
+                job["status"] = self.MISSED
+                print(f"[SCHEDULE] 停止中に実行時刻を過ぎた予約: {job['target']} ({job['id']})")
+            else:
+                job["status"] = self.PENDING
+                self._push(job)
+            self._jobs[job["id"]] = job
+        self._save()
+
+    def _save(self):
+        # 未実行・実行中のジョブのみを保存する (一時ファイルに書いてから置き換える)
+        data = {"jobs": [j for j in self._jobs.values() if j["status"] in self.ACTIVE]}
+        tmp_path = self.file_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            print(f"[SCHEDULE] {self.file_path} の保存に失敗: {e}")
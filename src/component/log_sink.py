@@ -0,0 +1,99 @@
+import logging
+import os
+import queue
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class LogSink:
+    """
+    どのスレッドからでも安価に書き込めるログの受け口。
+
+    emit() は整形済みの1行をメモリ上のリングバッファに積むだけで、Tk ウィジェットには触れない。
+    画面側 (LogWindowParts) は after() で drain() を呼び、まとめて描画する。
+    同じ行はキュー経由でバックグラウンドのスレッドがコンソールとローテーションファイルへ書き出す。
+    """
+    MAX_PENDING = 10000  # 画面側が取り出す前に溜められる最大行数 (超過分は古い順に破棄)
+    FILE_MAX_BYTES = 5 * 1024 * 1024
+    FILE_BACKUP_COUNT = 5
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, log_path=None):
+        if log_path is None:
+            current_file = os.path.abspath(__file__)
+            project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+            log_path = os.path.join(project_root, "logs", "app.log")
+        self.log_path = log_path
+        self._pending = deque(maxlen=self.MAX_PENDING)
+        self._emitted = 0
+        self._drained = 0
+        self._count_lock = threading.Lock()
+
+        # コンソール出力・ファイル書き込みは呼び出し元スレッドで行わない
+        self._queue = queue.Queue(-1)
+        handlers = [logging.StreamHandler(sys.stdout)]
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            handlers.append(RotatingFileHandler(self.log_path, maxBytes=self.FILE_MAX_BYTES,
+                                                backupCount=self.FILE_BACKUP_COUNT, encoding="utf-8"))
+        except Exception as e:
+            print(f"[LOG] ログファイルを開けません: {e}")
+        self._listener = QueueListener(self._queue, *handlers)
+        self._listener.start()
+
+        self._logger = logging.getLogger("rakuten_bot")
+        self._logger.setLevel(logging.DEBUG)
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(self._queue))
+
+    def emit(self, level_name, message):
+        """整形済みの1行を積む。戻り値は画面表示用の行文字列"""
+        now = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        line = f"[{now}] [{level_name}] {message}"
+        with self._count_lock:
+            self._pending.append((level_name, line))
+            self._emitted += 1
+        self._logger.log(getattr(logging, level_name, logging.INFO), line)
+        return line
+
+    def drain(self, max_items):
+        """
+        溜まっている行を最大 max_items 件取り出す。
+
+        Returns:
+            tuple: ([(レベル名, 行), ...], 前回から破棄された行数)
+        """
+        with self._count_lock:
+            n = min(max_items, len(self._pending))
+            records = [self._pending.popleft() for _ in range(n)]
+            # 取り出し済み + 残り と書き込み総数の差が、あふれて破棄された行数
+            dropped = self._emitted - self._drained - n - len(self._pending)
+            self._drained += n + dropped
+        return records, dropped
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def close(self):
+        """未出力の行をすべて書き出してから停止する"""
+        self._listener.stop()
+
+    @classmethod
+    def shutdown(cls):
+        with cls._instance_lock:
+            if cls._instance is not None:
+                cls._instance.close()
+                cls._instance = None
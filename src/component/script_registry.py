@@ -0,0 +1,132 @@
+import json
+import re
+import threading
+import time
+
+
+class ScriptRegistry:
+    """
+    Page.addScriptToEvaluateOnNewDocument で登録したスクリプトを名前で管理する。
+
+    CDP の登録は以後のすべてのドキュメント (iframe や無関係なページを含む) で実行されるため、
+    登録時に URL パターンとトップフレームの判定でスクリプト本体を包み、対象外のページでは
+    即座に抜けるようにする。登録はブラウザ (セッション) と名前ごとに1つで、
+    ttl を指定したものは期限到来時に自動で解除する。
+    """
+    _lock = threading.RLock()
+    _entries = {}  # (session_id, 名前) -> {"identifier", "driver", "source", "expires_at", "timer"}
+
+    @staticmethod
+    def url_pattern_for(url):
+        """url と同じオリジン配下 (scheme://host/...) にマッチする正規表現を返す"""
+        m = re.match(r"^(https?://[^/?#]+)", (url or "").strip())
+        return "^" + re.escape(m.group(1)) + "(?:[/?#]|$)" if m else None
+
+    @staticmethod
+    def wrap(source, url_patterns=None, top_frame_only=True):
+        """スクリプトを URL パターン・フレームの判定で包む"""
+        guards = []
+        if top_frame_only:
+            guards.append("if (window.self !== window.top) return;")
+        if url_patterns:
+            guards.append("const __patterns = " + json.dumps(list(url_patterns)) + ";")
+            guards.append("if (!__patterns.some(p => new RegExp(p).test(location.href))) return;")
+        return "(function() {\n" + "\n".join(guards) + "\n" + source + "\n})();"
+
+    @classmethod
+    def register(cls, driver, name, source, url_patterns=None, top_frame_only=True, ttl=None):
+        """
+        スクリプトを登録する。同名の登録があれば先に解除する。
+
+        Args:
+            url_patterns (list): location.href に対する正規表現。None は全ページ
+            ttl (float): 自動解除までの秒数。None は無期限
+
+        Returns:
+            str: CDP の identifier
+        """
+        with cls._lock:
+            cls.unregister(driver, name)
+            wrapped = cls.wrap(source, url_patterns, top_frame_only)
+            res = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": wrapped})
+            identifier = res.get("identifier")
+            cls._entries[(driver.session_id, name)] = {"identifier": identifier, "driver": driver, "source": source,
+                                                       "expires_at": None, "timer": None}
+            if ttl is not None:
+                cls.extend(driver, name, ttl)
+            print(f"[REGISTER] CDP Script {name}: {identifier}"
+                  f"{' (' + ', '.join(url_patterns) + ')' if url_patterns else ''}")
+            return identifier
+
+    @classmethod
+    def extend(cls, driver, name, ttl):
+        """登録済みスクリプトの期限を現在から ttl 秒後に設定し直す"""
+        with cls._lock:
+            entry = cls._entries.get((driver.session_id, name)) if driver is not None else None
+            if entry is None:
+                return False
+            if entry["timer"] is not None:
+                entry["timer"].cancel()
+            entry["expires_at"] = time.monotonic() + ttl
+            timer = threading.Timer(ttl, cls._expire, args=(driver, name, entry["identifier"]))
+            timer.daemon = True
+            timer.start()
+            entry["timer"] = timer
+            return True
+
+    @classmethod
+    def _expire(cls, driver, name, identifier):
+        with cls._lock:
+            entry = cls._entries.get((driver.session_id, name))
+            # 期限切れまでに登録し直されていれば何もしない
+            if entry is None or entry["identifier"] != identifier:
+                return
+            print(f"[CLEANUP] CDP Script {name} の期限切れ")
+            cls.unregister(driver, name)
+
+    @classmethod
+    def is_registered(cls, driver, name, source=None):
+        """driver に name が登録済みか (source 指定時は同じ内容で登録済みか) を返す"""
+        if driver is None:
+            return False
+        with cls._lock:
+            entry = cls._entries.get((driver.session_id, name))
+            return entry is not None and (source is None or entry["source"] == source)
+
+    @classmethod
+    def unregister(cls, driver, name):
+        if driver is None:
+            return False
+        with cls._lock:
+            entry = cls._entries.pop((driver.session_id, name), None)
+            if entry is None:
+                return False
+            if entry["timer"] is not None:
+                entry["timer"].cancel()
+            try:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument",
+                                       {"identifier": entry["identifier"]})
+                print(f"[CLEANUP] CDP Script Removed: {name} ({entry['identifier']})")
+                return True
+            except Exception as e:
+                print(f"[WARN] Failed to remove CDP script {name}: {e}")
+                return False
+
+    @classmethod
+    def unregister_all(cls, driver):
+        """driver に登録したスクリプトをすべて解除する"""
+        if driver is None:
+            return
+        with cls._lock:
+            for session_id, name in list(cls._entries):
+                if session_id == driver.session_id:
+                    cls.unregister(driver, name)
+
+    @classmethod
+    def forget_session(cls, session_id):
+        """終了したブラウザの登録を破棄する (ブラウザ側の登録は終了とともに消えている)"""
+        with cls._lock:
+            for key in [k for k in cls._entries if k[0] == session_id]:
+                entry = cls._entries.pop(key)
+                if entry["timer"] is not None:
+                    entry["timer"].cancel()
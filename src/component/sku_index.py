@@ -0,0 +1,80 @@
+class SkuIndex:
+    """
+    SKUグループの選択肢から variant ID (プレフィックス + 連番) を必要な時に算出する。
+
+    従来は全組み合わせ (各グループの選択肢の直積) を skuMap として列挙していたが、
+    連番は直積の列挙順 (先頭グループが最上位の桁) の 1 始まりの位置そのものなので、
+    各グループでの選択肢の位置を混合基数の桁として計算すれば同じ値が得られる。
+
+    同じグループに同じ表示名の選択肢が複数ある場合、skuMap では後から列挙された
+    組み合わせで上書きされていたため、表示名ごとに最後の位置を採用して採番を揃える。
+    """
+
+    def __init__(self, prefix, option_lists):
+        """
+        Args:
+            prefix (str): variant ID のプレフィックス (common.base_variant_id)
+            option_lists (list): SKUグループごとの選択肢 (表示名) のリスト
+        """
+        self.prefix = prefix
+        self.option_lists = [list(opts) for opts in option_lists]
+        self._positions = [{opt: i for i, opt in enumerate(opts)} for opts in self.option_lists]
+        # 各桁の重み (そのグループより後ろのグループの選択肢数の積)
+        self._weights = []
+        weight = 1
+        for opts in reversed(self.option_lists):
+            self._weights.append(weight)
+            weight *= len(opts)
+        self._weights.reverse()
+        self._size = weight if self.option_lists else 0
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        解析結果 ({groups, common, ...}) から作成する。
+        SKUグループまたはプレフィックスがない場合は None
+        """
+        prefix = data.get("common", {}).get("base_variant_id") or ""
+        option_lists = [g.get("options", []) for g in data.get("groups", []) if g.get("type") == "sku"]
+        if not prefix or not option_lists:
+            return None
+        return cls(prefix, option_lists)
+
+    def __len__(self):
+        """組み合わせの総数"""
+        return self._size
+
+    def number_of(self, values):
+        """
+        各SKUグループの選択値 (表示名) の組から連番 (1 始まり) を返す。
+        グループ数が合わない、または選択肢にない値を含む場合は None
+        """
+        if len(values) != len(self._positions) or not self._size:
+            return None
+        n = 0
+        for value, positions, weight in zip(values, self._positions, self._weights):
+            pos = positions.get(value)
+            if pos is None:
+                return None
+            n += pos * weight
+        return n + 1
+
+    def vid(self, values):
+        """選択値の組に対応する variant ID (該当なしは None)"""
+        n = self.number_of(values)
+        return None if n is None else self.prefix + str(n)
+
+    def first_vid(self):
+        """各グループ先頭の選択肢の組の variant ID (従来の common.vid)"""
+        return self.vid([opts[0] for opts in self.option_lists]) if self._size else None
+
+    def values_at(self, n):
+        """連番 n (1 始まり) に対応する選択値の組 (number_of の逆変換)"""
+        if not 1 <= n <= self._size:
+            raise IndexError(n)
+        rest = n - 1
+        values = []
+        for opts, weight in zip(self.option_lists, self._weights):
+            pos, rest = divmod(rest, weight)
+            values.append(opts[pos])
+        return values
@@ -0,0 +1,80 @@
+import builtins
+import sys
+import threading
+import time
+
+
+class StartupProfiler:
+    """
+    起動時間の内訳 (モジュールの import と初期化の各段階) を計測する。
+
+    enable() から report() までの間、メインスレッドの import をフックし、
+    新たにモジュールが読み込まれた import の所要時間をトップレベルのパッケージ単位で集計する。
+    入れ子の import は子の時間を差し引いた自身の時間のみを計上する。
+    """
+    _enabled = False
+    _orig_import = None
+    _thread_id = None
+    _t0 = None
+    _phases = []  # [(段階名, 開始からの秒)]
+    _import_times = {}  # パッケージ名 -> 自身の所要秒
+    _stack = []  # 入れ子の import ごとの子の所要秒
+
+    @classmethod
+    def enable(cls):
+        if cls._enabled: return
+        cls._enabled = True
+        cls._t0 = time.perf_counter()
+        cls._thread_id = threading.get_ident()
+        cls._orig_import = builtins.__import__
+        builtins.__import__ = cls._timed_import
+
+    @classmethod
+    def is_enabled(cls):
+        return cls._enabled
+
+    @classmethod
+    def _timed_import(cls, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.get_ident() != cls._thread_id:
+            return cls._orig_import(name, globals, locals, fromlist, level)
+        before = len(sys.modules)
+        cls._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return cls._orig_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = cls._stack.pop()
+            if cls._stack:
+                cls._stack[-1] += elapsed
+            if len(sys.modules) != before:
+                # 相対 import (from . import x) は呼び出し元のパッケージに計上する
+                if level and globals:
+                    name = globals.get("__package__") or name
+                top = name.split(".")[0] or "(unknown)"
+                cls._import_times[top] = cls._import_times.get(top, 0.0) + elapsed - children
+
+    @classmethod
+    def mark(cls, phase):
+        """段階の完了時点を記録する (無効時は何もしない)"""
+        if cls._enabled:
+            cls._phases.append((phase, time.perf_counter() - cls._t0))
+
+    @classmethod
+    def report(cls, top=15):
+        """計測を終了し、段階ごとの経過と import の内訳を表示する"""
+        if not cls._enabled: return
+        builtins.__import__ = cls._orig_import
+        cls._enabled = False
+
+        print("\n" + "=" * 60)
+        print(" [STARTUP] 段階別経過 (起動からの ms / 前段階からの ms)")
+        prev = 0.0
+        for phase, at in cls._phases:
+            print(f"   {phase:<28} {at * 1000:8.1f}ms  (+{(at - prev) * 1000:7.1f}ms)")
+            prev = at
+        total = sum(cls._import_times.values())
+        print(f" [STARTUP] import 内訳 (計 {total * 1000:.1f}ms, 上位{top}件)")
+        for name, sec in sorted(cls._import_times.items(), key=lambda kv: -kv[1])[:top]:
+            print(f"   {name:<28} {sec * 1000:8.1f}ms")
+        print("=" * 60)
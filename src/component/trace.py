@@ -0,0 +1,232 @@
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class TraceRun:
+    """
+    1回の実行の記録 (Tracer.start_run が返すハンドル)。
+    記録の追加と書き出しはどのスレッドからでも行える。
+    """
+
+    _seq = itertools.count(1)
+
+    def __init__(self, name, attrs):
+        self.seq = next(self._seq)
+        self.name = name
+        self.attrs = attrs
+        self.mono0 = time.monotonic()
+        self.wall0 = time.time()
+        self.started_at = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.records = []
+        self._lock = threading.Lock()
+        self._result = None  # end() 済みなら (パス, 集計)
+
+    def append(self, record):
+        with self._lock:
+            if self._result is None:
+                self.records.append(record)
+
+    def end(self, trace_dir):
+        """JSONL に書き出す (2回目以降は1回目の結果を返す)"""
+        with self._lock:
+            if self._result is not None:
+                return self._result
+            records = sorted(self.records, key=lambda r: r["start"])
+            self._result = (self._write(trace_dir, records), Tracer.summarize(records))
+            return self._result
+
+    def _write(self, trace_dir, records):
+        mono0 = self.mono0
+        rel = lambda t: round((t - mono0) * 1000, 3)
+        # 同じ秒に同名の実行が並行して始まってもファイルが衝突しないよう、連番を含める
+        path = os.path.join(trace_dir, f"{self.started_at}_{self.name}_{self.seq}.jsonl")
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                header = {"type": "run", "name": self.name, "started_at": self.started_at,
+                          "wall_start": self.wall0, "attrs": self.attrs}
+                f.write(json.dumps(header, ensure_ascii=False) + "\n")
+                for r in records:
+                    out = {"type": r["type"], "name": r["name"], "start_ms": rel(r["start"]),
+                           "thread": r["thread"], "attrs": r["attrs"]}
+                    if r["type"] == "span":
+                        out.update({"end_ms": rel(r["end"]), "dur_ms": round((r["end"] - r["start"]) * 1000, 3),
+                                    "error": r["error"]})
+                    f.write(json.dumps(out, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            print(f"[TRACE] トレースの書き出しに失敗: {e}")
+            path = None
+        return path
+
+
+class Tracer:
+    """
+    購入フローの段階ごとの所要時間を記録する軽量トレーサー。
+
+    start_run() から end_run() までの間に記録された span / event を、
+    1実行 = 1ファイルの JSONL (logs/trace/) として書き出す。
+    時刻はすべて time.monotonic() 基準で、ファイルにはラン開始からの相対 ms で保存する。
+    実行中でないときの span() は何も記録しないため、常時呼び出してよい。
+
+    実行中のラン (TraceRun) はスレッドごとに保持するため、画面からの即時実行と予約ジョブなど
+    複数の実行が並行しても記録は混ざらない。別スレッドで処理させる関数は wrap() で包むと、
+    呼び出し元のランに記録される。
+    """
+    _local = threading.local()
+
+    @classmethod
+    def _trace_dir(cls):
+        current_file = os.path.abspath(__file__)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
+        return os.path.join(project_root, "logs", "trace")
+
+    @classmethod
+    def start_run(cls, name, **attrs):
+        """
+        新しい実行を開始し、呼び出したスレッドに結び付ける (このスレッドで実行中のものがあれば先に書き出す)。
+
+        Returns:
+            TraceRun: 実行のハンドル
+        """
+        if cls.current() is not None:
+            cls.end_run()
+        run = TraceRun(name, attrs)
+        cls._local.run = run
+        return run
+
+    @classmethod
+    def current(cls):
+        """このスレッドで実行中のラン (無ければ None)"""
+        return getattr(cls._local, "run", None)
+
+    @classmethod
+    def is_active(cls):
+        return cls.current() is not None
+
+    @classmethod
+    def detach(cls):
+        """実行中のランをこのスレッドから切り離して返す (書き出しはしない)"""
+        run = cls.current()
+        cls._local.run = None
+        return run
+
+    @classmethod
+    @contextmanager
+    def bind(cls, run):
+        """with の間、このスレッドの記録先を run にする"""
+        previous = cls.current()
+        cls._local.run = run
+        try:
+            yield run
+        finally:
+            cls._local.run = previous
+
+    @classmethod
+    def wrap(cls, func):
+        """呼び出し時点のランに記録するよう func を包む (スレッドプールへ渡す関数用)"""
+        run = cls.current()
+        if run is None:
+            return func
+
+        def wrapped(*args, **kwargs):
+            with cls.bind(run):
+                return func(*args, **kwargs)
+        return wrapped
+
+    @classmethod
+    @contextmanager
+    def span(cls, name, **attrs):
+        """with Tracer.span("checkout.navigate"): ... の形で区間を記録する"""
+        start = time.monotonic()
+        error = None
+        try:
+            yield attrs
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            raise
+        finally:
+            cls.add_span(name, start, time.monotonic(), error=error, **attrs)
+
+    @classmethod
+    def add_span(cls, name, start, end, error=None, **attrs):
+        """計測済みの区間 (monotonic 秒) を記録する"""
+        run = cls.current()
+        if run is None: return
+        run.append({"type": "span", "name": name, "start": start, "end": end, "error": error,
+                    "thread": threading.current_thread().name, "attrs": attrs})
+
+    @classmethod
+    def event(cls, name, at=None, **attrs):
+        """時点を記録する。at 省略時は現在時刻"""
+        run = cls.current()
+        if run is None: return
+        run.append({"type": "event", "name": name, "start": time.monotonic() if at is None else at,
+                    "thread": threading.current_thread().name, "attrs": attrs})
+
+    @classmethod
+    def wall_to_monotonic(cls, epoch_ms):
+        """ページ側の Date.now() (ms) を実行中ランの monotonic 秒に換算する"""
+        run = cls.current()
+        if run is None: return None
+        return run.mono0 + (epoch_ms / 1000.0 - run.wall0)
+
+    @classmethod
+    def end_run(cls, run=None):
+        """
+        実行を終了して JSONL に書き出す。run 省略時はこのスレッドで実行中のラン。
+
+        Returns:
+            tuple: (書き出したファイルパス または None, summarize() の結果)
+        """
+        current = cls.current()
+        if run is None:
+            run = current
+        if run is current:
+            cls._local.run = None
+        if run is None:
+            return None, []
+        return run.end(cls._trace_dir())
+
+    @staticmethod
+    def summarize(records):
+        """
+        名前ごとに集計する。開始時刻は "trigger" イベント (無ければ最初の記録) からの相対 ms。
+
+        Returns:
+            list: [{"name", "count", "errors", "total_ms", "max_ms", "first_ms"}, ...] (開始順)
+        """
+        if not records:
+            return []
+        trigger = next((r["start"] for r in records if r["type"] == "event" and r["name"] == "trigger"),
+                       min(r["start"] for r in records))
+        phases = {}
+        for r in records:
+            p = phases.get(r["name"])
+            if p is None:
+                p = phases[r["name"]] = {"name": r["name"], "count": 0, "errors": 0, "total_ms": 0.0,
+                                         "max_ms": 0.0, "first_ms": (r["start"] - trigger) * 1000}
+            p["count"] += 1
+            if r["type"] == "span":
+                dur = (r["end"] - r["start"]) * 1000
+                p["total_ms"] += dur
+                p["max_ms"] = max(p["max_ms"], dur)
+                if r["error"]: p["errors"] += 1
+        return sorted(phases.values(), key=lambda p: p["first_ms"])
+
+    @staticmethod
+    def format_summary(summary):
+        """ログ表示用の行リストに整形する"""
+        lines = []
+        for p in summary:
+            line = f"{p['name']:<22} T{p['first_ms']:+9.1f}ms  x{p['count']:<3}"
+            if p["total_ms"] or p["max_ms"]:
+                line += f" 計{p['total_ms']:8.1f}ms  最大{p['max_ms']:8.1f}ms"
+            if p["errors"]:
+                line += f"  失敗{p['errors']}"
+            lines.append(line.rstrip())
+        return lines
@@ -0,0 +1,115 @@
+import time
+import statistics
+from email.utils import parsedate_to_datetime
+
+from component.http_client_manager import HttpClientManager
+
+
+class TriggerScheduler:
+    """
+    指定時刻に処理を発火させるための高精度スケジューラー。
+
+    目標時刻は予約時点で time.monotonic() 基準の期限に変換するため、
+    待機中にOSの時刻補正 (NTP 等) が入っても発火タイミングがずれない。
+    期限の直前までは粗くスリープし、最後の SPIN_WINDOW 秒だけビジーループで待つ。
+
+    また、ショップサーバーの Date ヘッダーから ローカル時計とのずれ (clock_offset) を推定し、
+    目標時刻をサーバー時計基準として扱うことができる。
+    """
+    # Windows のタイマー分解能 (約15.6ms) を吸収できる幅だけスピンする
+    SPIN_WINDOW = 0.02
+    # 粗いスリープ1回あたりの上限 (キャンセル応答性のため)
+    MAX_SLEEP = 60.0
+
+    def __init__(self, clock_offset=0.0):
+        # サーバー時計 - ローカル時計 (秒)。正ならサーバーが進んでいる
+        self.clock_offset = clock_offset
+        self.offset_uncertainty = None
+        self.last_error_ms = None
+
+    def calibrate(self, url, samples=10):
+        """
+        url への HEAD リクエストを繰り返し、Date ヘッダーから時計のずれを推定する。
+
+        Date ヘッダーは秒単位のため、各往復から「ずれが取り得る区間」を求めて積集合をとる。
+        送信タイミングを1秒の中で少しずつずらすことで区間を狭める。
+
+        Returns:
+            float: 推定した clock_offset (秒)。取得できなかった場合は None
+        """
+        pool = HttpClientManager.get_pool()
+        interval = 1.0 / samples + 0.013
+        # 計測中の時刻補正の影響を避けるため、壁時計は起点で一度だけ読む
+        anchor_wall = time.time()
+        anchor_mono = time.monotonic()
+
+        lo, hi = float("-inf"), float("inf")
+        midpoints = []
+        for i in range(samples):
+            if i:
+                time.sleep(interval)
+            try:
+                t_send = anchor_wall + (time.monotonic() - anchor_mono)
+                res = pool.request("HEAD", url, headers=HttpClientManager.build_headers(url))
+                t_recv = anchor_wall + (time.monotonic() - anchor_mono)
+                date = res.headers.get("Date")
+                if not date:
+                    continue
+                server_sec = parsedate_to_datetime(date).timestamp()
+            except Exception as e:
+                print(f"[CLOCK] サンプル取得失敗: {e}")
+                continue
+            # サーバー時刻は [server_sec, server_sec + 1) のいずれか、その瞬間は [t_send, t_recv] のいずれか
+            lo = max(lo, server_sec - t_recv)
+            hi = min(hi, server_sec + 1.0 - t_send)
+            midpoints.append(server_sec + 0.5 - (t_send + t_recv) / 2)
+
+        if not midpoints:
+            print("[CLOCK] サーバー時刻を取得できませんでした。ローカル時計を使用します。")
+            return None
+
+        if lo <= hi:
+            self.clock_offset = (lo + hi) / 2
+            self.offset_uncertainty = (hi - lo) / 2
+        else:
+            # 区間が矛盾する場合 (サーバー側の丸め等) は中央値で代用
+            self.clock_offset = statistics.median(midpoints)
+            self.offset_uncertainty = 0.5
+        print(f"[CLOCK] サーバー時計差: {self.clock_offset * 1000:+.1f}ms "
+              f"(±{self.offset_uncertainty * 1000:.1f}ms, {len(midpoints)} samples)")
+        return self.clock_offset
+
+    def to_deadline(self, target_time):
+        """
+        サーバー時計基準の目標時刻 (naive datetime, ローカルタイムゾーン) を
+        time.monotonic() 基準の期限に変換する。
+        """
+        remaining = target_time.timestamp() - self.clock_offset - time.time()
+        return time.monotonic() + remaining
+
+    def wait_until(self, deadline, stop_event=None):
+        """
+        monotonic 期限まで待機する。
+
+        Returns:
+            float: 発火誤差 (ms, 正なら遅れ)。stop_event でキャンセルされた場合は None
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= self.SPIN_WINDOW:
+                break
+            sleep_t = min(remaining - self.SPIN_WINDOW, self.MAX_SLEEP)
+            if stop_event is not None:
+                if stop_event.wait(sleep_t): return None
+            else:
+                time.sleep(sleep_t)
+
+        while time.monotonic() < deadline:
+            pass
+
+        self.last_error_ms = (time.monotonic() - deadline) * 1000
+        return self.last_error_ms
+
+    def wait_for(self, target_time, stop_event=None):
+        """目標時刻 (datetime) まで待機し、発火誤差 (ms) を返す"""
+        return self.wait_until(self.to_deadline(target_time), stop_event)
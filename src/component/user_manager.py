@@ -3,6 +3,7 @@ import json
 import base64
 import hashlib
 import uuid
+import threading
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -10,6 +11,16 @@ from cryptography.hazmat.backends import default_backend
 
 
 class UserManager:
+    # 導出済みの暗号鍵 (プロセス内キャッシュ)。PBKDF2 (10万回) は数十ms~かかるため一度だけ実行する
+    _cipher_cache = {}
+    _cipher_lock = threading.Lock()
+
+    @classmethod
+    def clear_key_cache(cls):
+        """導出済み鍵のキャッシュを破棄する (鍵の元となる MAC アドレスが変わった場合など)"""
+        with cls._cipher_lock:
+            cls._cipher_cache.clear()
+
     def __init__(self, config_path=None):
         # パスの固定処理
         if config_path is None:
@@ -46,19 +57,28 @@ class UserManager:
     def _get_cipher(self):
         try:
             mac = self._get_mac_address().encode("utf-8")
-            salt = hashlib.sha256(mac).digest()[:16]
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=salt,
-                iterations=100000,
-                backend=default_backend()
-            )
-            key = base64.urlsafe_b64encode(kdf.derive(mac))
-            return Fernet(key)
+            with UserManager._cipher_lock:
+                cipher = UserManager._cipher_cache.get(mac)
+                if cipher is None:
+                    cipher = self._derive_cipher(mac)
+                    UserManager._cipher_cache[mac] = cipher
+            return cipher
         except:
             return None
 
+    @staticmethod
+    def _derive_cipher(mac):
+        salt = hashlib.sha256(mac).digest()[:16]
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=100000,
+            backend=default_backend()
+        )
+        key = base64.urlsafe_b64encode(kdf.derive(mac))
+        return Fernet(key)
+
     def _encrypt(self, text):
         if not text: return ""
         try:
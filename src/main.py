@@ -1,14 +1,25 @@
 import sys
 import tkinter.messagebox as mb
-from component.chrome_driver_manager import ChromeDriverManager
-from ui.product_controller import ProductController
+from component.log_sink import LogSink
+from component.startup_profiler import StartupProfiler
 
 def main():
+    # --profile-startup: 起動時間の内訳 (import / 初期化 / 初回描画) を表示する
+    if "--profile-startup" in sys.argv[1:]:
+        StartupProfiler.enable()
+
     try:
+        # 画面・ロジックのモジュールはここで読み込む (計測対象に含めるため)
+        from ui.product_controller import ProductController
+        StartupProfiler.mark("import ProductController")
+
         # 1. プロダクトコントローラーを起動
         # デフォルトのモード（例: debug_mode=True）で開始
-        # この中でブラウザの生成、ロジックの初期化がすべて完結します
+        # ブラウザ・ロジック・重いモジュールは必要になった時点で初期化されます
         app = ProductController(debug_mode=True)
+        StartupProfiler.mark("ProductController()")
+        if StartupProfiler.is_enabled():
+            app.after_first_paint(lambda: (StartupProfiler.mark("first paint"), StartupProfiler.report()))
         app.mainloop()
 
     except Exception as e:
@@ -18,7 +29,11 @@ def main():
     finally:
         # 2. アプリ終了時にブラウザを確実に破棄
         # ProductControllerの _on_closing でも呼ばれますが、念のためここでも実行
-        ChromeDriverManager.quit_driver()
+        # (ブラウザを一度も使っていなければ selenium ごと読み込まれていない)
+        if "component.chrome_driver_manager" in sys.modules:
+            from component.chrome_driver_manager import ChromeDriverManager
+            ChromeDriverManager.quit_driver()
+        LogSink.shutdown()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import time
+
+from component.chrome_driver_manager import ChromeDriverManager
+from tool.bench_util import format_summary
+from tool.mock_storefront import MockStorefront
+
+# 計測専用の用途名 (プロファイルディレクトリも debug_bench として分ける)
+BENCH_ROLE = "bench"
+# 模擬サイトの広告タグ・計測ピクセル (実サイト向けの既定パターンには含まれない)
+MOCK_AD_PATTERNS = ["*/ads/*", "*/track/*"]
+PAGES = ("/", "/cart", "/item/100200")
+
+
+def build_profiles():
+    """比較するプロファイル (名前 -> 設定)"""
+    profiles = {"normal (従来)": dict(ChromeDriverManager.DEFAULT_PROFILE)}
+    for role in (ChromeDriverManager.ROLE_PURCHASE, ChromeDriverManager.ROLE_ANALYSIS):
+        profile = ChromeDriverManager.get_role_profile(role)
+        profile["blocked_urls"] = list(profile["blocked_urls"]) + MOCK_AD_PATTERNS
+        profiles[role] = profile
+    return profiles
+
+
+def measure_profile(server, profile, runs, headless):
+    """
+    プロファイルを適用したブラウザで各ページを開き、
+    driver.get の所要時間(ms) と 1遷移あたりのアセット転送量(KB) を返す。
+    """
+    ChromeDriverManager.quit_driver(role=BENCH_ROLE)
+    ChromeDriverManager.set_role_profile(BENCH_ROLE, profile)
+    try:
+        driver = ChromeDriverManager.get_driver(True, is_headless=headless, role=BENCH_ROLE)
+        nav_samples, kb_samples = [], []
+        for _ in range(runs):
+            for path in PAGES:
+                since = time.monotonic()
+                driver.get(server.url(path))
+                nav_samples.append((time.monotonic() - since) * 1000)
+                # 遅れて届くアセットも数えるため、次の遷移の直前に集計する
+                time.sleep(0.2)
+                sent = sum(e["detail"]["bytes"] for e in server.events
+                           if e["name"] == "asset" and e["t"] >= since)
+                kb_samples.append(sent / 1024)
+        return nav_samples, kb_samples
+    finally:
+        ChromeDriverManager.quit_driver(role=BENCH_ROLE)
+        ChromeDriverManager.set_role_profile(BENCH_ROLE, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ブラウザ読み込みプロファイル別の遷移時間・転送量の計測")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--assets", type=int, default=30, help="各ページに埋め込む画像の数")
+    parser.add_argument("--asset-kb", type=int, default=50)
+    parser.add_argument("--asset-ms", type=int, default=150, help="アセット1件あたりの応答遅延")
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+
+    server = MockStorefront(asset_count=args.assets, asset_kb=args.asset_kb, asset_ms=args.asset_ms).start()
+    results = {}
+    try:
+        for name, profile in build_profiles().items():
+            results[name] = measure_profile(server, profile, args.runs, args.headless)
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 60)
+    print(f" [CONFIG] pages={len(PAGES)} runs={args.runs} assets={args.assets}x{args.asset_kb}KB"
+          f" delay={args.asset_ms}ms")
+    for name, (nav, kb) in results.items():
+        print(" " + format_summary(f"{name} navigation", nav))
+        print(" " + format_summary(f"{name} transfer", kb, unit="KB"))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import time
+
+from bl.purchase_logic import PurchaseLogic
+from component.chrome_driver_manager import ChromeDriverManager
+from component.http_client_manager import HttpClientManager
+from tool.bench_purchase import SAMPLE_LINE
+from tool.bench_util import format_summary
+from tool.mock_storefront import MockStorefront
+
+
+def measure_transport(logic, server, transport, runs):
+    """指定経路でカート追加POSTを runs 回送信し、送信～サーバー到達/呼び出し完了の時間(ms)を返す"""
+    logic.transport = transport
+    arrive, done = [], []
+    failures = 0
+    for _ in range(runs):
+        server.clear_events()
+        start = time.monotonic()
+        ok = logic.execute_cart_post(SAMPLE_LINE)
+        end = time.monotonic()
+        ev = server.wait_event("cart_post", since=start, timeout=5.0)
+        if not ok or ev is None:
+            failures += 1
+            continue
+        arrive.append((ev["t"] - start) * 1000)
+        done.append((end - start) * 1000)
+    return arrive, done, failures
+
+
+def measure_batch(logic, transport, lines, runs):
+    """lines 行を逐次POSTした場合と一括POSTした場合の所要時間(ms)を返す"""
+    logic.transport = transport
+    serial, batch = [], []
+    for _ in range(runs):
+        start = time.monotonic()
+        for line in lines:
+            logic.execute_cart_post(line)
+        serial.append((time.monotonic() - start) * 1000)
+
+        start = time.monotonic()
+        logic.execute_cart_post_batch(lines)
+        batch.append((time.monotonic() - start) * 1000)
+    return serial, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="カート追加POSTの送信経路 (selenium / http) 比較")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--lines", type=int, default=5, help="一括POST比較の行数")
+    args = parser.parse_args()
+
+    server = MockStorefront(latency_ms=args.latency_ms).start()
+    try:
+        logic = PurchaseLogic(debug_mode=True)
+        logic.common = server.common_config()
+        if not logic.execute_login():
+            raise RuntimeError("模擬サイトへのログインに失敗しました")
+        logic.prepare_http_transport()
+
+        results, batches = {}, {}
+        lines = [SAMPLE_LINE] * args.lines
+        for transport in (PurchaseLogic.TRANSPORT_SELENIUM, PurchaseLogic.TRANSPORT_HTTP):
+            results[transport] = measure_transport(logic, server, transport, args.runs)
+            batches[transport] = measure_batch(logic, transport, lines, max(1, args.runs // 5))
+    finally:
+        ChromeDriverManager.quit_driver()
+        HttpClientManager.reset()
+        server.stop()
+
+    print("\n" + "=" * 60)
+    for transport, (arrive, done, failures) in results.items():
+        print(f" [{transport}] failures={failures}")
+        print(" " + format_summary("call -> server arrival", arrive))
+        print(" " + format_summary("call -> return", done))
+        serial, batch = batches[transport]
+        print(" " + format_summary(f"{args.lines} lines serial", serial))
+        print(" " + format_summary(f"{args.lines} lines batch", batch))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
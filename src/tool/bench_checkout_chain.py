@@ -0,0 +1,115 @@
+import argparse
+import json
+import time
+
+from bl.purchase_logic import PurchaseLogic
+from component.chrome_driver_manager import ChromeDriverManager
+from component.script_registry import ScriptRegistry
+from tool.bench_util import format_summary
+from tool.mock_storefront import MockStorefront
+
+# 比較用: 従来の 100ms 間隔で DOM 全体を走査する連鎖クリックスクリプト (デバッグモードの対象のみ)
+LEGACY_CHECKOUT_SCRIPT = """
+(function() {
+    const start = Date.now();
+    const targets = """ + json.dumps(["ご購入手続き", "購入手続き"], ensure_ascii=False) + """;
+    const errKws = ["混み合って", "アクセスが集中", "システムエラー", "時間をおいて"];
+
+    const interval = setInterval(() => {
+        if (window.self !== window.top) return;
+
+        const txt = document.body.innerText || "";
+        if (errKws.filter(k => txt.includes(k)).length >= 2) {
+            location.reload();
+            return;
+        }
+
+        const elements = Array.from(document.querySelectorAll('button, a, input, div[role="button"]'));
+        const target = elements.find(el => {
+            const t = (el.innerText || el.value || el.getAttribute('aria-label') || "").replace(/\\s/g, "");
+            return targets.some(k => t.includes(k));
+        });
+
+        if (target) {
+            target.click();
+            target.dispatchEvent(new MouseEvent('click', {bubbles: true, view: window}));
+        }
+
+        if (Date.now() - start > 60000) clearInterval(interval);
+    }, 100);
+})();
+"""
+
+# ページ上の処理時間として集計する Performance.getMetrics の項目 (秒)
+BUSY_METRICS = ("ScriptDuration", "LayoutDuration", "RecalcStyleDuration")
+
+
+def _register(driver, source):
+    return driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})["identifier"]
+
+
+def _busy_seconds(driver):
+    metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    return sum(m["value"] for m in metrics if m["name"] in BUSY_METRICS)
+
+
+def measure_click_latency(driver, server, runs, delay_ms, filler, timeout):
+    """ボタンが描画されてからクリックされるまでの時間(ms)を、ページ側の計測値で集める"""
+    samples = []
+    for i in range(runs):
+        since = time.monotonic()
+        driver.get(server.url(f"/cart?delay_ms={delay_ms}&filler={filler}"))
+        ev = server.wait_event("checkout_view", since=since, timeout=timeout)
+        if ev is None or ev["detail"].get("click_ms") is None:
+            print(f"[BENCH] run {i + 1}/{runs}: TIMEOUT")
+            continue
+        samples.append(ev["detail"]["click_ms"])
+    return samples
+
+
+def measure_idle_cost(driver, server, filler, seconds):
+    """ボタンが現れない重いカートページに滞在し、1秒あたりのスクリプト・レイアウト処理時間(ms)を返す"""
+    driver.get(server.url(f"/cart?delay_ms={int(seconds * 1000) + 60000}&filler={filler}"))
+    before = _busy_seconds(driver)
+    time.sleep(seconds)
+    return (_busy_seconds(driver) - before) * 1000 / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="連鎖クリック (100ms 走査 / MutationObserver) のクリック遅延計測")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--delay-ms", type=int, default=300, help="ボタンを描画するまでの遅延")
+    parser.add_argument("--filler", type=int, default=2000, help="カートページに追加するダミー行数")
+    parser.add_argument("--idle-sec", type=float, default=3.0, help="待機中コストの計測秒数")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    server = MockStorefront().start()
+    logic = PurchaseLogic(debug_mode=True)
+    results = {}
+    try:
+        driver = ChromeDriverManager.get_driver(True)
+        driver.execute_cdp_cmd("Performance.enable", {})
+        for label, source in (("interval 100ms", LEGACY_CHECKOUT_SCRIPT),
+                              ("MutationObserver", ScriptRegistry.wrap(logic._build_checkout_script()))):
+            script_id = _register(driver, source)
+            try:
+                latency = measure_click_latency(driver, server, args.runs, args.delay_ms, args.filler, args.timeout)
+                idle = measure_idle_cost(driver, server, args.filler, args.idle_sec)
+            finally:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": script_id})
+            results[label] = (latency, idle)
+    finally:
+        ChromeDriverManager.quit_driver()
+        server.stop()
+
+    print("\n" + "=" * 60)
+    print(f" [CONFIG] delay={args.delay_ms}ms  filler={args.filler}  runs={args.runs}")
+    for label, (latency, idle) in results.items():
+        print(" " + format_summary(f"{label} click", latency))
+        print(f"   {label} 待機中の処理時間: {idle:.1f}ms/s ({' + '.join(BUSY_METRICS)})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
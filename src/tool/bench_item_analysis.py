@@ -0,0 +1,97 @@
+import argparse
+import os
+import time
+
+from bl.item_analysis_logic import ItemAnalysisLogic
+from component.chrome_driver_manager import ChromeDriverManager
+from component.item_page_parser import ItemPageParser
+from tool.bench_util import format_summary
+from tool.mock_storefront import MockStorefront
+
+# 比較対象のキー (title はブラウザの innerText と空白の扱いが異なり得るため除外)
+COMPARE_COMMON_KEYS = ("itemid", "shopid", "base_variant_id", "vid")
+
+
+def _normalize(data):
+    groups = [(g["name"], tuple(g["options"]), g["type"]) for g in data.get("groups", [])]
+    common = {k: data.get("common", {}).get(k) for k in COMPARE_COMMON_KEYS}
+    return groups, common
+
+
+def compare(static_data, browser_data):
+    """静的解析とブラウザ解析の結果差分を文字列リストで返す (一致なら空)"""
+    diffs = []
+    s_groups, s_common = _normalize(static_data)
+    b_groups, b_common = _normalize(browser_data)
+    if s_groups != b_groups:
+        diffs.append(f"groups: static={s_groups} browser={b_groups}")
+    for k in COMPARE_COMMON_KEYS:
+        if s_common[k] != b_common[k]:
+            diffs.append(f"{k}: static={s_common[k]!r} browser={b_common[k]!r}")
+    return diffs
+
+
+def bench_source(logic, source, runs):
+    """
+    source (URL または保存済みHTMLファイル) を両方式で解析し、所要時間と差分を返す。
+    HTMLファイルの場合、静的側はファイルを直接パースし、ブラウザ側は file:// URL を開く。
+    """
+    is_file = os.path.isfile(source)
+    url = "file:///" + os.path.abspath(source).replace(os.sep, "/") if is_file else source
+
+    static_ms, browser_ms = [], []
+    static_data = browser_data = None
+    for _ in range(runs):
+        start = time.monotonic()
+        if is_file:
+            with open(source, "r", encoding="utf-8", errors="replace") as f:
+                static_data = ItemPageParser.parse(f.read())
+        else:
+            static_data = logic.fetch_item_variants_static(url)
+        static_ms.append((time.monotonic() - start) * 1000)
+
+        start = time.monotonic()
+        browser_data = logic.fetch_item_variants_browser(url)
+        browser_ms.append((time.monotonic() - start) * 1000)
+
+    diffs = compare(static_data or {}, browser_data or {})
+    complete = bool(static_data) and ItemPageParser.is_complete(static_data)
+    return static_ms, browser_ms, diffs, complete
+
+
+def main():
+    parser = argparse.ArgumentParser(description="商品解析: 静的HTML解析とブラウザ解析の時間・結果比較")
+    parser.add_argument("sources", nargs="*", help="商品URL または保存済みの商品ページHTML (省略時は模擬サイト)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = None
+    sources = args.sources
+    if not sources:
+        server = MockStorefront().start()
+        sources = [server.url("/item/100200?groups=3x4&choices=1"),
+                   server.url("/item/100201?groups=5x6x4&choices=2")]
+
+    logic = ItemAnalysisLogic(debug_mode=False)
+    results = []
+    try:
+        for source in sources:
+            results.append((source,) + bench_source(logic, source, args.runs))
+    finally:
+        logic.close()
+        ChromeDriverManager.quit_driver()
+        if server:
+            server.stop()
+
+    print("\n" + "=" * 60)
+    for source, static_ms, browser_ms, diffs, complete in results:
+        print(f" [{source}] static_complete={complete} {'MATCH' if not diffs else 'DIFF'}")
+        print(" " + format_summary("static (HTTP+parse)", static_ms))
+        print(" " + format_summary("browser (headless)", browser_ms))
+        for d in diffs:
+            print(f"   ! {d}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import time
+
+from bl.purchase_logic import PurchaseLogic
+from component.chrome_driver_manager import ChromeDriverManager
+from tool.bench_util import format_summary
+from tool.mock_storefront import MockStorefront
+
+# ベンチマーク用の固定カート行 (qty###表示名###vid|choices|itemid|shopid)
+SAMPLE_LINE = "1###ベンチマーク商品 (ブラック ・ M)###compass_sku_100200_1|確認事項:了承しました|100200|300400"
+
+
+def run_benchmark(server, runs=20, production=False, timeout=30.0):
+    """
+    模擬ストアフロントに対して ログイン → (トリガー) カートPOST → 購入手続き を繰り返し、
+    トリガーから「注文を確定」到達 (デバッグ時は購入手続きページ到達) までのレイテンシを返す。
+    """
+    logic = PurchaseLogic(debug_mode=not production)
+    logic.common = server.common_config()
+
+    if not logic.execute_login():
+        raise RuntimeError("模擬サイトへのログインに失敗しました")
+
+    # 本番モードは「注文を確定」クリック、デバッグモードは購入手続きページ表示を終点とする
+    end_event = "order_confirmed" if production else "checkout_view"
+    post_samples, total_samples = [], []
+    timeouts = 0
+
+    for i in range(runs):
+        logic.navigate_to(server.url("/"))
+        server.clear_events()
+
+        t_trigger = time.monotonic()
+        ok = logic.execute_cart_post(SAMPLE_LINE)
+        t_posted = time.monotonic()
+        logic.go_to_checkout()
+
+        ev = server.wait_event(end_event, since=t_trigger, timeout=timeout)
+        if ev is None or not ok:
+            timeouts += 1
+            print(f"[BENCH] run {i + 1}/{runs}: TIMEOUT (post={ok})")
+            continue
+
+        post_samples.append((t_posted - t_trigger) * 1000)
+        total_samples.append((ev["t"] - t_trigger) * 1000)
+        print(f"[BENCH] run {i + 1}/{runs}: {total_samples[-1]:.1f}ms "
+              f"(congestion={server.count_events('congestion', t_trigger)}, "
+              f"502={server.count_events('http_502', t_trigger)})")
+
+    logic.navigate_to(server.url("/"))
+    return {"post": post_samples, "total": total_samples, "timeouts": timeouts, "end_event": end_event}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模擬ストアフロントでの購入ホットパス計測")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--production", action="store_true",
+                        help="本番モードで「注文を確定」クリックまで計測する (模擬サイトのみが対象)")
+    parser.add_argument("--congestion", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = MockStorefront(congestion_rate=args.congestion, error_rate=args.error_rate,
+                            latency_ms=args.latency_ms, slow_rate=args.slow_rate,
+                            slow_ms=args.slow_ms, seed=args.seed).start()
+    try:
+        res = run_benchmark(server, runs=args.runs, production=args.production)
+    finally:
+        ChromeDriverManager.quit_driver()
+        server.stop()
+
+    print("\n" + "=" * 60)
+    print(f" [RESULT] end={res['end_event']}  timeouts={res['timeouts']}")
+    print(" " + format_summary("trigger -> POST done", res["post"]))
+    print(" " + format_summary("trigger -> end", res["total"]))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
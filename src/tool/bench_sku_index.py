@@ -0,0 +1,118 @@
+import argparse
+import json
+import time
+
+from component.sku_index import SkuIndex
+from tool.bench_util import format_summary
+
+# 従来の解析スクリプトで組み合わせを列挙していた部分 (ブラウザ上での比較用)
+LEGACY_COMBINE_SCRIPT = """
+var groups = arguments[0], skuPrefix = arguments[1], skuMap = {};
+function combine(list, n, result, current) {
+    if (n === list.length) { result.push(current.join(',')); return; }
+    for (var j = 0; j < list[n].options.length; j++) { combine(list, n + 1, result, current.concat([list[n].options[j]])); }
+}
+var combs = [];
+combine(groups, 0, combs, []);
+combs.forEach((c, i) => { skuMap[c] = skuPrefix + (i + 1); });
+return skuMap;
+"""
+
+
+def legacy_sku_map(prefix, option_lists):
+    """従来の combine による skuMap ("選択値,選択値,..." -> variant ID) を Python で再現する"""
+    combs = [[]]
+    for opts in option_lists:
+        combs = [c + [o] for c in combs for o in opts]
+    sku_map = {}
+    for i, c in enumerate(combs):
+        sku_map[",".join(c)] = prefix + str(i + 1)
+    return sku_map, combs
+
+
+def bench_expand(prefix, option_lists, runs):
+    """
+    従来方式 (全組み合わせの列挙 + 転送相当の JSON 化) と SkuIndex (作成 + 全組み合わせ中の1件の算出) の所要時間(ms)。
+
+    Returns:
+        tuple: (従来方式の計測値, SkuIndex の計測値, 従来の skuMap の JSON サイズ(bytes))
+    """
+    legacy_ms, index_ms = [], []
+    payload = 0
+    last = [opts[-1] for opts in option_lists]
+    for _ in range(runs):
+        start = time.perf_counter()
+        sku_map, _ = legacy_sku_map(prefix, option_lists)
+        payload = len(json.dumps(sku_map, ensure_ascii=False).encode("utf-8"))
+        legacy_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        SkuIndex(prefix, option_lists).vid(last)
+        index_ms.append((time.perf_counter() - start) * 1000)
+    return legacy_ms, index_ms, payload
+
+
+def bench_browser(logic, url, runs):
+    """
+    ブラウザ解析 (グループのみ返す現行スクリプト) と、同じページで従来の列挙部分を追加で実行した時間(ms)。
+    """
+    from component.chrome_driver_manager import ChromeDriverManager
+    current_ms, legacy_ms = [], []
+    for _ in range(runs):
+        start = time.monotonic()
+        data = logic.fetch_item_variants_browser(url)
+        current_ms.append((time.monotonic() - start) * 1000)
+
+        driver = ChromeDriverManager.get_driver(is_debug_mode=False, is_headless=True, role=logic.role)
+        sku_groups = [g for g in data["groups"] if g["type"] == "sku"]
+        start = time.monotonic()
+        driver.execute_script(LEGACY_COMBINE_SCRIPT, sku_groups, data["common"].get("base_variant_id", ""))
+        legacy_ms.append(current_ms[-1] + (time.monotonic() - start) * 1000)
+    return current_ms, legacy_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SKU採番: 全組み合わせの列挙と SkuIndex の比較")
+    parser.add_argument("--groups", nargs="*", default=["20x15x10", "12x10x8x6", "30x20x10x8"],
+                        help="計測する SKU グループの選択肢数 (例: 20x15x10)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--browser", action="store_true", help="模擬サイトの商品ページでブラウザ解析も計測する")
+    args = parser.parse_args()
+
+    # 採番が従来と同じであることは tests/test_sku_index.py で確認する
+    results = []
+    for spec in args.groups:
+        sizes = [int(n) for n in spec.split("x")]
+        option_lists = [[f"選択肢{g + 1}-{o + 1}" for o in range(size)] for g, size in enumerate(sizes)]
+        results.append((spec,) + bench_expand("compass_sku_100300_", option_lists, args.runs))
+
+    browser_results = []
+    if args.browser:
+        from bl.item_analysis_logic import ItemAnalysisLogic
+        from component.chrome_driver_manager import ChromeDriverManager
+        from tool.mock_storefront import MockStorefront
+        server = MockStorefront().start()
+        logic = ItemAnalysisLogic(debug_mode=False, use_static=False)
+        try:
+            for i, spec in enumerate(args.groups):
+                url = server.url(f"/item/{100300 + i}?groups={spec}&choices=1")
+                browser_results.append((spec,) + bench_browser(logic, url, args.runs))
+        finally:
+            logic.close()
+            ChromeDriverManager.quit_driver()
+            server.stop()
+
+    print("\n" + "=" * 60)
+    for shape, legacy_ms, index_ms, payload in results:
+        print(f" [{shape}] skuMap={payload / 1024:.0f}KB")
+        print(" " + format_summary("skuMap (combine+JSON)", legacy_ms))
+        print(" " + format_summary("SkuIndex (build+vid)", index_ms))
+    for spec, current_ms, legacy_ms in browser_results:
+        print(f" [browser {spec}]")
+        print(" " + format_summary("browser (legacy skuMap)", legacy_ms))
+        print(" " + format_summary("browser (groups only)", current_ms))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+
+from component.trigger_scheduler import TriggerScheduler
+from tool.bench_util import format_summary
+from tool.mock_storefront import MockStorefront
+
+
+def legacy_wait(target_time, stop_event):
+    """従来の ProductController._wait_for_execute と同じ datetime.now() ポーリング"""
+    while not stop_event.is_set():
+        diff = (target_time - datetime.now()).total_seconds()
+        if diff <= 0: return
+        wait_t = 10 if diff > 60 else (1 if diff > 10 else 0.01)
+        if stop_event.wait(wait_t): return
+
+
+def measure_firing(runs, lead_sec):
+    """従来方式と TriggerScheduler の発火誤差(ms)をそれぞれ計測する"""
+    stop = threading.Event()
+    scheduler = TriggerScheduler()
+    legacy, precise = [], []
+    for _ in range(runs):
+        target = datetime.now() + timedelta(seconds=lead_sec)
+        legacy_wait(target, stop)
+        legacy.append((time.time() - target.timestamp()) * 1000)
+
+        target = datetime.now() + timedelta(seconds=lead_sec)
+        precise.append(scheduler.wait_for(target, stop))
+    return legacy, precise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="トリガー発火誤差とサーバー時計差推定の計測")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--lead", type=float, default=1.5, help="各試行の待機秒数")
+    parser.add_argument("--clock-skew", type=float, default=2.345, help="模擬サーバーの時計ずれ(秒)")
+    parser.add_argument("--latency-ms", type=int, default=20)
+    args = parser.parse_args()
+
+    server = MockStorefront(clock_skew=args.clock_skew, latency_ms=args.latency_ms).start()
+    try:
+        scheduler = TriggerScheduler()
+        # 模擬サーバーの遅延はホットパスのみのため、遅延込みで計測できるカートURLを使う
+        est = scheduler.calibrate(server.url("/cart"))
+    finally:
+        server.stop()
+
+    legacy, precise = measure_firing(args.runs, args.lead)
+
+    print("\n" + "=" * 60)
+    if est is not None:
+        print(f" [CLOCK] actual={args.clock_skew * 1000:+.1f}ms  estimated={est * 1000:+.1f}ms  "
+              f"error={(est - args.clock_skew) * 1000:+.1f}ms  (±{scheduler.offset_uncertainty * 1000:.1f}ms)")
+    print(" " + format_summary("legacy polling error", legacy))
+    print(" " + format_summary("monotonic+spin error", precise))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
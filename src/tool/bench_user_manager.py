@@ -0,0 +1,54 @@
+import argparse
+import os
+import tempfile
+import time
+
+from component.user_manager import UserManager
+from tool.bench_util import format_summary
+
+
+def measure_load(config_path, runs, cold):
+    """
+    ログイン時と同じ UserManager(path).load() の所要時間(ms)を計測する。
+    cold=True では毎回鍵キャッシュを破棄し、従来の「呼び出しごとに PBKDF2」を再現する。
+    """
+    samples = []
+    for _ in range(runs):
+        if cold:
+            UserManager.clear_key_cache()
+        start = time.perf_counter()
+        user = UserManager(config_path).load()
+        samples.append((time.perf_counter() - start) * 1000)
+        if not user.get("is_valid"):
+            raise RuntimeError("復号結果が不正です")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ログイン情報の復号コスト (鍵導出キャッシュ有無) の計測")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "user_info.json")
+        UserManager.clear_key_cache()
+        if not UserManager(config_path).save({"rakuten_id": "bench@example.com", "rakuten_pw": "bench-password"}):
+            raise RuntimeError("テスト用ユーザー情報の保存に失敗しました")
+
+        # 暗号化 → 復号の往復で値が一致することを確認する
+        UserManager.clear_key_cache()
+        user = UserManager(config_path).load()
+        assert user["rakuten_id"] == "bench@example.com" and user["rakuten_pw"] == "bench-password"
+
+        cold = measure_load(config_path, args.runs, cold=True)
+        warm = measure_load(config_path, args.runs, cold=False)
+
+    print("\n" + "=" * 60)
+    print(" " + format_summary("load (PBKDF2 every call)", cold))
+    print(" " + format_summary("load (cached key)", warm))
+    print(" 予約時は PurchaseLogic.arm_credentials() で一度だけ復号し、ログイン時は復号しない")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import math
+
+
+def percentile(samples, p):
+    """
+    サンプル列から p パーセンタイル値を線形補間で算出する。
+
+    Args:
+        samples (list): 数値のリスト (ソート不要)
+        p (float): 0～100
+
+    Returns:
+        float: パーセンタイル値 (サンプルが空の場合は None)
+    """
+    if not samples:
+        return None
+    data = sorted(samples)
+    if len(data) == 1:
+        return float(data[0])
+    k = (len(data) - 1) * (p / 100.0)
+    lo = int(math.floor(k))
+    hi = int(math.ceil(k))
+    if lo == hi:
+        return float(data[lo])
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+
+def summarize(samples):
+    """計測値 (ms) を p50/p95/p99 等の統計辞書にまとめる"""
+    if not samples:
+        return {"n": 0}
+    return {
+        "n": len(samples),
+        "min": min(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+        "mean": sum(samples) / len(samples),
+    }
+
+
+def format_summary(label, samples, unit="ms"):
+    """summarize() の結果を1行の表示用文字列に整形する"""
+    s = summarize(samples)
+    if not s["n"]:
+        return f"{label:<24} n=0"
+    return (f"{label:<24} n={s['n']:<4} p50={s['p50']:8.1f}{unit}  p95={s['p95']:8.1f}{unit}  "
+            f"p99={s['p99']:8.1f}{unit}  min={s['min']:8.1f}{unit}  max={s['max']:8.1f}{unit}")
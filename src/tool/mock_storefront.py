@@ -0,0 +1,433 @@
+import argparse
+import hashlib
+import json
+import random
+import socketserver
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+CONGESTION_TEXT = "ただいま大変混み合っております。アクセスが集中しているため、時間をおいて再度お試しください。"
+
+# 混雑・502・遅延のシミュレーション対象 (購入のホットパス)
+# ※ /order はフォーム再送信ダイアログを避けるため対象外
+HOT_PATHS = ("/cart/add", "/cart", "/checkout")
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # Python 3.6 には ThreadingHTTPServer が無いため自前で合成
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class MockStorefront:
+    """
+    楽天の購入導線 (TOP / ログイン / カート追加POST / カート / 購入手続き) を模したローカルサーバー。
+
+    PurchaseLogic をライブサイトなしで計測するためのもの。
+    各リクエストの到達時刻を time.monotonic() でイベントとして記録するため、
+    同一プロセスのベンチマークからトリガー起点のレイテンシを算出できる。
+
+    Args:
+        congestion_rate (float): ホットパスで混雑ページを返す確率
+        error_rate (float): ホットパスで 502 を返す確率
+        latency_ms (int): ホットパスの全応答に加算する遅延
+        slow_rate (float): さらに slow_ms の遅延を加算する確率
+        slow_ms (int): 低速応答時の追加遅延
+        clock_skew (float): Date ヘッダーに加算する時計のずれ (秒)
+        asset_count (int): 各ページに埋め込む画像の数 (0 で画像・フォント・広告タグも無し)
+        asset_kb (int): 画像・フォント1件あたりのサイズ
+        asset_ms (int): 画像・フォント・広告タグの応答遅延
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, congestion_rate=0.0, error_rate=0.0,
+                 latency_ms=0, slow_rate=0.0, slow_ms=1000, clock_skew=0.0, seed=None,
+                 asset_count=0, asset_kb=20, asset_ms=0):
+        self.host = host
+        self.port = port
+        self.congestion_rate = congestion_rate
+        self.error_rate = error_rate
+        self.latency_ms = latency_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.clock_skew = clock_skew
+        self.asset_count = asset_count
+        self.asset_kb = asset_kb
+        self.asset_ms = asset_ms
+        self._rand = random.Random(seed)
+        self._rand_lock = threading.Lock()
+
+        self.sessions = {}
+        self.events = []
+        self._cond = threading.Condition()
+        self._httpd = None
+        self._thread = None
+
+    # --- ライフサイクル ---
+    def start(self):
+        handler = type("_BoundHandler", (_StorefrontHandler,), {"store": self})
+        self._httpd = _ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[MOCK] Storefront listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path):
+        return self.base_url + path
+
+    def common_config(self):
+        """ItemManager の common 形式で各URLを返す"""
+        return {
+            "top_url": self.url("/"),
+            "login_url": self.url("/login"),
+            "post_url": self.url("/cart/add"),
+            "cart_url": self.url("/cart"),
+        }
+
+    # --- イベント記録 ---
+    def record(self, name, **detail):
+        with self._cond:
+            self.events.append({"name": name, "t": time.monotonic(), "detail": detail})
+            self._cond.notify_all()
+
+    def clear_events(self):
+        with self._cond:
+            self.events = []
+
+    def wait_event(self, name, since=0.0, timeout=30.0):
+        """since 以降に記録された最初の name イベントを待つ。タイムアウト時は None"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                for ev in self.events:
+                    if ev["name"] == name and ev["t"] >= since:
+                        return ev
+                remain = deadline - time.monotonic()
+                if remain <= 0:
+                    return None
+                self._cond.wait(remain)
+
+    def count_events(self, name, since=0.0):
+        with self._cond:
+            return sum(1 for ev in self.events if ev["name"] == name and ev["t"] >= since)
+
+    # --- シミュレーション判定 ---
+    def roll(self, rate):
+        if rate <= 0:
+            return False
+        with self._rand_lock:
+            return self._rand.random() < rate
+
+    def simulated_delay(self):
+        delay = self.latency_ms
+        if self.roll(self.slow_rate):
+            delay += self.slow_ms
+        return delay / 1000.0
+
+
+class _StorefrontHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive を有効化
+    store = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def date_time_string(self, timestamp=None):
+        # サーバー時計のずれをシミュレートする
+        if timestamp is None:
+            timestamp = time.time() + self.store.clock_skew
+        return super().date_time_string(timestamp)
+
+    # --- 共通処理 ---
+    def _session(self):
+        raw = self.headers.get("Cookie", "")
+        for part in raw.split(";"):
+            k, _, v = part.strip().partition("=")
+            if k == "mock_session" and v in self.store.sessions:
+                return self.store.sessions[v]
+        return None
+
+    def _read_form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        return parse_qs(body, keep_blank_values=True)
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _redirect(self, location, headers=None):
+        h = {"Location": location}
+        h.update(headers or {})
+        self._send(303, "", headers=h)
+
+    def _page(self, title, body):
+        head, assets = "", ""
+        if self.store.asset_count:
+            # 実サイトの重いページを模した画像・Webフォント・広告タグ・計測ピクセル
+            head = ("<style>@font-face { font-family: MockFont; src: url(/static/font.woff2); }"
+                    " body { font-family: MockFont, sans-serif; }</style>"
+                    "<script src=\"/ads/tag.js\"></script>")
+            assets = "".join(f"<img src=\"/static/img/{i}.png\" width=\"80\" height=\"80\">"
+                             for i in range(self.store.asset_count))
+            assets += "<img src=\"/track/pixel.gif\" width=\"1\" height=\"1\">"
+        return (f"<!DOCTYPE html><html lang=\"ja\"><head><meta charset=\"utf-8\"><title>{title}</title>{head}</head>"
+                f"<body>{body}{assets}</body></html>")
+
+    def _get_asset(self, path):
+        """埋め込みアセット。転送量の計測のため、応答サイズをイベントに記録する"""
+        if path.startswith("/static/img/"):
+            content_type, size = "image/png", self.store.asset_kb * 1024
+        elif path == "/static/font.woff2":
+            content_type, size = "font/woff2", self.store.asset_kb * 1024
+        elif path == "/ads/tag.js":
+            content_type, size = "application/javascript", 4 * 1024
+        else:
+            content_type, size = "image/gif", 43
+        if self.store.asset_ms:
+            time.sleep(self.store.asset_ms / 1000.0)
+        body = b"\0" * size
+        if content_type == "application/javascript":
+            body = b"/* ad */" + b" " * (size - 8)
+        self.store.record("asset", path=path, bytes=size)
+        self._send(200, body, content_type=content_type)
+
+    def _simulate(self, path):
+        """ホットパスなら遅延・502・混雑をシミュレートし、応答済みなら True"""
+        if path not in HOT_PATHS:
+            return False
+        delay = self.store.simulated_delay()
+        if delay:
+            time.sleep(delay)
+        if self.store.roll(self.store.error_rate):
+            self.store.record("http_502", path=path)
+            self._send(502, self._page("502 Bad Gateway", "<h1>502 Bad Gateway</h1>"))
+            return True
+        if self.store.roll(self.store.congestion_rate):
+            self.store.record("congestion", path=path)
+            self._send(200, self._page("混雑中", f"<p>{CONGESTION_TEXT}</p>"))
+            return True
+        return False
+
+    # --- ルーティング ---
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if self._simulate(path):
+            return
+        if path.startswith(("/static/", "/ads/", "/track/")):
+            self._get_asset(path)
+            return
+        if path.startswith("/item/"):
+            self._get_item(path, parse_qs(urlparse(self.path).query))
+            return
+        query = parse_qs(urlparse(self.path).query)
+        route = {
+            "/": self._get_top,
+            "/login": self._get_login,
+            "/cart": self._get_cart,
+            "/checkout": self._get_checkout,
+            "/complete": self._get_complete,
+        }.get(path)
+        if route in (self._get_cart, self._get_checkout):
+            route(query)
+        elif route:
+            route()
+        else:
+            self._send(404, self._page("404", "<h1>Not Found</h1>"))
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if self._simulate(path):
+            return
+        route = {
+            "/login": self._post_login,
+            "/cart/add": self._post_cart_add,
+            "/order": self._post_order,
+        }.get(path)
+        if route:
+            route()
+        else:
+            self._send(404, self._page("404", "<h1>Not Found</h1>"))
+
+    # --- 各ページ ---
+    def _get_top(self):
+        if self._session() is not None:
+            body = ("<header><a class=\"my-rakuten\" href=\"/\">my Rakuten</a>"
+                    "<a class=\"log-out\" href=\"/logout\">ログアウト</a></header><h1>TOP</h1>")
+        else:
+            body = "<header><a href=\"/login\">ログイン</a></header><h1>TOP</h1>"
+        self._send(200, self._page("楽天市場 (Mock)", body))
+
+    def _get_login(self):
+        body = ("<form method=\"post\" action=\"/login\">"
+                "<input type=\"text\" id=\"loginInner_u\" name=\"u\">"
+                "<input type=\"password\" id=\"loginInner_p\" name=\"p\">"
+                "<input type=\"submit\" name=\"submit\" value=\"ログイン\">"
+                "</form>")
+        self._send(200, self._page("ログイン", body))
+
+    def _post_login(self):
+        form = self._read_form()
+        token = uuid.uuid4().hex
+        self.store.sessions[token] = {"user": (form.get("u") or [""])[0], "cart": []}
+        self.store.record("login")
+        self._redirect("/", headers={"Set-Cookie": f"mock_session={token}; Path=/"})
+
+    def _post_cart_add(self):
+        form = self._read_form()
+        session = self._session()
+        line = {k: (v if k.endswith("[]") else v[0]) for k, v in form.items()}
+        if session is not None:
+            session["cart"].append(line)
+        self.store.record("cart_post", logged_in=session is not None, line=line)
+        res = {"resultCode": "success" if session is not None else "not_login"}
+        self._send(200, json.dumps(res), content_type="application/json; charset=utf-8")
+
+    def _get_cart(self, query):
+        """
+        買い物かご。?delay_ms=N で「ご購入手続き」ボタンを N ms 後に JS で描画し、
+        ?filler=K で K 個のダミー商品行 (リンク・ボタン入り) を加えて重いカートページを模す。
+        遅延描画時は、ボタン出現からクリックまでの時間を /checkout?click_ms= で通知する。
+        """
+        session = self._session()
+        lines = session["cart"] if session else []
+        delay_ms = int((query.get("delay_ms") or ["-1"])[0])
+        filler = int((query.get("filler") or ["0"])[0])
+        self.store.record("cart_view", lines=len(lines))
+        rows = "".join(f"<li>{l.get('itemid', '')} x {l.get('units', '')}</li>" for l in lines)
+        rows += "".join(f"<li><a href=\"#i{i}\">おすすめ商品 {i}</a> <span>¥{i * 10}</span>"
+                        f"<button type=\"button\">お気に入り</button></li>" for i in range(filler))
+        if delay_ms < 0:
+            button = "<button type=\"button\" onclick=\"location.href='/checkout'\">ご購入手続き</button>"
+        else:
+            button = ("<div id=\"checkout-area\"></div><script>"
+                      f"setTimeout(function() {{"
+                      "  var b = document.createElement('button'); b.type = 'button';"
+                      "  b.textContent = 'ご購入手続き';"
+                      "  var shown = performance.now();"
+                      "  b.onclick = function() {"
+                      "    location.href = '/checkout?click_ms=' + (performance.now() - shown).toFixed(3);"
+                      "  };"
+                      "  document.getElementById('checkout-area').appendChild(b);"
+                      f"}}, {delay_ms});</script>")
+        body = f"<h1>買い物かご</h1><ul>{rows}</ul>{button}"
+        self._send(200, self._page("買い物かご", body))
+
+    def _get_checkout(self, query):
+        click_ms = (query.get("click_ms") or [None])[0]
+        self.store.record("checkout_view", click_ms=float(click_ms) if click_ms else None)
+        body = ("<h1>ご注文内容の確認</h1>"
+                "<form method=\"post\" action=\"/order\">"
+                "<button type=\"submit\">注文を確定する</button>"
+                "</form>")
+        self._send(200, self._page("ご注文内容の確認", body))
+
+    def _post_order(self):
+        session = self._session()
+        self.store.record("order_confirmed", lines=len(session["cart"]) if session else 0)
+        if session is not None:
+            session["cart"] = []
+        self._redirect("/complete")
+
+    def _get_item(self, path, query):
+        """
+        商品ページ。楽天の商品ページと同じクラス名で SKU ボタン・確認事項セレクトを出力する。
+        ?groups=3x4 で SKU グループごとの選択肢数、?choices=N で確認事項の数、
+        ?dynamic=1 で SKU ボタンを JS で描画する (静的HTMLに含まれない) ページになる。
+        """
+        item_id = path.rsplit("/", 1)[-1] or "100200"
+        sizes = [int(n) for n in (query.get("groups") or ["3x4"])[0].split("x") if n.strip().isdigit()]
+        n_choices = int((query.get("choices") or ["1"])[0])
+        dynamic = (query.get("dynamic") or ["0"])[0] == "1"
+        self.store.record("item_view", item_id=item_id)
+
+        item_data = json.dumps([{"itemId": int(item_id) if item_id.isdigit() else item_id, "shopId": 300400}])
+        sku_html = ""
+        for g, size in enumerate(sizes):
+            btns = "".join(f"<button class=\"type-sku-button--1i7g2\">選択肢{g + 1}-{o + 1}</button>"
+                           for o in range(size))
+            sku_html += (f"<div class=\"padding-bottom-small--Ql3Ez\"><div class=\"layout-inline--QSCjX\">"
+                         f"<span>項目{g + 1}：</span></div>{btns}</div>")
+        choice_html = ""
+        for c in range(n_choices):
+            choice_html += (f"<div class=\"container--3ZLr9\"><div class=\"text-container--3DrET\">確認事項{c + 1}</div>"
+                            f"<select class=\"select--3Nrso\"><option value=\"\">選択してください</option>"
+                            f"<option value=\"1\">了承しました</option><option value=\"2\">了承しません</option>"
+                            f"</select></div>")
+        if dynamic:
+            sku_html = ("<div id=\"sku-root\"></div><script>setTimeout(function() {"
+                        f"document.getElementById('sku-root').outerHTML = {json.dumps(sku_html, ensure_ascii=False)};"
+                        "}, 300);</script>")
+
+        body = (f"<span class=\"normal_reserve_item_name\">模擬商品 {item_id}</span>"
+                f"<div data-item-data='{item_data}'></div>"
+                f"<input type=\"hidden\" name=\"variant\" value=\"compass_sku_{item_id}_1\">"
+                f"{sku_html}{choice_html}")
+        page = self._page(f"模擬商品 {item_id}", body)
+        # 条件付きリクエスト (If-None-Match) に対応する
+        etag = '"' + hashlib.md5(page.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.store.record("item_not_modified", item_id=item_id)
+            self._send(304, "", headers={"ETag": etag})
+            return
+        self._send(200, page, headers={"ETag": etag})
+
+    def _get_complete(self):
+        self._send(200, self._page("注文完了", "<h1>ご注文ありがとうございました</h1>"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ローカル模擬ストアフロントを起動する")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--congestion", type=float, default=0.0, help="混雑ページの発生確率")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="502 の発生確率")
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=int, default=1000)
+    parser.add_argument("--clock-skew", type=float, default=0.0, help="Date ヘッダーの時計ずれ(秒)")
+    parser.add_argument("--assets", type=int, default=0, help="各ページに埋め込む画像の数")
+    parser.add_argument("--asset-kb", type=int, default=20)
+    parser.add_argument("--asset-ms", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockStorefront(port=args.port, congestion_rate=args.congestion, error_rate=args.error_rate,
+                            latency_ms=args.latency_ms, slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+                            clock_skew=args.clock_skew, asset_count=args.assets, asset_kb=args.asset_kb,
+                            asset_ms=args.asset_ms).start()
+    print(json.dumps(server.common_config(), ensure_ascii=False, indent=4))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
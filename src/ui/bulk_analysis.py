@@ -0,0 +1,124 @@
+import tkinter as tk
+from tkinter import ttk
+import threading
+
+from ui.base_sub_dialog import BaseSubDialog
+from ui.spin_box_ex_parts import SpinBoxEx
+from bl.bulk_analysis_logic import BulkAnalysisLogic
+
+
+class BulkAnalysisDialog(BaseSubDialog):
+    """
+    複数の商品URLを並列解析し、完了した順に結果を一覧表示するダイアログ。
+    行をダブルクリックすると on_select(url, data) で呼び出し元へ結果を渡す。
+    """
+
+    def __init__(self, parent, urls=None, debug_mode=True, on_select=None):
+        super().__init__(parent, title="一括解析", size="900x600")
+        self.debug_mode = debug_mode
+        self.on_select = on_select
+        self.results = {}
+        self._stop_event = threading.Event()
+        self._running = False
+        self._total = 0
+
+        self._create_widgets()
+        if urls:
+            self.url_text.insert("1.0", "\n".join(urls))
+
+        self.resizable(True, True)
+        self.update_idletasks()
+        self.minsize(700, 450)
+
+    def _create_widgets(self):
+        # --- A. 下部ボタンエリア ---
+        bottom_f = ttk.Frame(self, padding="15")
+        bottom_f.pack(side="bottom", fill="x")
+        ttk.Separator(bottom_f, orient="horizontal").pack(fill="x", pady=(0, 15))
+        btn_row = ttk.Frame(bottom_f)
+        btn_row.pack(side="right")
+        ttk.Button(btn_row, text="閉じる", width=15, command=self.close_dialog).pack(side="left", padx=5)
+
+        # --- B. URL入力 ---
+        input_f = ttk.LabelFrame(self, text=" 商品URL (1行に1件) ", padding="10")
+        input_f.pack(fill="x", padx=15, pady=(10, 5))
+        self.url_text = tk.Text(input_f, height=8, font=("", 9), wrap="none")
+        self.url_text.pack(fill="x")
+
+        ctrl_row = ttk.Frame(input_f)
+        ctrl_row.pack(fill="x", pady=(8, 0))
+        ttk.Label(ctrl_row, text="並列数:").pack(side="left")
+        self.worker_spin = SpinBoxEx(ctrl_row, 1, BulkAnalysisLogic.MAX_WORKERS)
+        self.worker_spin.set_value(BulkAnalysisLogic.DEFAULT_WORKERS)
+        self.worker_spin.pack(side="left", padx=5)
+        self.start_btn = ttk.Button(ctrl_row, text="一括解析実行", width=15, command=self._on_start)
+        self.start_btn.pack(side="right")
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(ctrl_row, textvariable=self.progress_var, foreground="blue").pack(side="right", padx=10)
+
+        # --- C. 結果一覧 ---
+        result_f = ttk.LabelFrame(self, text=" 解析結果 (ダブルクリックで編集画面に反映) ", padding="10")
+        result_f.pack(fill="both", expand=True, padx=15, pady=5)
+        cols = ("status", "title", "groups", "elapsed", "source", "url")
+        self.tree = ttk.Treeview(result_f, columns=cols, show="headings", height=10)
+        for col, text, width in [("status", "状態", 50), ("title", "商品名", 260), ("groups", "項目数", 60),
+                                 ("elapsed", "所要時間", 80), ("source", "取得方法/エラー", 160), ("url", "URL", 260)]:
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, anchor="center" if col in ("status", "groups", "elapsed") else "w")
+        scroll = ttk.Scrollbar(result_f, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+    def _on_start(self):
+        if self._running: return
+        urls = BulkAnalysisLogic.unique_urls(self.url_text.get("1.0", "end").splitlines())
+        if not urls: return
+
+        for iid in self.tree.get_children(): self.tree.delete(iid)
+        self.results = {}
+        self._total = len(urls)
+        self._running = True
+        self.start_btn.config(state="disabled")
+        self.progress_var.set(f"⏳ 0 / {self._total}")
+
+        logic = BulkAnalysisLogic(debug_mode=self.debug_mode, max_workers=int(self.worker_spin.get_value_str()))
+        threading.Thread(target=self._run_task, args=(logic, urls), daemon=True).start()
+
+    def _run_task(self, logic, urls):
+        # 結果はワーカースレッドから届くため、UI への反映は after でメインスレッドに渡す
+        logic.run(urls, on_result=lambda r: self.after(0, self._on_result, r), stop_event=self._stop_event)
+        self.after(0, self._on_finished)
+
+    def _on_result(self, res):
+        if not self.winfo_exists(): return
+        iid = f"r{res['index']}"
+        self.results[iid] = res
+        data = res["data"] or {}
+        if res["error"] is None:
+            values = ("✅", data.get("common", {}).get("title", ""), len(data.get("groups", [])),
+                      f"{res['elapsed_ms']:.0f}ms", res["source"] or "", res["url"])
+        else:
+            values = ("❌", "", "", f"{res['elapsed_ms']:.0f}ms", res["error"], res["url"])
+        self.tree.insert("", "end", iid=iid, values=values)
+        self.progress_var.set(f"⏳ {len(self.results)} / {self._total}")
+
+    def _on_finished(self):
+        if not self.winfo_exists(): return
+        self._running = False
+        self.start_btn.config(state="normal")
+        ok = sum(1 for r in self.results.values() if r["error"] is None)
+        self.progress_var.set(f"✅ 完了: 成功 {ok} / {self._total}")
+
+    def _on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        res = self.results.get(iid)
+        if not res or res["error"] is not None or not self.on_select: return
+        self.on_select(res["url"], res["data"])
+        self.close_dialog()
+
+    def close_dialog(self):
+        # 実行中なら未着手のURLをキャンセルする (解析用ブラウザは BulkAnalysisLogic 側で終了)
+        self._stop_event.set()
+        super().close_dialog()
@@ -6,8 +6,13 @@ import re
 # インポートパーツ
 from ui.base_sub_dialog import BaseSubDialog
 from ui.toggle_button_parts import ToggleButton
+from ui.post_set_editor_parts import PostSetEditor
 from component.item_manager import ItemManager
+from component.config_store import ConfigStore
+from component.sku_index import SkuIndex
 from bl.item_analysis_logic import ItemAnalysisLogic
+from bl.bulk_analysis_logic import BulkAnalysisLogic
+from ui.bulk_analysis import BulkAnalysisDialog
 
 
 class ItemConfigDialog(BaseSubDialog):
@@ -26,9 +31,9 @@ class ItemConfigDialog(BaseSubDialog):
         self.item_data = self.current_data["items"][0]
 
         # 状態保持用
-        self.post_rows = {}
+        self._adjust_job = None
         self.sku_groups = []
-        self.sku_map = {}
+        self.sku_index = None  # 選択値の組 -> variant ID (SkuIndex)
         self.common_info = {}
         self.selected_vars = {}
         self.wrap_labels = []
@@ -37,7 +42,9 @@ class ItemConfigDialog(BaseSubDialog):
         # 2. UI構築
         self._create_widgets()
 
-        # 3. サイズ調整とリサイズ許可
+        # 3. サイズ調整とリサイズ許可 (登録済みPOSTセットを描画してから測る)
+        self.post_editor.flush()
+        self._cancel_adjust()
         self.adjust_to_content(width=950)
         self.resizable(True, True)
 
@@ -97,6 +104,8 @@ class ItemConfigDialog(BaseSubDialog):
         self.url_entry = ttk.Entry(url_row, textvariable=self.url_var)
         self.url_entry.pack(side="left", fill="x", expand=True, ipady=3)
 
+        self.bulk_btn = ttk.Button(url_row, text="一括解析", width=12, command=self._open_bulk_analysis)
+        self.bulk_btn.pack(side="right")
         self.analyze_btn = ttk.Button(url_row, text="解析実行", width=12, command=self._start_load_thread)
         self.analyze_btn.pack(side="right", padx=5)
 
@@ -112,12 +121,27 @@ class ItemConfigDialog(BaseSubDialog):
         # --- 4. 登録済みPOSTセット ---
         self.kw_main_f = ttk.LabelFrame(self.scroll_f, text=" 登録済みPOSTセット (購入対象) ", padding="10")
         self.kw_main_f.pack(fill="x", pady=5, padx=15)
-        self.kw_list_f = ttk.Frame(self.kw_main_f)
-        self.kw_list_f.pack(fill="x")
+        self.post_editor = PostSetEditor(self.kw_main_f, on_layout=self._schedule_adjust)
+        self.post_editor.pack(fill="x")
 
         for kw in self.item_data.get("required_keywords", []):
             self._add_post_row_from_string(kw)
 
+    def _schedule_adjust(self):
+        """サイズ調整 (スクロール領域全体の再計算) はアイドル時に1回にまとめる"""
+        if self._adjust_job is None:
+            self._adjust_job = self.after_idle(self._run_adjust)
+
+    def _cancel_adjust(self):
+        if self._adjust_job is not None:
+            self.after_cancel(self._adjust_job)
+            self._adjust_job = None
+
+    def _run_adjust(self):
+        self._adjust_job = None
+        if self.winfo_exists():
+            self.adjust_to_content(width=950)
+
     def _toggle_url_lock(self):
         is_edit = self.edit_mode_var.get()
         state = "normal" if is_edit else "readonly"
@@ -128,8 +152,19 @@ class ItemConfigDialog(BaseSubDialog):
         url = self.url_var.get().strip()
         if not url: return
 
+        # キャッシュがあれば即座に表示し、有効期限切れなら裏で再検証する
+        cached, is_fresh = self.logic.get_cached(url)
+        if cached:
+            self._reflect_variants(cached)
+            if is_fresh:
+                self.status_var.set(f"✅ 解析完了 (キャッシュ): {len(self.sku_groups)} 項目")
+            else:
+                self.status_var.set("🕘 キャッシュを表示中（最新情報を確認中）...")
+                threading.Thread(target=self._revalidate_task, args=(url,), daemon=True).start()
+            return
+
         # UIロック：解析中はボタンと入力を無効化
-        self.status_var.set("⏳ 解析中（ヘッドレスブラウザ起動中）...")
+        self.status_var.set("⏳ 解析中...")
         self.analyze_btn.config(state="disabled")
         self.url_entry.config(state="disabled")
 
@@ -137,9 +172,9 @@ class ItemConfigDialog(BaseSubDialog):
 
     def _load_task(self, url):
         try:
-            # 解析実行（ヘッドレス）
+            # 解析実行（静的HTML → 必要時のみヘッドレス）
             data = self.logic.fetch_item_variants(url)
-            # 解析完了後に即座にブラウザを破棄
+            # 解析完了後に即座に解析用ブラウザを破棄
             self.logic.close()
 
             self.after(0, lambda: self._on_load_success(data))
@@ -147,6 +182,39 @@ class ItemConfigDialog(BaseSubDialog):
             self.logic.close()
             self.after(0, lambda e=err: self._on_load_error(e))
 
+    def _revalidate_task(self, url):
+        try:
+            data, changed = self.logic.revalidate(url)
+            self.logic.close()
+            self.after(0, lambda: self._on_revalidated(url, data, changed))
+        except Exception as err:
+            self.logic.close()
+            self.after(0, lambda e=err: self.status_var.set(f"⚠ キャッシュを表示中（更新確認に失敗: {e}）"))
+
+    def _on_revalidated(self, url, data, changed):
+        if not self.winfo_exists(): return
+        # 確認中に別のURLへ切り替えられていれば反映しない
+        if self.url_var.get().strip() != url: return
+        if changed:
+            self._reflect_variants(data)
+            self.status_var.set(f"✅ 最新の内容に更新しました: {len(self.sku_groups)} 項目")
+        else:
+            self.status_var.set(f"✅ 解析完了 (キャッシュは最新です): {len(self.sku_groups)} 項目")
+
+    def _open_bulk_analysis(self):
+        """設定済みの商品URLを初期値として一括解析ダイアログを開く"""
+        urls = [self.url_var.get().strip()] + [i.get("item_url", "") for i in self.current_data.get("items", [])]
+        dialog = BulkAnalysisDialog(self, urls=BulkAnalysisLogic.unique_urls(urls), debug_mode=self.debug_mode,
+                                    on_select=self._on_bulk_selected)
+        self.wait_window(dialog)
+        # 子ダイアログが grab を解放するため取り直す
+        if self.winfo_exists():
+            self.grab_set()
+
+    def _on_bulk_selected(self, url, data):
+        self.url_var.set(url)
+        self._reflect_variants(data)
+
     def _on_load_success(self, data):
         self.analyze_btn.config(state="normal")
         self.url_entry.config(state="normal")
@@ -162,7 +230,7 @@ class ItemConfigDialog(BaseSubDialog):
             child.destroy()
         self.wrap_labels = []
         self.sku_groups = data.get('groups', [])
-        self.sku_map = data.get('skuMap', {})
+        self.sku_index = SkuIndex.from_data(data)
         self.common_info = data.get('common', {})
         self.selected_vars = {}
 
@@ -198,7 +266,7 @@ class ItemConfigDialog(BaseSubDialog):
 
         ttk.Button(self.dynamic_container, text="この構成で登録済みPOSTセットに追加",
                    command=self._add_selected_combination, width=45).pack(pady=15)
-        self.adjust_to_content(width=950)
+        self._schedule_adjust()
         self.status_var.set(f"✅ 解析完了: {len(self.sku_groups)} 項目")
 
     def _create_combo_item(self, parent, group):
@@ -232,11 +300,8 @@ class ItemConfigDialog(BaseSubDialog):
 
         vid = None
         if sku_gs:
-            key = ",".join(sku_vals)
-            sku_info = self.sku_map.get(key)
-            if sku_info:
-                vid = sku_info.get('vid') if isinstance(sku_info, dict) else str(sku_info)
-            else:
+            vid = self.sku_index.vid(sku_vals) if self.sku_index is not None else None
+            if not vid:
                 vid = self.common_info.get('vid')
 
         clean_vid = str(vid) if vid else ""
@@ -248,9 +313,8 @@ class ItemConfigDialog(BaseSubDialog):
         except:
             add_qty = 1
 
-        if row_key in self.post_rows:
-            current_qty = int(self.post_rows[row_key]["qty_var"].get())
-            self.post_rows[row_key]["qty_var"].set(str(current_qty + add_qty))
+        if self.post_editor.has(row_key):
+            self.post_editor.change_qty(row_key, add_qty)
         else:
             item_title = self.common_info.get('title', '単品商品')
             extra_parts = sku_vals + choice_vals
@@ -259,39 +323,9 @@ class ItemConfigDialog(BaseSubDialog):
 
             choices_str = "||".join(choice_pairs)
             post_data = f"{clean_vid}|{choices_str}|{item_id}|{self.common_info.get('shopid', '')}"
-            self._create_post_row_ui(row_key, display_text, post_data, add_qty)
+            self.post_editor.add(row_key, display_text, post_data, add_qty)
 
         self.status_var.set(f"✅ セットを追加しました")
-        self.adjust_to_content(width=950)
-
-    def _create_post_row_ui(self, vid, display_text, post_data, qty):
-        row = ttk.Frame(self.kw_list_f)
-        row.pack(fill="x", pady=2)
-        qty_var = tk.StringVar(value=str(qty))
-        ctrl_f = ttk.Frame(row)
-        ctrl_f.pack(side="right", padx=5)
-        ttk.Button(ctrl_f, text="－", width=3, command=lambda v=vid: self._change_qty(v, -1)).pack(side="left")
-        ttk.Entry(ctrl_f, textvariable=qty_var, width=5, justify="center").pack(side="left", padx=2)
-        ttk.Button(ctrl_f, text="＋", width=3, command=lambda v=vid: self._change_qty(v, 1)).pack(side="left")
-        ttk.Button(ctrl_f, text="×", width=3, command=lambda v=vid: self._remove_row(v)).pack(side="left", padx=5)
-
-        lbl = tk.Label(row, text=display_text, font=("", 9), anchor="w", justify="left", wraplength=700)
-        lbl.pack(side="left", padx=5, fill="x", expand=True)
-        self.wrap_labels.append(lbl)
-        self.post_rows[vid] = {"row_frame": row, "qty_var": qty_var, "display_text": display_text,
-                               "post_data": post_data}
-
-    def _change_qty(self, vid, delta):
-        try:
-            val = int(self.post_rows[vid]["qty_var"].get())
-            self.post_rows[vid]["qty_var"].set(str(max(1, val + delta)))
-        except:
-            pass
-
-    def _remove_row(self, vid):
-        self.post_rows[vid]["row_frame"].destroy()
-        del self.post_rows[vid]
-        self.adjust_to_content(width=950)
 
     def _add_post_row_from_string(self, raw_str):
         if "###" in raw_str:
@@ -299,7 +333,7 @@ class ItemConfigDialog(BaseSubDialog):
             if len(parts) == 3:
                 qty, display, p_data = parts
                 vid_part = p_data.split("|")[0]
-                self._create_post_row_ui(vid_part if vid_part else f"init_{qty}", display, p_data, qty)
+                self.post_editor.add(vid_part if vid_part else f"init_{qty}", display, p_data, qty, reveal=False)
 
     def _save(self):
         self.current_data["common"].update({
@@ -310,9 +344,10 @@ class ItemConfigDialog(BaseSubDialog):
         })
         self.item_data["item_url"] = self.url_var.get().strip()
         self.item_data["required_keywords"] = [
-            f"{r['qty_var'].get()}###{r['display_text']}###{r['post_data']}" for r in self.post_rows.values()
+            f"{r['qty']}###{r['display_text']}###{r['post_data']}" for r in self.post_editor.values()
         ]
-        if self.manager.save(self.current_data):
+        # ストア経由で保存し、メイン画面・購入ロジックへ差分を通知する
+        if ConfigStore.get_instance(self.debug_mode).save(self.current_data):
             messagebox.showinfo("保存", "設定を保存しました。")
             self.close_dialog()
 
@@ -1,12 +1,23 @@
 import tkinter as tk
-from datetime import datetime
+
+from component.log_sink import LogSink
 
 
 class LogWindowParts(tk.Frame):
+    """
+    ログ表示エリア。info/error 等はどのスレッドから呼んでもよい。
+    書き込みは LogSink に積むだけで、表示は after() の周期でまとめて行う。
+    """
+    MAX_LINES = 5000  # 表示を保持する最大行数 (古い行から削除)
+    DRAIN_INTERVAL_MS = 100
+    DRAIN_BATCH = 500
+
     def __init__(self, parent, is_debug_mode=True, **kwargs):
         super().__init__(parent, **kwargs)
         self.is_debug_mode = is_debug_mode
+        self.sink = LogSink.get_instance()
         self._create_widgets()
+        self._drain_job = self.after(self.DRAIN_INTERVAL_MS, self._drain)
 
     def _create_widgets(self):
         font_candidates = ["BIZ UDゴシック", "MS Gothic", "monospace"]
@@ -40,27 +51,51 @@ class LogWindowParts(tk.Frame):
         self.text_area.tag_configure("ERROR", foreground="#ff6b6b")
         self.text_area.tag_configure("INFO", foreground="#51cf66")
 
-    def _write(self, level_name, message, tag):
-        now = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        formatted_msg = f"[{now}] [{level_name}] {message}"
-        print(formatted_msg)
+    def _write(self, level_name, message):
+        self.sink.emit(level_name, message)
+
+    def _drain(self):
+        """溜まったログを1回の insert でまとめて描画し、上限行数を超えた分を削除する"""
+        records, dropped = self.sink.drain(self.DRAIN_BATCH)
+        if records or dropped:
+            # 末尾を表示中の場合のみ追従する (遡って読んでいる間はスクロールさせない)
+            at_bottom = self.text_area.yview()[1] >= 0.999
+            args = []
+            if dropped:
+                args += [f"... {dropped} 行のログを表示から省略しました\n", "WARNING"]
+            for level_name, line in records:
+                args += [line + "\n", level_name]
+            self.text_area.insert("end", *args)
+
+            excess = int(self.text_area.index("end-1c").split(".")[0]) - 1 - self.MAX_LINES
+            if excess > 0:
+                self.text_area.delete("1.0", f"{excess + 1}.0")
+            if at_bottom:
+                self.text_area.see("end")
+
+        # 積み残しがあれば間を置かずに続ける
+        delay = 1 if self.sink.pending_count() else self.DRAIN_INTERVAL_MS
+        self._drain_job = self.after(delay, self._drain)
 
-        self.text_area.insert("end", formatted_msg + "\n", tag)
-        self.text_area.see("end")
+    def destroy(self):
+        if self._drain_job is not None:
+            self.after_cancel(self._drain_job)
+            self._drain_job = None
+        super().destroy()
 
     def debug(self, message):
         if self.is_debug_mode:
-            self._write("DEBUG", message, "DEBUG")
+            self._write("DEBUG", message)
 
     def info(self, message):
-        self._write("INFO", message, "INFO")
+        self._write("INFO", message)
 
     def warning(self, message):
-        self._write("WARNING", message, "WARNING")
+        self._write("WARNING", message)
 
     def error(self, message, code=None):
         msg = f"{message} (Code: {code})" if code else message
-        self._write("ERROR", msg, "ERROR")
+        self._write("ERROR", msg)
 
     def clear(self):
         self.text_area.delete("1.0", "end")
\ No newline at end of file
@@ -0,0 +1,160 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+
+
+class PostSetEditor(ttk.Frame):
+    """
+    登録済みPOSTセットの編集一覧 (数量の －/＋/直接入力 と × による削除)。
+
+    ウィジェットは表示する行数 (最大 MAX_VISIBLE 行) の分だけ作り、
+    スクロールのたびに各行のウィジェットへ表示対象のセットを割り当て直す。
+    追加・削除による再描画は after_idle でまとめて1回だけ行い、
+    表示行数が変わったときだけ on_layout を呼ぶ (ダイアログのサイズ調整用)。
+    """
+    MAX_VISIBLE = 8
+    LABEL_LINES = 2  # 行の高さを揃えるため、表示名は2行分の高さで折り返す
+    WRAP_LENGTH = 700
+
+    def __init__(self, parent, on_layout=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_layout = on_layout
+        self.rows = OrderedDict()  # vid -> {"qty": str, "display_text": str, "post_data": str}
+        self._order = []
+        self._slots = []
+        self._offset = 0
+        self._render_job = None
+        self._binding = False  # 割り当て中は数量欄の変更をデータへ書き戻さない
+
+        self.count_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.count_var, foreground="gray").pack(side="bottom", anchor="e")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.list_f = ttk.Frame(self)
+        self.list_f.pack(side="left", fill="x", expand=True)
+        self._bind_wheel(self.list_f)
+
+    # --- データ操作 ---
+    def has(self, vid):
+        return vid in self.rows
+
+    def add(self, vid, display_text, post_data, qty, reveal=True):
+        """セットを末尾に追加する (同じ vid があれば置き換える)"""
+        if vid not in self.rows:
+            self._order.append(vid)
+        self.rows[vid] = {"qty": str(qty), "display_text": display_text, "post_data": post_data}
+        if reveal:
+            self._offset = max(0, len(self._order) - self.MAX_VISIBLE)
+        self._schedule_render()
+
+    def change_qty(self, vid, delta):
+        row = self.rows.get(vid)
+        if row is None: return
+        try:
+            row["qty"] = str(max(1, int(row["qty"]) + delta))
+        except ValueError:
+            return
+        self._schedule_render()
+
+    def remove(self, vid):
+        if self.rows.pop(vid, None) is None: return
+        self._order.remove(vid)
+        self._schedule_render()
+
+    def values(self):
+        """表示順のセット (辞書) のリスト"""
+        return [self.rows[vid] for vid in self._order]
+
+    # --- 描画 ---
+    def _schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render)
+
+    def flush(self):
+        """保留中の再描画を直ちに行う"""
+        if self._render_job is not None:
+            self.after_cancel(self._render_job)
+        self._render()
+
+    def _render(self):
+        self._render_job = None
+        if not self.winfo_exists(): return
+        visible = min(len(self._order), self.MAX_VISIBLE)
+        self._offset = max(0, min(self._offset, len(self._order) - visible))
+        layout_changed = visible != len(self._slots)
+        while len(self._slots) < visible:
+            self._slots.append(self._create_slot())
+        while len(self._slots) > visible:
+            self._slots.pop()["frame"].destroy()
+
+        self._binding = True
+        try:
+            for i, slot in enumerate(self._slots):
+                vid = self._order[self._offset + i]
+                row = self.rows[vid]
+                slot["vid"] = vid
+                slot["label"].configure(text=row["display_text"])
+                if slot["qty_var"].get() != row["qty"]:
+                    slot["qty_var"].set(row["qty"])
+        finally:
+            self._binding = False
+
+        total = len(self._order)
+        if total > visible:
+            self.scrollbar.pack(side="right", fill="y", before=self.list_f)
+            self.scrollbar.set(self._offset / total, (self._offset + visible) / total)
+            self.count_var.set(f"{self._offset + 1}-{self._offset + visible} / {total} 件")
+        else:
+            self.scrollbar.pack_forget()
+            self.count_var.set(f"{total} 件")
+        if layout_changed and self.on_layout:
+            self.on_layout()
+
+    def _create_slot(self):
+        slot = {"vid": None}
+        row = ttk.Frame(self.list_f)
+        row.pack(fill="x", pady=2)
+        qty_var = tk.StringVar()
+        qty_var.trace_add("write", lambda *args: self._on_qty_edited(slot))
+        ctrl_f = ttk.Frame(row)
+        ctrl_f.pack(side="right", padx=5)
+        ttk.Button(ctrl_f, text="－", width=3, command=lambda: self.change_qty(slot["vid"], -1)).pack(side="left")
+        ttk.Entry(ctrl_f, textvariable=qty_var, width=5, justify="center").pack(side="left", padx=2)
+        ttk.Button(ctrl_f, text="＋", width=3, command=lambda: self.change_qty(slot["vid"], 1)).pack(side="left")
+        ttk.Button(ctrl_f, text="×", width=3, command=lambda: self.remove(slot["vid"])).pack(side="left", padx=5)
+
+        lbl = tk.Label(row, font=("", 9), anchor="w", justify="left", wraplength=self.WRAP_LENGTH,
+                       height=self.LABEL_LINES)
+        lbl.pack(side="left", padx=5, fill="x", expand=True)
+        slot.update({"frame": row, "label": lbl, "qty_var": qty_var})
+        self._bind_wheel(row)
+        return slot
+
+    def _on_qty_edited(self, slot):
+        # 直接入力された数量は検証せずに保持する (保存時の形式は従来どおり)
+        if self._binding or slot["vid"] not in self.rows: return
+        self.rows[slot["vid"]]["qty"] = slot["qty_var"].get()
+
+    # --- スクロール ---
+    def _bind_wheel(self, widget):
+        """一覧上のホイールはダイアログ全体ではなく一覧をスクロールする"""
+        widget.bind("<MouseWheel>", self._on_wheel)
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _on_wheel(self, event):
+        if len(self._order) <= self.MAX_VISIBLE:
+            return None  # 一覧がすべて表示されていればダイアログ側のスクロールに任せる
+        self.scroll(-1 if event.delta > 0 else 1)
+        return "break"
+
+    def scroll(self, rows):
+        self._offset += rows
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * len(self._order))
+        elif args[0] == "scroll":
+            step = self.MAX_VISIBLE if args[2] == "pages" else 1
+            self._offset += int(args[1]) * step
+        self._render()
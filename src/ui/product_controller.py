@@ -8,60 +8,121 @@ from ui.base_main_dialog import BaseMainDialog
 from ui.log_window_parts import LogWindowParts
 from ui.spin_box_ex_parts import SpinBoxEx
 from ui.toggle_button_parts import ToggleButton
+from ui.virtual_tree_parts import VirtualTreeview
 
-# --- 設定画面・マネージャーのインポート ---
-from ui.user_config import UserConfigDialog
-from ui.item_config import ItemConfigDialog
-
-from component.item_manager import ItemManager
-from component.user_manager import UserManager
-from bl.purchase_logic import PurchaseLogic
-
-try:
-    from tkcalendar import DateEntry
-    HAS_TKCALENDAR = True
-except ImportError:
-    HAS_TKCALENDAR = False
+# 設定画面・購入ロジック (selenium / cryptography / tkcalendar を含む) は
+# 起動を速くするため、初めて使う時点で読み込む
+from component.config_store import ConfigStore
+from component.cart_line import CartLine
+from component.cart_line_store import CartLineStore
+from component.job_scheduler import JobScheduler
+from bl.browser_launcher import BrowserLauncher
+from bl.reservation_runner import ReservationRunner
 
 
 class ProductController(BaseMainDialog):
-    def __init__(self, debug_mode=False):
-        temp_root = tk.Tk()
-        temp_root.withdraw()
-        sw = temp_root.winfo_screenwidth()
-        sh = temp_root.winfo_screenheight()
-        temp_root.destroy()
-
-        target_w = int(sw * 2 / 3)
-        target_h = int(sh * 2 / 3)
+    CONFIG_POLL_MS = 2000  # 設定ファイルの更新確認間隔
+    FILTER_DELAY_MS = 150  # 絞り込み入力の反映を待つ時間 (入力中に毎回絞り込まない)
+    BROWSER_STATE_LABELS = {
+        BrowserLauncher.LAUNCHING: ("ブラウザ: 起動中…", "#7f8c8d"),
+        BrowserLauncher.READY: ("ブラウザ: 準備完了", "#2980b9"),
+        BrowserLauncher.LOGGED_IN: ("ブラウザ: ログイン済", "#27ae60"),
+        BrowserLauncher.DEAD: ("ブラウザ: 未起動", "#c0392b"),
+    }
+    JOB_STATUS_LABELS = {JobScheduler.PENDING: "待機中", JobScheduler.RUNNING: "実行中", JobScheduler.DONE: "完了",
+                         JobScheduler.FAILED: "失敗", JobScheduler.CANCELLED: "取消", JobScheduler.MISSED: "時刻超過"}
 
-        super().__init__(title="Product Order Controller", size=f"{target_w}x{target_h}")
+    def __init__(self, debug_mode=False):
+        # 画面サイズは自身の Tk から取得する (一時的な Tk を作らない)
+        super().__init__(title="Product Order Controller", size=None)
+        target_w = int(self.winfo_screenwidth() * 2 / 3)
+        target_h = int(self.winfo_screenheight() * 2 / 3)
+        self.geometry(f"{target_w}x{target_h}")
         self.debug_mode = debug_mode
 
-        # マネージャー初期化
-        self.user_mgr = UserManager()
-        self.item_mgr = ItemManager(debug_mode=self.debug_mode)
-        self.parsed_data_list = self.item_mgr.get_parsed_items()
-        self.logic = PurchaseLogic.get_instance(self.debug_mode)
+        # マネージャー初期化 (UserManager・PurchaseLogic は初回アクセス時に生成)
+        self._user_mgr = None
+        self._has_tkcalendar = False
+        self.line_store = CartLineStore()
+        self._filter_job = None
+        self.config_store = ConfigStore.get_instance(self.debug_mode)
+        self._set_config(self.config_store.snapshot())
+        self.config_store.subscribe(self._on_config_changed)
 
         self._log_visible_var = tk.BooleanVar(value=True)
         self._debug_mode_var = tk.BooleanVar(value=self.debug_mode)
 
-        self._is_reserved = False
-        self._stop_event = threading.Event()
-        self._browser_activated = False
+        self._job_logics = {}  # 予約実行用の PurchaseLogic (モード別、画面の操作とは独立)
 
         self._create_widgets()
         self._set_widgets_state("disabled")
         self._set_default_selection()
 
+        # 購入用ブラウザの準備状態 (起動スレッドからの通知は Tk スレッドで反映する)
+        self.browser = BrowserLauncher(lambda: self.logic, log=self.log_viewer.info,
+                                       on_change=lambda state: self.after(0, self._on_browser_state, state))
+        self._on_browser_state(self.browser.state)
+
+        # 予約ジョブ (保存済みの予約があれば再登録される)
+        self.scheduler = JobScheduler(self._execute_job, on_change=lambda: self.after(0, self._refresh_job_list))
+        self.scheduler.start()
+
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
         self.update_idletasks()
         self.minsize(300, 400)
         self.log_viewer.info("[SYSTEM] Controller Initialized")
 
-        # 起動時に UserManager の is_valid() でチェック
-        self.after(100, self._check_user_config)
+        # 日付入力 (tkcalendar) とユーザー設定の確認 (鍵の導出を含む) は初回描画の後に行う
+        self.after_first_paint(self._create_date_entry)
+        self.after_first_paint(self._check_user_config)
+        self.after_first_paint(self._prelaunch_browser)
+        self.after(self.CONFIG_POLL_MS, self._poll_config)
+
+    def after_first_paint(self, func):
+        """ウィンドウの初回描画 (アイドル時の再描画) が済んだ後に func を実行する"""
+        self.after_idle(lambda: self.after(0, func))
+
+    @property
+    def user_mgr(self):
+        if self._user_mgr is None:
+            from component.user_manager import UserManager
+            self._user_mgr = UserManager()
+        return self._user_mgr
+
+    @property
+    def logic(self):
+        from bl.purchase_logic import PurchaseLogic
+        return PurchaseLogic.get_instance(self.debug_mode)
+
+    def _set_config(self, snapshot):
+        self.config = snapshot
+        self.line_store.load(snapshot)
+
+    def _poll_config(self):
+        """外部で設定ファイルが編集された場合も、更新時刻の確認だけで検知する"""
+        if not self.winfo_exists(): return
+        try: self.config_store.refresh()
+        except Exception as e: self.log_viewer.error(f"設定の確認に失敗: {e}")
+        self.after(self.CONFIG_POLL_MS, self._poll_config)
+
+    def _on_config_changed(self, diff, snapshot):
+        # 任意のスレッドから呼ばれるため、ツリーの更新はメインスレッドで行う
+        self.after(0, self._apply_config_diff, diff, snapshot)
+
+    def _apply_config_diff(self, diff, snapshot):
+        """変更のあった行だけをツリーに反映する"""
+        if snapshot.file_path != self.config.file_path or snapshot.version <= self.config.version: return
+        if snapshot.version != self.config.version + 1:
+            # 通知を取りこぼした場合は差分を当てずに作り直す
+            self._set_config(self.config_store.snapshot())
+            self._fill_treeview(); self._set_default_selection()
+            return
+        self.config = snapshot
+        self.line_store.apply_diff(diff, snapshot)
+        # 一覧は表示範囲の行だけを描き直す
+        self._fill_treeview(changed=set(diff["updated"]))
+        if not self.tree.selection(): self._set_default_selection()
+        self.log_viewer.info(f"[CONFIG] 設定を反映 (追加{len(diff['added'])} / 変更{len(diff['updated'])} / 削除{len(diff['removed'])})")
 
     def _check_user_config(self):
         """UserManager.is_valid() を使用して設定を確認"""
@@ -96,6 +157,8 @@ class ProductController(BaseMainDialog):
         settings_f.pack(side="left")
         ttk.Button(settings_f, text="ユーザー設定", width=15, command=self._on_open_user_config).pack(side="left", padx=2)
         ttk.Button(settings_f, text="商品設定", width=15, command=self._on_open_item_config).pack(side="left", padx=2)
+        self.browser_lbl = tk.Label(toolbar_frame, text="", font=("Meiryo", 9, "bold"))
+        self.browser_lbl.pack(side="left", padx=10)
 
         toggle_f = ttk.Frame(toolbar_frame)
         toggle_f.pack(side="right")
@@ -139,10 +202,19 @@ class ProductController(BaseMainDialog):
         # ② カート操作 & 自動購入
         group2 = ttk.LabelFrame(self.scroll_content, text=" ② カート操作 & 自動購入 ", padding=10)
         group2.pack(fill="both", expand=True)
-        self.tree = ttk.Treeview(group2, columns=("qty", "product", "variation"), show="headings", height=10)
-        self.tree.heading("qty", text="数量"); self.tree.heading("product", text="商品名"); self.tree.heading("variation", text="バリエーション")
-        self.tree.column("qty", width=50, anchor="center", stretch=False)
-        self.tree.pack(fill="both", expand=True, pady=5); self.lock_widgets.append(self.tree)
+        filter_f = ttk.Frame(group2); filter_f.pack(fill="x")
+        ttk.Label(filter_f, text="絞り込み:").pack(side="left")
+        self._filter_var = tk.StringVar()
+        self._filter_var.trace_add("write", lambda *args: self._schedule_filter())
+        ttk.Entry(filter_f, textvariable=self._filter_var).pack(side="left", fill="x", expand=True, padx=5)
+        self.count_lbl = ttk.Label(filter_f, text="")
+        self.count_lbl.pack(side="right")
+
+        self.tree = VirtualTreeview(group2, columns=[("qty", "数量", 50, "center", False),
+                                                     ("product", "商品名", 200, "w", True),
+                                                     ("variation", "バリエーション", 200, "w", True)],
+                                    get_values=self._row_values, height=10)
+        self.tree.pack(fill="both", expand=True, pady=5); self.lock_widgets.append(self.tree.tree)
         self._fill_treeview()
 
         self.btn_post = ttk.Button(group2, text="選択商品をカートに追加(POST)", command=self._on_post_cart)
@@ -152,9 +224,9 @@ class ProductController(BaseMainDialog):
         auto_f.pack(fill="x", pady=5)
         row = ttk.Frame(auto_f); row.pack(fill="x")
         now = datetime.now()
-        if HAS_TKCALENDAR: self.exec_date_ent = DateEntry(row, width=12, date_pattern='yyyy-mm-dd')
-        else: self.exec_date_ent = ttk.Entry(row, width=12); self.exec_date_ent.insert(0, now.strftime("%Y-%m-%d"))
-        self.exec_date_ent.pack(side="left", padx=5)
+        # 日付入力は _create_date_entry で初回描画後に作成する
+        self.exec_date_ent = None
+        self._date_f = ttk.Frame(row); self._date_f.pack(side="left", padx=5)
 
         self.hour_spin = SpinBoxEx(row, 0, 23); self.hour_spin.set_value(now.hour); self.hour_spin.pack(side="left")
         self.min_spin = SpinBoxEx(row, 0, 59); self.min_spin.set_value(now.minute); self.min_spin.pack(side="left")
@@ -167,101 +239,143 @@ class ProductController(BaseMainDialog):
         self.instant_btn.pack(side="left", fill="x", expand=True)
         self.lock_widgets.extend([self.reserve_btn, self.instant_btn])
 
+        job_f = ttk.Frame(auto_f); job_f.pack(fill="x", pady=(10, 0))
+        self.job_tree = ttk.Treeview(job_f, columns=("target", "mode", "lines", "status"), show="headings", height=4)
+        for col, text, width in (("target", "実行時刻", 140), ("mode", "モード", 60), ("lines", "件数", 50), ("status", "状態", 80)):
+            self.job_tree.heading(col, text=text); self.job_tree.column(col, width=width, anchor="center")
+        self.job_tree.pack(fill="x")
+        job_btn_f = ttk.Frame(job_f); job_btn_f.pack(fill="x", pady=(5, 0))
+        ttk.Button(job_btn_f, text="選択した予約を取消", command=self._on_cancel_job).pack(side="left", fill="x", expand=True)
+        ttk.Button(job_btn_f, text="終了済みを消去", command=lambda: self.scheduler.clear_finished()).pack(side="left", fill="x", expand=True)
+
         self.right_f = ttk.LabelFrame(self.main_paned, text=" ③ 実行ログ ", padding=10)
         self.main_paned.add(self.right_f, weight=2)
         self.log_viewer = LogWindowParts(self.right_f, is_debug_mode=self.debug_mode)
         self.log_viewer.pack(fill="both", expand=True)
 
+    def _create_date_entry(self):
+        try:
+            from tkcalendar import DateEntry
+            self._has_tkcalendar = True
+        except ImportError:
+            self._has_tkcalendar = False
+        if self._has_tkcalendar: self.exec_date_ent = DateEntry(self._date_f, width=12, date_pattern='yyyy-mm-dd')
+        else: self.exec_date_ent = ttk.Entry(self._date_f, width=12); self.exec_date_ent.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        self.exec_date_ent.pack(side="left")
+
     def _set_widgets_state(self, state):
         for w in self.lock_widgets:
-            if isinstance(w, ttk.Treeview): w.configure(selectmode="none" if state == "disabled" else "browse")
+            if isinstance(w, ttk.Treeview): w.configure(selectmode="none" if state == "disabled" else "extended")
             else: w.configure(state=state)
 
-    def _check_actual_browser_alive(self):
-        from component.chrome_driver_manager import ChromeDriverManager
-        driver = ChromeDriverManager._instance
-        if driver is None: return False
-        try: return bool(driver.title)
-        except: return False
+    def _prelaunch_browser(self):
+        """起動直後に購入用ブラウザをバックグラウンドで立ち上げ、TOPページを開いておく"""
+        url = self.config.common.get("top_url")
+        if url: self.browser.launch(url)
+        else: self.log_viewer.info("[SYSTEM] top_url が未設定のため、ブラウザの事前起動を省略します。")
+
+    def _on_browser_state(self, state):
+        """ブラウザの準備状態に合わせて操作可否と表示を切り替える"""
+        if not self.winfo_exists(): return
+        text, color = self.BROWSER_STATE_LABELS[state]
+        self.browser_lbl.configure(text=text, fg=color)
+        self.btn_top.configure(state="disabled" if state == BrowserLauncher.LAUNCHING else "normal")
+        self._set_widgets_state("normal" if self.browser.is_usable() else "disabled")
+        if state == BrowserLauncher.DEAD:
+            self.log_viewer.info("[SYSTEM] Browser closed or reset. Please push 'TOP' button.")
 
     def sync_browser_state(self):
-        if self._check_actual_browser_alive():
-            self._browser_activated = True
-            self._set_widgets_state("normal")
-        else:
-            self._browser_activated = False
-            self._set_widgets_state("disabled")
-            self.log_viewer.info("[SYSTEM] Browser closed or reset. Please push 'TOP' button.")
+        self.browser.refresh()
 
     def _check_browser_ready(self):
-        if not self._check_browser_ready_flag(): return False
-        if not self._check_actual_browser_alive():
-            self.sync_browser_state()
+        if self.browser.state == BrowserLauncher.LAUNCHING:
+            messagebox.showinfo("案内", "ブラウザを起動中です。しばらくお待ちください。")
+            return False
+        if self.browser.refresh() == BrowserLauncher.DEAD:
+            messagebox.showinfo("案内", "「ページ管理」より「TOPページへ移動」を押下してください。")
             return False
-        return True
-
-    def _check_browser_ready_flag(self):
-        if not self._browser_activated:
-            res = messagebox.askyesno("確認", "ブラウザは起動済ですか？")
-            if res:
-                self._browser_activated = True
-                self._set_widgets_state("normal")
-                return True
-            else:
-                messagebox.showinfo("案内", "「ページ管理」より「TOPページへ移動」を押下してください。")
-                return False
         return True
 
     def _on_go_top(self):
         if not self._check_user_config(): return
-        url = self.item_mgr.item_data.get("common", {}).get("top_url")
+        url = self.config.common.get("top_url")
         if url:
-            self.logic.navigate_to(url)
-            self._browser_activated = True
-            self._set_widgets_state("normal")
-            self.log_viewer.info("[SYSTEM] Browser Activated.")
+            # 起動・遷移はバックグラウンドで行い、完了すると _on_browser_state で操作可能になる
+            self.browser.launch(url)
 
     def _on_scheduled_exec(self):
-        if self._is_reserved:
-            self._stop_event.set(); self._is_reserved = False; self._update_reserve_ui()
-            self.log_viewer.info("[CANCEL] 予約キャンセル。")
-            return
         if not self._check_user_config(): return
         if not self._check_browser_ready(): return
         try:
-            date_str = self.exec_date_ent.get_date().strftime("%Y-%m-%d") if HAS_TKCALENDAR else self.exec_date_ent.get()
+            date_str = self.exec_date_ent.get_date().strftime("%Y-%m-%d") if self._has_tkcalendar else self.exec_date_ent.get()
             h, m, s = self.hour_spin.get_value_str(), self.min_spin.get_value_str(), self.sec_spin.get_value_str()
             target_time = datetime.strptime(f"{date_str} {h}:{m}:{s}", "%Y-%m-%d %H:%M:%S")
         except Exception as e:
             messagebox.showerror("エラー", f"日時不正: {e}"); return
         diff = (target_time - datetime.now()).total_seconds()
         if diff <= 0: messagebox.showwarning("警告", "過去の時間は指定できません"); return
-        self._is_reserved = True; self._stop_event.clear(); self._update_reserve_ui()
-        self.log_viewer.info(f"[SCHEDULE] {target_time.strftime('%H:%M:%S')} 予約完了")
-        threading.Thread(target=self._wait_for_execute, args=(target_time,), daemon=True).start()
+        lines = self._get_selected_lines()
+        if not lines: messagebox.showwarning("警告", "購入対象の商品を選択してください"); return
+        # 予約時点の設定を固定して渡す (再起動後に再登録されたジョブはその時点の設定を使う)
+        try:
+            job = self.scheduler.add(target_time, lines, self.debug_mode, context=self.config)
+        except ValueError as e:
+            # 同じブラウザを使う予約同士は実行期間を重ねられない (同時刻の商品は1件の予約にまとめる)
+            messagebox.showwarning("警告", f"{e}\n同じ時刻に購入する商品は、まとめて選択して1件の予約にしてください。"); return
+        self.log_viewer.info(f"[SCHEDULE] {target_time.strftime('%m/%d %H:%M:%S')} 予約完了 ({len(lines)}件, ID {job['id']})")
 
     def _on_instant_exec(self):
         if not self._check_user_config(): return
         if not self._check_browser_ready(): return
-        threading.Thread(target=lambda: (self._on_post_cart(), self.logic.go_to_checkout()), daemon=True).start()
-
-    def _wait_for_execute(self, target_time):
-        while not self._stop_event.is_set():
-            diff = (target_time - datetime.now()).total_seconds()
-            if diff <= 0: self.after(0, self._on_execute_trigger); return
-            wait_t = 10 if diff > 60 else (1 if diff > 10 else 0.01)
-            if self._stop_event.wait(wait_t): return
-
-    def _on_execute_trigger(self):
-        self._is_reserved = False; self._update_reserve_ui()
-        self.log_viewer.info("[START] 予約時間です。")
-        self._on_instant_exec()
-
-    def _update_reserve_ui(self):
-        self.reserve_btn.configure(text="予約キャンセル (待機中)" if self._is_reserved else "指定時間実行予約")
+        lines = self._get_selected_lines()
+        threading.Thread(target=self._instant_task, args=(lines,), daemon=True).start()
+
+    def _runner(self):
+        return ReservationRunner(self.logic, self.log_viewer)
+
+    def _instant_task(self, lines):
+        self._runner().run_now(lines)
+
+    def _job_logic(self, debug_mode):
+        # 画面のモード切替や操作と干渉しないよう、予約実行には専用のインスタンスを使う
+        if debug_mode not in self._job_logics:
+            from bl.purchase_logic import PurchaseLogic
+            self._job_logics[debug_mode] = PurchaseLogic(debug_mode=debug_mode)
+        return self._job_logics[debug_mode]
+
+    def _execute_job(self, job, snapshot, stop_event):
+        """JobScheduler の実行スレッドから呼ばれる。Tk のイベントループを経由せずにそのまま実行する"""
+        target_time = datetime.strptime(job["target"], JobScheduler.DATETIME_FORMAT)
+        if snapshot is None:
+            snapshot = ConfigStore.get_instance(job["debug_mode"]).snapshot()
+        lines = []
+        for saved in job["lines"]:
+            try: lines.append(CartLine.parse(saved["raw"], line_id=saved["id"]))
+            except ValueError as e: self.log_viewer.warning(f"[SCHEDULE] 不正な購入対象のためスキップします: {e}")
+        self.log_viewer.info(f"[SCHEDULE] 予約 {job['id']} ({job['target']}) の準備を開始します")
+        results = ReservationRunner(self._job_logic(job["debug_mode"]), self.log_viewer).run(target_time, lines, stop_event, snapshot)
+        if results is None: return False
+        if ReservationRunner.all_ok(results): self.log_viewer.info(f"[START] 予約 {job['id']} の実行を完了しました。")
+        else: self.log_viewer.warning(f"[START] 予約 {job['id']} はPOSTに失敗した行があります。")
+        return ReservationRunner.all_ok(results)
+
+    def _refresh_job_list(self):
+        if not self.winfo_exists(): return
+        selected = set(self.job_tree.selection())
+        self.job_tree.delete(*self.job_tree.get_children())
+        for job in self.scheduler.jobs():
+            self.job_tree.insert("", "end", iid=job["id"], values=(
+                job["target"], "テスト" if job["debug_mode"] else "本番", len(job["lines"]),
+                self.JOB_STATUS_LABELS.get(job["status"], job["status"])))
+        self.job_tree.selection_set([iid for iid in selected if self.job_tree.exists(iid)])
+
+    def _on_cancel_job(self):
+        for job_id in self.job_tree.selection():
+            if self.scheduler.cancel(job_id): self.log_viewer.info(f"[CANCEL] 予約 {job_id} を取り消しました。")
 
     def _on_open_item_config(self):
-        dialog = ItemConfigDialog(self)
+        from ui.item_config import ItemConfigDialog
+        dialog = ItemConfigDialog(self, debug_mode=self.debug_mode)
         self.wait_window(dialog)
         self.reload_item_list()
         self.sync_browser_state()
@@ -269,37 +383,60 @@ class ProductController(BaseMainDialog):
         self._bind_mouse_wheel()
 
     def reload_item_list(self):
+        # 変更があれば購読経由で差分のみ反映される
         try:
-            self.item_mgr.load()
-            self.parsed_data_list = self.item_mgr.get_parsed_items()
-            self._fill_treeview()
-            self._set_default_selection()
-            self.log_viewer.info("Reloaded.")
+            if self.config_store.refresh() is None: self.log_viewer.info("Reloaded. (変更なし)")
         except Exception as e: self.log_viewer.error(f"Reload failed: {e}")
 
     def _update_debug_mode(self):
         self.debug_mode = self._debug_mode_var.get(); self._update_banner_style()
-        self.logic.debug_mode = self.debug_mode; self.item_mgr.debug_mode = self.debug_mode
+        # 購入ロジックは次に使う時点で get_instance がモードを切り替える (未使用なら読み込まない)
+        # モードごとに設定ファイルが異なるため、購読先を切り替えて一覧を作り直す
+        self.config_store.unsubscribe(self._on_config_changed)
+        self.config_store = ConfigStore.get_instance(self.debug_mode)
+        self.config_store.subscribe(self._on_config_changed)
+        self._set_config(self.config_store.snapshot())
+        self._fill_treeview(); self._set_default_selection()
         self.log_viewer.is_debug_mode = self.debug_mode
         self.log_viewer.info(f"Mode: {'DEBUG' if self.debug_mode else 'PROD'}")
+        # モードごとにブラウザ (プロファイル) が異なるため、切替先の起動状態を反映する
+        self.sync_browser_state()
 
     def _update_banner_style(self):
         color = "#2980b9" if self.debug_mode else "#c0392b"
         self.banner.configure(bg=color, text=f"【{'テストモード' if self.debug_mode else '本番モード'}】自動購入は{'決済前まで' if self.debug_mode else '決済まで'}実施します")
 
-    def _fill_treeview(self):
-        for item in self.tree.get_children(): self.tree.delete(item)
-        for d in self.parsed_data_list:
-            var_display = " / ".join(d["variation_labels"])
-            self.tree.insert("", "end", iid=d["id"], values=(d["quantity"], d["product_name"], var_display))
+    def _fill_treeview(self, changed=None):
+        self.tree.set_ids(self.line_store.visible_ids(), changed=changed)
+        shown, total = len(self.line_store.visible_ids()), len(self.line_store)
+        self.count_lbl.configure(text=f"{shown} / {total} 件" if self.line_store.filter_active else f"{total} 件")
+
+    def _row_values(self, iid):
+        d = self.line_store.get(iid)
+        return (d["quantity"], d["product_name"], " / ".join(d["variation_labels"]))
+
+    def _schedule_filter(self):
+        if self._filter_job is not None: self.after_cancel(self._filter_job)
+        self._filter_job = self.after(self.FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        if self.line_store.set_filter(self._filter_var.get()):
+            self._fill_treeview()
 
     def _on_login(self):
         if not self._check_user_config(): return
-        threading.Thread(target=lambda: (self.log_viewer.info("ログイン成功") if self.logic.execute_login() else self.log_viewer.error("ログイン失敗")), daemon=True).start()
+        threading.Thread(target=self._login_task, daemon=True).start()
+
+    def _login_task(self):
+        ok = self.logic.execute_login()
+        self.browser.set_logged_in(ok)
+        if ok: self.log_viewer.info("ログイン成功")
+        else: self.log_viewer.error("ログイン失敗")
 
     def _on_go_product(self):
         if not self._check_user_config(): return
-        items = self.item_mgr.item_data.get("items", [])
+        items = self.config.items
         if items: self.logic.navigate_to(items[0].get("item_url"))
 
     def _on_go_cart(self):
@@ -312,13 +449,21 @@ class ProductController(BaseMainDialog):
 
     def _on_post_cart(self):
         if not self._check_user_config(): return
-        selected = self.tree.selection()
-        if not selected: return
-        def _exec():
-            for sid in selected:
-                target = next((d for d in self.parsed_data_list if d["id"] == sid), None)
-                if target and self.logic.execute_cart_post(target["raw"]): self.log_viewer.info(f"POST成功: {target['product_name']}")
-        threading.Thread(target=_exec, daemon=True).start()
+        lines = self._get_selected_lines()
+        if not lines: return
+        threading.Thread(target=self._post_lines, args=(lines,), daemon=True).start()
+
+    def _get_selected_lines(self):
+        """ツリーで選択中の行を CartLine として取得する (UIスレッドで呼ぶこと)"""
+        lines = []
+        for sid in self.line_store.sort_by_position(self.tree.selection()):
+            line = self.line_store.line(sid)
+            if line: lines.append(line)
+            else: self.log_viewer.warning(f"不正な購入対象のためスキップします: {sid}")
+        return lines
+
+    def _post_lines(self, lines):
+        self._runner().post_lines(lines)
 
     def _toggle_log(self):
         ch = self.winfo_height()
@@ -338,6 +483,7 @@ class ProductController(BaseMainDialog):
 
     def _on_open_user_config(self):
         """ユーザー設定画面を開き、閉じるのを待ってからデータを再ロードする"""
+        from ui.user_config import UserConfigDialog
         dialog = UserConfigDialog(self)
 
         # ダイアログが閉じられるまで、ここで処理をブロック（待機）させる
@@ -354,12 +500,17 @@ class ProductController(BaseMainDialog):
         self._bind_mouse_wheel()
 
     def _set_default_selection(self):
-        children = self.tree.get_children()
-        if children: self.tree.selection_set(children[0])
+        ids = self.line_store.visible_ids()
+        if ids: self.tree.selection_set([ids[0]])
 
     def _on_closing(self):
         from component.chrome_driver_manager import ChromeDriverManager
-        self._stop_event.set(); ChromeDriverManager.quit_driver(); self.destroy()
+        self.config_store.unsubscribe(self._on_config_changed)
+        self.browser.close()
+        self.scheduler.stop()
+        for logic in self._job_logics.values():
+            logic.close()
+        ChromeDriverManager.quit_driver(); self.destroy()
 
 if __name__ == "__main__":
     app = ProductController(debug_mode=True)
@@ -0,0 +1,143 @@
+from tkinter import ttk
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    表示範囲の行だけを Treeview に描画する一覧 (数千行でも描画・スクロールが重くならない)。
+
+    行の実体は呼び出し側が持ち、set_ids() で表示順の行ID、get_values(行ID) で表示値を渡す。
+    スクロールバーは全行数を基準に自前で制御し、スクロールのたびに表示範囲の行を差し替える。
+    選択状態は行ID の集合として保持するため、表示範囲外に出た行の選択も失われない。
+    """
+    DEFAULT_ROW_HEIGHT = 20
+    HEADER_HEIGHT = 25
+    WHEEL_ROWS = 3
+
+    def __init__(self, parent, columns, get_values, height=10, on_select=None, **kwargs):
+        """
+        Args:
+            columns (list): [(列名, 見出し, 幅, anchor, stretch), ...]
+            get_values (callable): 行ID から表示値のタプルを返す関数
+        """
+        super().__init__(parent, **kwargs)
+        self.get_values = get_values
+        self.on_select = on_select
+        self._ids = []
+        self._selected = set()
+        self._offset = 0
+        self._page = height
+        self._rendered = []  # 現在 Treeview に描画している行ID
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in columns], show="headings", height=height)
+        for name, text, width, anchor, stretch in columns:
+            self.tree.heading(name, text=text)
+            self.tree.column(name, width=width, anchor=anchor, stretch=stretch)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        style_height = ttk.Style().lookup("Treeview", "rowheight")
+        self._row_height = int(style_height) if style_height else self.DEFAULT_ROW_HEIGHT
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-self.WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(self.WHEEL_ROWS))
+
+    # --- データ ---
+    def set_ids(self, ids, changed=None):
+        """
+        表示順の行ID を設定する。一覧から消えた行の選択は解除する。
+        changed には値が変わった行ID を渡す (表示範囲にあれば描き直す)。
+        """
+        self._ids = ids
+        present = set(ids) if self._selected else ()
+        self._selected = {iid for iid in self._selected if iid in present}
+        self._clamp_offset()
+        self.refresh(changed)
+
+    def refresh(self, changed=None):
+        """
+        表示範囲を描き直す。changed (行ID の集合) を渡すと、表示範囲にある行はその行の値も更新する。
+        """
+        window = self._ids[self._offset:self._offset + self._page]
+        if window != self._rendered:
+            self.tree.delete(*self._rendered)
+            for iid in window:
+                self.tree.insert("", "end", iid=iid, values=self.get_values(iid))
+            self._rendered = list(window)
+        elif changed:
+            for iid in window:
+                if iid in changed:
+                    self.tree.item(iid, values=self.get_values(iid))
+        self._sync_selection()
+        self._update_scrollbar()
+
+    # --- 選択 ---
+    def selection(self):
+        """選択中の行ID (順不同)"""
+        return set(self._selected)
+
+    def selection_set(self, ids):
+        self._selected = set(ids)
+        self._sync_selection()
+
+    def _sync_selection(self):
+        visible = [iid for iid in self._rendered if iid in self._selected]
+        if set(self.tree.selection()) != set(visible):
+            self.tree.selection_set(visible)
+
+    def _on_tree_select(self, event):
+        # 表示範囲内の選択だけを Treeview の状態で置き換える
+        current = set(self.tree.selection())
+        self._selected = (self._selected - set(self._rendered)) | current
+        if self.on_select:
+            self.on_select()
+
+    # --- スクロール ---
+    def _clamp_offset(self):
+        self._offset = max(0, min(self._offset, len(self._ids) - self._page))
+
+    def scroll(self, rows):
+        self._offset += rows
+        self._clamp_offset()
+        self.refresh()
+
+    def see(self, iid):
+        """行が表示範囲に入るようにスクロールする"""
+        try:
+            index = self._ids.index(iid)
+        except ValueError:
+            return
+        if index < self._offset or index >= self._offset + self._page:
+            self._offset = index
+            self._clamp_offset()
+            self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * len(self._ids))
+        elif args[0] == "scroll":
+            step = self._page if args[2] == "pages" else 1
+            self._offset += int(args[1]) * step
+        self._clamp_offset()
+        self.refresh()
+
+    def _on_wheel(self, event):
+        self.scroll(-self.WHEEL_ROWS if event.delta > 0 else self.WHEEL_ROWS)
+        return "break"
+
+    def _on_configure(self, event):
+        page = max(1, (event.height - self.HEADER_HEIGHT) // self._row_height)
+        if page != self._page:
+            self._page = page
+            self._clamp_offset()
+            self.refresh()
+
+    def _update_scrollbar(self):
+        total = len(self._ids)
+        if total <= self._page:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, (self._offset + self._page) / total)
@@ -0,0 +1,147 @@
+import pytest
+
+from bl.purchase_logic import PurchaseLogic
+from component.cart_line import CartLine
+from component.chrome_driver_manager import ChromeDriverManager
+from component.http_client_manager import HttpClientManager
+from tool.mock_storefront import MockStorefront
+
+LINE = CartLine.parse("1###テスト商品 (ブラック)###compass_sku_100200_1|確認事項:了承しました|100200|300400",
+                      line_id="item_0_k0")
+
+
+class FakeDriver:
+    """Cookie の取り込みに必要な分だけを持つドライバー"""
+
+    def __init__(self, session_id, cookies, url="http://127.0.0.1/"):
+        self.session_id = session_id
+        self._cookies = cookies
+        self.current_url = url
+
+    def get_cookies(self):
+        return list(self._cookies)
+
+    def execute_script(self, script, *args):
+        return "FakeDriver/1.0"
+
+    # Selenium 経由の一括POST (結果だけを返す)
+    def set_script_timeout(self, sec):
+        pass
+
+    def execute_async_script(self, script, post_url, payloads):
+        self.posted = payloads
+        return [{"ok": True, "attempts": 1, "elapsed_ms": 1.0, "error": None, "tries": []} for _ in payloads]
+
+
+@pytest.fixture
+def server():
+    server = MockStorefront().start()
+    yield server
+    server.stop()
+    HttpClientManager.reset()
+
+
+@pytest.fixture
+def logic(server):
+    logic = PurchaseLogic(debug_mode=True, transport=PurchaseLogic.TRANSPORT_HTTP)
+    logic.common = server.common_config()
+    yield logic
+    logic.close()
+
+
+def login(server, token="token-1"):
+    """模擬サイトにセッションを作り、そのセッション Cookie を持つドライバーを返す"""
+    server.sessions[token] = {"user": "tester", "cart": []}
+    return FakeDriver(token, [{"name": "mock_session", "value": token, "path": "/", "domain": server.host}])
+
+
+@pytest.mark.parametrize("status, body, expected", [
+    (200, b'{"resultCode": "success"}', (True, None, False)),
+    (200, b'{"resultCode": "not_login"}', (False, "resultCode not_login", True)),
+    (200, b'{"resultCode": "soldout"}', (False, "resultCode soldout", False)),
+    (200, b"<html>ok</html>", (True, None, False)),
+    (302, b"", (False, "HTTP 302", True)),
+    (404, b"", (False, "HTTP 404", False)),
+])
+def test_judge_cart_response(status, body, expected):
+    assert PurchaseLogic._judge_cart_response(status, body) == expected
+
+
+def test_http_post_without_session_is_not_success(server, logic):
+    res = logic._post_via_http(logic.common["post_url"], LINE.body, LINE.item_id)
+
+    assert res["ok"] is False
+    assert res["status"] == 200
+    assert res["error"] == "resultCode not_login"
+    # 未ログインは経路の障害として Selenium 経由の再送に回す
+    assert res["transport_failed"] is True
+    assert server.sessions == {}
+
+
+def use_driver(monkeypatch, logic, driver):
+    """購入用ブラウザとして driver を使わせる"""
+    monkeypatch.setattr(logic, "get_driver", lambda: driver)
+    monkeypatch.setattr(ChromeDriverManager, "peek_driver", classmethod(lambda cls, *a, **k: driver))
+
+
+def test_http_post_with_session_adds_to_cart(server, logic):
+    driver = login(server)
+    HttpClientManager.sync_from_driver(driver)
+
+    res = logic._post_via_http(logic.common["post_url"], LINE.body, LINE.item_id, driver.session_id)
+
+    assert res["ok"] is True
+    assert res["transport_failed"] is False
+    assert len(server.sessions["token-1"]["cart"]) == 1
+
+
+def test_sessions_are_kept_per_driver(server):
+    debug, production = login(server, "debug"), login(server, "production")
+    HttpClientManager.sync_from_driver(debug)
+    HttpClientManager.sync_from_driver(production)
+    url = server.url("/cart/add")
+
+    assert HttpClientManager.build_headers(url, session="debug")["Cookie"] == "mock_session=debug"
+    assert HttpClientManager.build_headers(url, session="production")["Cookie"] == "mock_session=production"
+    assert "Cookie" not in HttpClientManager.build_headers(url)
+
+    HttpClientManager.reset("debug")
+    assert "Cookie" not in HttpClientManager.build_headers(url, session="debug")
+    assert HttpClientManager.build_headers(url, session="production")["Cookie"] == "mock_session=production"
+
+
+def test_batch_falls_back_to_browser_when_no_cookies(server, logic, monkeypatch):
+    driver = FakeDriver("no-cookies", [])
+    use_driver(monkeypatch, logic, driver)
+
+    results = logic.execute_cart_post_batch([LINE])
+
+    assert results[0]["ok"] is True
+    assert results[0]["transport"] == PurchaseLogic.TRANSPORT_SELENIUM
+    assert driver.posted == [LINE.payload]
+    assert server.count_events("cart_post") == 0
+
+
+def test_batch_resyncs_when_browser_was_restarted(server, logic, monkeypatch):
+    stale = login(server, "stale")
+    use_driver(monkeypatch, logic, stale)
+    assert logic.prepare_http_transport(warm=False)
+    # ブラウザが再起動され、別のセッションになった
+    del server.sessions["stale"]
+    use_driver(monkeypatch, logic, login(server, "fresh"))
+
+    results = logic.execute_cart_post_batch([LINE])
+
+    assert results[0]["ok"] is True
+    assert results[0]["transport"] == PurchaseLogic.TRANSPORT_HTTP
+    assert len(server.sessions["fresh"]["cart"]) == 1
+
+
+def test_release_drops_the_synced_session(server, logic, monkeypatch):
+    driver = login(server)
+    use_driver(monkeypatch, logic, driver)
+    logic.prepare_http_transport(warm=False)
+
+    logic.release_http_transport()
+
+    assert "Cookie" not in HttpClientManager.build_headers(server.url("/cart/add"), session=driver.session_id)
@@ -0,0 +1,48 @@
+import pytest
+
+from component.config_store import ConfigStore
+
+RAW = "1###テスト商品 (ブラック)###compass_sku_100200_1|確認事項:了承しました|100200|300400"
+
+
+def make_data(*keywords):
+    return {"common": {"top_url": "https://example.test/", "login_url": "https://example.test/login",
+                       "post_url": "https://example.test/cart/add", "cart_url": "https://example.test/cart"},
+            "items": [{"item_url": "https://example.test/item/100200", "required_keywords": list(keywords),
+                       "actions": []}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConfigStore(debug_mode=True)
+    # 実際の conf/ ではなく一時ディレクトリのファイルを読み書きさせる
+    store.manager.conf_dir = str(tmp_path / "conf")
+    store.manager.file_path = str(tmp_path / "conf" / "item_info_debug.json")
+    store.refresh(force=True)
+    return store
+
+
+def test_save_publishes_new_snapshot(store):
+    before = store.snapshot()
+    assert store.save(make_data(RAW)) is True
+
+    after = store.snapshot()
+    assert after is not before
+    assert after.version > before.version
+    assert list(after.cart_lines) == ["item_0_k0"]
+    assert after.cart_lines["item_0_k0"].variant_id == "compass_sku_100200_1"
+    assert store.is_valid()
+
+
+def test_save_notifies_subscribers(store):
+    store.save(make_data(RAW))
+    received = []
+    store.subscribe(lambda diff, snapshot: received.append((diff, snapshot)))
+
+    assert store.save(make_data(RAW, RAW.replace("compass_sku_100200_1", "compass_sku_100200_2")))
+
+    assert len(received) == 1
+    diff, snapshot = received[0]
+    assert diff["added"] == ["item_0_k1"]
+    assert snapshot is store.snapshot()
+
@@ -0,0 +1,157 @@
+import os
+
+import pytest
+
+from bl.item_analysis_logic import ItemAnalysisLogic
+from component.analysis_cache import AnalysisCache
+from component.item_page_parser import ItemPageParser
+from component.sku_index import SkuIndex
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "item_pages")
+
+
+def load_page(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def parse_page(name):
+    return ItemPageParser.parse(load_page(name))
+
+
+def sku_groups(data):
+    return [(g["name"], g["options"]) for g in data["groups"] if g["type"] == "sku"]
+
+
+def choice_groups(data):
+    return [(g["name"], g["options"]) for g in data["groups"] if g["type"] == "choice"]
+
+
+def test_complete_page_extracts_common_fields():
+    data = parse_page("complete_single_group.html")
+
+    assert ItemPageParser.is_complete(data)
+    assert data["common"] == {
+        "title": "【公式】ステンレスボトル 500ml",
+        "itemid": "10000123",
+        "shopid": "300400",
+        "base_variant_id": "compass_sku_10000123_",
+        "vid": "compass_sku_10000123_1",
+    }
+    assert sku_groups(data) == [("カラー", ["ブラック", "ホワイト", "ネイビー"])]
+    # 値が空の先頭 option (選択してください) は選択肢に含めない
+    assert choice_groups(data) == [("ラッピング", ["不要", "必要 (+110円)"])]
+    assert [g["id"] for g in data["groups"]] == [0, 1]
+    assert "skuMap" not in data
+
+
+def test_multi_group_page_keeps_group_order_and_default_labels():
+    data = parse_page("multi_group.html")
+
+    assert ItemPageParser.is_complete(data)
+    # data-item-to-compare-data の文字列 ID、画像URL 内のプレフィックスも拾う
+    assert data["common"]["itemid"] == "20000456"
+    assert data["common"]["shopid"] == "400500"
+    assert data["common"]["base_variant_id"] == "compass_sku_20000456_"
+    # 商品名はブラウザ版の querySelector と同じく文書順で最初の h1/h2
+    assert data["common"]["title"] == "サンプルアパレル"
+    assert sku_groups(data) == [
+        ("カラー", ["グレー", "ブラック"]),
+        ("サイズ", ["S", "M", "L", "XL"]),
+        ("項目3", ["裏起毛", "裏毛"]),
+    ]
+    assert choice_groups(data) == [
+        ("お届けについて", ["了承しました"]),
+        ("確認事項", ["了承しました", "了承しません"]),
+    ]
+    assert [g["id"] for g in data["groups"]] == [0, 1, 2, 3, 4]
+
+    index = SkuIndex.from_data(data)
+    assert len(index) == 2 * 4 * 2
+    assert index.vid(["ブラック", "L", "裏毛"]) == "compass_sku_20000456_14"
+
+
+def test_sold_out_options_keep_their_position():
+    data = parse_page("sold_out.html")
+
+    assert ItemPageParser.is_complete(data)
+    assert data["common"]["title"] == "限定スニーカー 2026"
+    assert data["common"]["base_variant_id"] == "compass_sku_30000789_"
+    # 売り切れ (disabled) のボタンも除外しない。除外すると以降の選択肢の連番がずれる
+    assert sku_groups(data) == [
+        ("サイズ", ["25.0cm", "26.0cm", "27.0cm売り切れ", "28.0cm"]),
+        ("カラー", ["ホワイト", "ブラック"]),
+    ]
+    index = SkuIndex.from_data(data)
+    assert data["common"]["vid"] == "compass_sku_30000789_1"
+    assert index.vid(["28.0cm", "ホワイト"]) == "compass_sku_30000789_7"
+
+
+def test_page_without_variants_is_complete_without_vid():
+    data = parse_page("no_variants.html")
+
+    assert ItemPageParser.is_complete(data)
+    assert data["groups"] == []
+    # compass_sku_ が無い場合は従来どおり13桁の数字列をプレフィックスとする
+    assert data["common"]["base_variant_id"] == "4901234567894"
+    assert "vid" not in data["common"]
+
+
+@pytest.mark.parametrize("name", ["js_rendered.html", "missing_item_data.html"])
+def test_incomplete_pages_need_browser(name):
+    data = parse_page(name)
+
+    assert not ItemPageParser.is_complete(data)
+
+
+def test_js_rendered_page_detected_by_prefix_without_buttons():
+    data = parse_page("js_rendered.html")
+
+    assert data["common"]["itemid"] == "50000222"
+    assert data["common"]["base_variant_id"] == "compass_sku_50000222_"
+    assert sku_groups(data) == []
+
+
+@pytest.fixture
+def analysis_logic(tmp_path, monkeypatch):
+    monkeypatch.setattr(AnalysisCache, "_instance", AnalysisCache(str(tmp_path / "item_analysis.json")))
+    return ItemAnalysisLogic(debug_mode=False)
+
+
+def _serve_fixture(monkeypatch, logic, name, browser_result):
+    def fetch_item_html(url, etag=None, last_modified=None):
+        return load_page(name), {"ETag": '"fixture"'}
+
+    calls = []
+
+    def fetch_item_variants_browser(url):
+        calls.append(url)
+        return browser_result
+
+    monkeypatch.setattr(logic, "fetch_item_html", fetch_item_html)
+    monkeypatch.setattr(logic, "fetch_item_variants_browser", fetch_item_variants_browser)
+    return calls
+
+
+def test_incomplete_static_result_falls_back_to_browser(analysis_logic, monkeypatch):
+    browser_result = {"groups": [{"id": 0, "name": "カラー", "options": ["ホワイト"], "type": "sku"}],
+                      "common": {"itemid": "50000222", "base_variant_id": "compass_sku_50000222_",
+                                 "vid": "compass_sku_50000222_1"},
+                      "debug": {"log": [], "source": "browser"}}
+    calls = _serve_fixture(monkeypatch, analysis_logic, "js_rendered.html", browser_result)
+
+    data = analysis_logic.fetch_item_variants("https://item.rakuten.co.jp/shop/50000222/")
+
+    assert calls == ["https://item.rakuten.co.jp/shop/50000222/"]
+    assert data is browser_result
+
+
+def test_complete_static_result_skips_browser(analysis_logic, monkeypatch):
+    calls = _serve_fixture(monkeypatch, analysis_logic, "complete_single_group.html", None)
+
+    data = analysis_logic.fetch_item_variants("https://item.rakuten.co.jp/shop/10000123/")
+
+    assert calls == []
+    assert data["debug"]["source"] == "static"
+    assert data["debug"]["etag"] == '"fixture"'
+    assert data["common"]["vid"] == "compass_sku_10000123_1"
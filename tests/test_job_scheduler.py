@@ -0,0 +1,77 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from component.cart_line import CartLine
+from component.job_scheduler import JobScheduler
+
+LINE = CartLine.parse("1###テスト商品 (ブラック)###compass_sku_100200_1|確認事項:了承しました|100200|300400",
+                      line_id="item_0_k0")
+
+
+@pytest.fixture
+def make_scheduler(tmp_path):
+    schedulers = []
+
+    def make(execute=lambda job, context, stop_event: True, lead_sec=JobScheduler.LEAD_SEC):
+        scheduler = JobScheduler(execute, file_path=str(tmp_path / "jobs.json"), lead_sec=lead_sec)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield make
+    for scheduler in schedulers:
+        scheduler.stop()
+
+
+def at(seconds):
+    return (datetime.now() + timedelta(seconds=seconds)).replace(microsecond=0)
+
+
+def test_rejects_same_mode_job_within_busy_window(make_scheduler):
+    scheduler = make_scheduler()
+    base = at(3600)
+    scheduler.add(base, [LINE], debug_mode=True)
+
+    with pytest.raises(ValueError):
+        scheduler.add(base, [LINE], debug_mode=True)
+    with pytest.raises(ValueError):
+        scheduler.add(base + timedelta(seconds=scheduler.min_gap_sec() - 1), [LINE], debug_mode=True)
+    with pytest.raises(ValueError):
+        scheduler.add(base - timedelta(seconds=scheduler.lead_sec), [LINE], debug_mode=True)
+
+    scheduler.add(base + timedelta(seconds=scheduler.min_gap_sec()), [LINE], debug_mode=True)
+    assert len(scheduler.jobs()) == 2
+
+
+def test_other_mode_and_cancelled_jobs_do_not_conflict(make_scheduler):
+    scheduler = make_scheduler()
+    base = at(3600)
+    job = scheduler.add(base, [LINE], debug_mode=True)
+
+    scheduler.add(base, [LINE], debug_mode=False)
+    assert scheduler.cancel(job["id"])
+    scheduler.add(base, [LINE], debug_mode=True)
+    assert sorted(j["status"] for j in scheduler.jobs()) == ["cancelled", "pending", "pending"]
+
+
+def test_jobs_of_different_modes_run_concurrently(make_scheduler):
+    # 両モードのジョブが同時に実行中でなければ Barrier を抜けられない
+    barrier = threading.Barrier(2, timeout=5)
+    threads = {}
+
+    def execute(job, context, stop_event):
+        threads[job["debug_mode"]] = threading.current_thread().name
+        barrier.wait()
+        return True
+
+    done = threading.Event()
+    scheduler = make_scheduler(execute, lead_sec=3600)
+    scheduler.on_change = lambda: done.set() if [j["status"] for j in scheduler.jobs()] == ["done", "done"] else None
+    target = at(60)
+    scheduler.add(target, [LINE], debug_mode=True)
+    scheduler.add(target, [LINE], debug_mode=False)
+    scheduler.start()
+
+    assert done.wait(5)
+    assert threads[True] != threads[False]
@@ -0,0 +1,67 @@
+import pytest
+
+from bl.reservation_runner import ReservationRunner
+from component.cart_line import CartLine
+
+LINES = [CartLine.parse(f"1###テスト商品{i}###compass_sku_100200_{i}|確認事項:了承しました|100200|300400",
+                        line_id=f"item_0_k{i}") for i in range(2)]
+
+
+class FakeLogic:
+    """ReservationRunner から呼ばれる順序を記録する PurchaseLogic の代わり"""
+    debug_mode = True
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def execute_cart_post_batch(self, lines):
+        self.calls.append("batch")
+        return [{"ok": i == 0, "attempts": 1, "status": 200, "elapsed_ms": 1.0,
+                 "error": None if i == 0 else "resultCode soldout", "transport": "http"}
+                for i, _ in enumerate(lines)]
+
+    def release_http_transport(self):
+        self.calls.append("release")
+
+    def go_to_checkout(self):
+        self.calls.append("checkout")
+
+    def finish_trace(self, on_done=None, wait=False):
+        self.calls.append("trace")
+
+
+class FakeLogger:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def info(self, message):
+        self.calls.append("log")
+
+    warning = error = info
+
+
+def test_results_are_reported_after_checkout_starts():
+    calls = []
+    runner = ReservationRunner(FakeLogic(calls), FakeLogger(calls),
+                               on_event=lambda name, detail: calls.append(name))
+
+    results = runner.run_now(LINES)
+
+    assert calls[:3] == ["batch", "release", "checkout"]
+    assert calls[3:] == ["log", "post", "log", "post", "trigger", "trace"]
+    assert not ReservationRunner.all_ok(results)
+
+
+def test_results_are_reported_when_checkout_fails():
+    calls = []
+    logic = FakeLogic(calls)
+
+    def fail():
+        raise RuntimeError("navigation failed")
+
+    logic.go_to_checkout = fail
+    runner = ReservationRunner(logic, FakeLogger(calls), on_event=lambda name, detail: calls.append(name))
+
+    with pytest.raises(RuntimeError):
+        runner.run_now(LINES)
+    assert calls.count("post") == 2
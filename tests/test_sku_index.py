@@ -0,0 +1,88 @@
+import pytest
+
+from component.sku_index import SkuIndex
+
+
+def legacy_sku_map(prefix, option_lists):
+    """従来の解析スクリプトの combine() による skuMap ("選択値,選択値,..." -> variant ID) の再現"""
+    combs = [[]]
+    for opts in option_lists:
+        combs = [c + [o] for c in combs for o in opts]
+    sku_map = {}
+    for i, c in enumerate(combs):
+        sku_map[",".join(c)] = prefix + str(i + 1)
+    return sku_map, combs
+
+
+def large_groups(*sizes):
+    return [[f"選択肢{g + 1}-{o + 1}" for o in range(size)] for g, size in enumerate(sizes)]
+
+
+CASES = {
+    "single_group": ("compass_sku_100_", [["S", "M", "L"]]),
+    "three_groups": ("compass_sku_101_", [["ブラック", "ホワイト"], ["S", "M", "L", "XL"], ["A", "B", "C"]]),
+    "duplicate_labels": ("compass_sku_102_", [["赤", "青", "赤"], ["1", "2"], ["x", "y", "x", "z"]]),
+    "single_option_groups": ("compass_sku_103_", [["単品"], ["S", "M"], ["通常"], ["A", "B", "C", "D"]]),
+    "digit_prefix": ("1234567890123", [["a", "b"], ["c", "d", "e"]]),
+    "four_large_groups": ("compass_sku_104_", large_groups(12, 10, 8, 6)),
+}
+
+
+@pytest.mark.parametrize("prefix, option_lists", list(CASES.values()), ids=list(CASES))
+def test_vid_matches_legacy_sku_map(prefix, option_lists):
+    sku_map, combs = legacy_sku_map(prefix, option_lists)
+    index = SkuIndex(prefix, option_lists)
+
+    assert len(index) == len(combs)
+    assert {",".join(c): index.vid(c) for c in combs} == sku_map
+    # 従来の common.vid は先頭の組み合わせのキーで引いた値 (重複ラベルがあれば後ろの連番)
+    assert index.first_vid() == sku_map[",".join(combs[0])]
+
+
+@pytest.mark.parametrize("prefix, option_lists", list(CASES.values()), ids=list(CASES))
+def test_values_at_inverts_numbering(prefix, option_lists):
+    _, combs = legacy_sku_map(prefix, option_lists)
+    index = SkuIndex(prefix, option_lists)
+
+    assert [index.values_at(n) for n in range(1, len(index) + 1)] == combs
+    with pytest.raises(IndexError):
+        index.values_at(0)
+    with pytest.raises(IndexError):
+        index.values_at(len(index) + 1)
+
+
+def test_duplicate_label_resolves_to_last_position():
+    index = SkuIndex("p_", [["赤", "青", "赤"], ["S", "M"]])
+
+    assert index.number_of(["赤", "S"]) == 5
+    assert index.first_vid() == "p_5"
+
+
+def test_unknown_values_return_none():
+    index = SkuIndex("p_", [["S", "M"], ["赤", "青"]])
+
+    assert index.vid(["L", "赤"]) is None
+    assert index.vid(["S", "緑"]) is None
+    assert index.vid(["S"]) is None
+    assert index.vid(["S", "赤", "余分"]) is None
+    assert index.vid([]) is None
+
+
+def test_from_data_requires_prefix_and_sku_groups():
+    groups = [{"id": 0, "name": "サイズ", "options": ["S", "M"], "type": "sku"},
+              {"id": 1, "name": "確認事項", "options": ["了承しました"], "type": "choice"}]
+
+    index = SkuIndex.from_data({"groups": groups, "common": {"base_variant_id": "compass_sku_1_"}})
+    assert index.option_lists == [["S", "M"]]
+    assert index.vid(["M"]) == "compass_sku_1_2"
+
+    assert SkuIndex.from_data({"groups": groups, "common": {"base_variant_id": ""}}) is None
+    assert SkuIndex.from_data({"groups": groups[1:], "common": {"base_variant_id": "compass_sku_1_"}}) is None
+
+
+def test_empty_group_has_no_combinations():
+    index = SkuIndex("p_", [["S", "M"], []])
+
+    assert len(index) == 0
+    assert index.first_vid() is None
+    assert index.vid(["S", "赤"]) is None
@@ -0,0 +1,99 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from component.trace import Tracer
+
+
+@pytest.fixture(autouse=True)
+def trace_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Tracer, "_trace_dir", classmethod(lambda cls: str(tmp_path)))
+    yield tmp_path
+    Tracer.detach()
+
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        header, *records = [json.loads(line) for line in f]
+    return header, records
+
+
+def test_concurrent_runs_do_not_mix_records():
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def job(name):
+        Tracer.start_run(name)
+        barrier.wait()
+        for i in range(50):
+            with Tracer.span("step", owner=name, i=i):
+                pass
+        barrier.wait()
+        results[name] = Tracer.end_run()
+
+    threads = [threading.Thread(target=job, args=(name,)) for name in ("instant", "scheduled")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results["instant"][0] != results["scheduled"][0]
+    for name, (path, summary) in results.items():
+        header, records = read_records(path)
+        assert header["name"] == name
+        assert len(records) == 50
+        assert {r["attrs"]["owner"] for r in records} == {name}
+
+
+def test_start_run_on_another_thread_keeps_current_run():
+    run = Tracer.start_run("scheduled")
+    other = threading.Thread(target=lambda: (Tracer.start_run("instant"), Tracer.end_run()))
+    other.start()
+    other.join()
+
+    assert Tracer.current() is run
+    Tracer.event("trigger")
+    path, summary = Tracer.end_run()
+    assert [p["name"] for p in summary] == ["trigger"]
+    assert not Tracer.is_active()
+
+
+def test_wrapped_function_records_into_caller_run():
+    Tracer.start_run("instant")
+
+    def post(i):
+        with Tracer.span("cart_post.attempt", i=i):
+            return i
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(Tracer.wrap(post), range(8))) == list(range(8))
+        # 包まずに渡した関数はワーカースレッドにランが無いため記録されない
+        executor.submit(post, 99).result()
+
+    path, summary = Tracer.end_run()
+    header, records = read_records(path)
+    assert sorted(r["attrs"]["i"] for r in records) == list(range(8))
+
+
+def test_detached_run_can_be_finished_from_another_thread():
+    run = Tracer.start_run("instant")
+    Tracer.event("trigger")
+    assert Tracer.detach() is run
+    assert not Tracer.is_active()
+
+    def finish():
+        with Tracer.bind(run):
+            Tracer.event("page.click")
+        finished.append(Tracer.end_run(run))
+
+    finished = []
+    t = threading.Thread(target=finish)
+    t.start()
+    t.join()
+
+    path, summary = finished[0]
+    assert [p["name"] for p in summary] == ["trigger", "page.click"]
+    # 2回目の end_run は同じ結果を返し、書き出し直さない
+    assert Tracer.end_run(run) == finished[0]